@@ -0,0 +1,199 @@
+"""
+Headless benchmark suite: loader, enricher, modeler and dashboard KPI computations
+
+Usage:
+    python -m benchmarks.suite --scale small --out bench.json
+    python -m benchmarks.suite --scale small --baseline benchmarks/baseline.json
+    python -m benchmarks.suite --scale small --save-baseline benchmarks/baseline.json
+"""
+import sys
+import argparse
+import json
+import logging
+import platform
+import statistics
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+if __name__ == '__main__':
+    # Run as a script (python benchmarks/suite.py): make the repo root importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benchmarks.synthetic import make_unified, split, write_unified
+from src.data_enricher import add_impact_link, add_new_event, add_new_observation, add_records
+from src.data_loader import get_data_summary, load_and_prepare_data, separate_by_record_type
+from src.data_summary import DataSummary
+from src.events_impact_modeler import apply_event_effects_series, build_association_matrix, build_event_effects
+from src.indicator_store import IndicatorStore
+from src.kpi_snapshot import compute_kpis
+
+# (rows, events) per preset; rows span 10^3-10^7, events 10-10^4
+SCALES = {
+    'tiny': (1_000, 10),
+    'small': (10_000, 100),
+    'medium': (100_000, 1_000),
+    'large': (1_000_000, 10_000),
+    'xlarge': (10_000_000, 10_000),
+}
+
+# A benchmark is run as fn(*setup(ctx)) where ctx holds the generated data
+Benchmark = Tuple[Callable[[Dict], tuple], Callable]
+
+
+def _new_records(n: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        'indicator': 'Bench indicator', 'indicator_code': 'ACC_BENCH', 'value_numeric': np.arange(n, dtype=float),
+        'observation_date': '2024-12-31', 'pillar': 'ACCESS', 'source_name': 'Benchmark',
+    })
+
+
+def _add_single(obs: pd.DataFrame, events: pd.DataFrame, links: pd.DataFrame):
+    add_new_observation(obs, 'Bench indicator', 'ACC_BENCH', 1.0, '2024-12-31', 'ACCESS', 'Benchmark', '')
+    add_new_event(events, 'Bench event', '2024-12-31', 'policy', 'Benchmark', '')
+    add_impact_link(links, 'EVT_00000', 'ACCESS', 'ACC_BENCH', 'increase', 'medium', 6, 'literature')
+
+
+def _dashboard_kpis(obs: pd.DataFrame):
+    store = IndicatorStore(obs)
+    kpis = compute_kpis(store)
+    code = store.indicator_codes()[0]
+    return kpis, store.latest_value(code), store.yoy_change(code)
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    'load_and_prepare_data': (lambda c: (str(c['csv_path']), None), load_and_prepare_data),
+    'separate_by_record_type': (lambda c: (c['df'],), separate_by_record_type),
+    'enricher_add_single': (lambda c: (c['observations'], c['events'], c['impact_links']), _add_single),
+    'enricher_add_records_1000': (lambda c: (c['observations'], _new_records(1000), 'observation'), add_records),
+    'build_association_matrix': (lambda c: (c['events'], c['impact_links']), build_association_matrix),
+    'build_association_matrix_sparse': (lambda c: (c['events'], c['impact_links'], True), build_association_matrix),
+    'build_event_effects': (lambda c: (c['impact_links'], c['events']), build_event_effects),
+    'apply_event_effects_series': (lambda c: (c['observations'], c['effects'], c['top_indicator']),
+                                   apply_event_effects_series),
+    'dashboard_kpis': (lambda c: (c['observations'],), _dashboard_kpis),
+    'data_summary_full': (lambda c: (c['df'],), get_data_summary),
+    'data_summary_update_1000': (lambda c: (DataSummary.from_frame(c['df']), c['df'].iloc[:1000]), DataSummary.update),
+}
+
+
+def build_context(rows: int, events: int, workdir: Path, seed: int = 0) -> Dict:
+    """Generate the synthetic data every benchmark draws on"""
+    df = make_unified(rows, events, seed=seed)
+    parts = split(df)
+    ctx = {'df': df, 'csv_path': write_unified(df, workdir / 'unified.csv'), **parts}
+    ctx['effects'] = build_event_effects(parts['impact_links'], parts['events'])
+    ctx['top_indicator'] = ctx['effects']['related_indicator'].value_counts().index[0]
+    return ctx
+
+
+def time_call(fn: Callable, args: tuple, repeats: int) -> Dict[str, float]:
+    """Wall-clock seconds over `repeats` calls (min, median, mean)"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return {'min': min(times), 'median': statistics.median(times), 'mean': statistics.fmean(times),
+            'repeats': repeats}
+
+
+def run_suite(rows: int, events: int, repeats: int = 5, only: Optional[List[str]] = None,
+              seed: int = 0) -> Dict:
+    """
+    Run the benchmarks on freshly generated data
+
+    Returns:
+        dict: 'meta' (environment and scale) and 'results' (name -> timings)
+    """
+    names = only or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {sorted(unknown)}")
+    # The library logs at INFO on every call; keep timings free of log I/O
+    previous = logging.root.manager.disable
+    logging.disable(logging.INFO)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            ctx = build_context(rows, events, Path(tmp), seed)
+            results = {}
+            for name in names:
+                setup, fn = BENCHMARKS[name]
+                results[name] = time_call(fn, setup(ctx), repeats)
+    finally:
+        logging.disable(previous)
+    meta = {
+        'rows': rows, 'events': events, 'seed': seed,
+        'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+        'platform': platform.platform(), 'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+    return {'meta': meta, 'results': results}
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float = 0.25, stat: str = 'median') -> pd.DataFrame:
+    """
+    Benchmarks shared with a baseline, with their ratio to it
+
+    Args:
+        report, baseline: run_suite outputs
+        tolerance: Allowed slowdown (0.25 = 25%) before a benchmark counts as a regression
+        stat: Timing statistic compared
+
+    Returns:
+        pd.DataFrame: name, baseline, current, ratio, regression
+
+    Raises:
+        ValueError: When the baseline was run at a different scale
+    """
+    scale = ('rows', 'events')
+    if any(report['meta'].get(k) != baseline.get('meta', {}).get(k) for k in scale):
+        raise ValueError(f"Baseline scale {[baseline.get('meta', {}).get(k) for k in scale]} "
+                         f"differs from this run {[report['meta'][k] for k in scale]}")
+    rows = []
+    for name, timing in report['results'].items():
+        if name in baseline.get('results', {}):
+            base = baseline['results'][name][stat]
+            ratio = timing[stat] / base if base else np.inf
+            rows.append({'name': name, 'baseline': base, 'current': timing[stat], 'ratio': ratio,
+                         'regression': ratio > 1 + tolerance})
+    return pd.DataFrame(rows, columns=['name', 'baseline', 'current', 'ratio', 'regression'])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Run the benchmark suite')
+    parser.add_argument('--scale', choices=list(SCALES), default='small')
+    parser.add_argument('--rows', type=int, default=None, help='Override the preset row count')
+    parser.add_argument('--events', type=int, default=None, help='Override the preset event count')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), default=None)
+    parser.add_argument('--out', type=Path, default=None, help='Write results JSON here')
+    parser.add_argument('--baseline', type=Path, default=None, help='Compare against this results JSON')
+    parser.add_argument('--save-baseline', type=Path, default=None, help='Store these results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown vs baseline')
+    args = parser.parse_args(argv)
+
+    rows, events = SCALES[args.scale]
+    report = run_suite(args.rows or rows, args.events or events, args.repeats, args.only)
+    for path in (args.out, args.save_baseline):
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, indent=1))
+            print(f"Wrote {path}")
+
+    table = pd.DataFrame(report['results']).T[['min', 'median', 'mean']]
+    print(f"rows={report['meta']['rows']} events={report['meta']['events']}")
+    print(table.to_string(float_format=lambda v: f"{v * 1000:.2f} ms"))
+    if args.baseline is not None:
+        comparison = compare(report, json.loads(args.baseline.read_text()), args.tolerance)
+        print(comparison.to_string(index=False))
+        if comparison['regression'].any():
+            print(f"Regressions: {', '.join(comparison.loc[comparison['regression'], 'name'])}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Synthetic unified-schema datasets for benchmarks (10^3-10^7 rows, 10-10^4 events)
+"""
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import Dict
+
+UNIFIED_COLUMNS = [
+    'record_id', 'record_type', 'category', 'pillar', 'indicator', 'indicator_code', 'indicator_direction',
+    'value_numeric', 'value_text', 'value_type', 'unit', 'observation_date', 'period_start', 'period_end',
+    'fiscal_year', 'gender', 'location', 'region', 'source_name', 'source_type', 'source_url', 'confidence',
+    'related_indicator', 'relationship_type', 'impact_direction', 'impact_magnitude', 'impact_estimate',
+    'lag_months', 'evidence_basis', 'comparable_country', 'collected_by', 'collection_date', 'original_text',
+    'notes',
+]
+
+EVENT_CATEGORIES = ['product_launch', 'policy', 'infrastructure', 'market_entry', 'regulation']
+LINKS_PER_EVENT = 3
+
+
+def make_unified(n_rows: int, n_events: int = 100, seed: int = 0) -> pd.DataFrame:
+    """
+    Unified dataset with n_rows records in total
+
+    n_events events get LINKS_PER_EVENT impact links each; the remaining rows
+    are observations. Each indicator is one complete monthly series
+    (2010-2024, one value per month), so the indicator count grows with
+    n_rows; every fifth indicator is a female-only series.
+    """
+    rng = np.random.default_rng(seed)
+    n_links = n_events * LINKS_PER_EVENT
+    n_obs = max(n_rows - n_events - n_links, 0)
+    months = pd.date_range('2010-01-31', '2024-12-31', freq='ME')
+    n_indicators = max(1, -(-n_obs // len(months)))
+    codes = np.array([f"{'ACC' if i % 2 else 'USG'}_IND_{i:06d}" for i in range(n_indicators)])
+
+    ind = np.arange(n_obs) // len(months)
+    obs_dates = months[np.arange(n_obs) % len(months)]
+    obs = pd.DataFrame({
+        'record_type': 'observation',
+        'pillar': np.where(ind % 2, 'ACCESS', 'USAGE'),
+        'indicator': np.char.add('Indicator ', codes[ind]),
+        'indicator_code': codes[ind],
+        'indicator_direction': 'higher_better',
+        'value_numeric': np.round(rng.uniform(0, 100, n_obs), 2),
+        'value_type': np.where(ind % 3 == 0, 'count', 'percentage'),
+        'observation_date': obs_dates.strftime('%Y-%m-%d'),
+        'fiscal_year': obs_dates.year,
+        'gender': np.where(ind % 5 == 4, 'female', 'all'),
+        'location': 'national',
+        'source_name': 'Synthetic',
+        'source_type': 'survey',
+        'confidence': 'high',
+    })
+
+    event_dates = months[rng.integers(0, len(months), n_events)]
+    events = pd.DataFrame({
+        'record_id': [f"EVT_{i:05d}" for i in range(n_events)],
+        'record_type': 'event',
+        'category': rng.choice(EVENT_CATEGORIES, n_events),
+        'indicator': [f"Event {i}" for i in range(n_events)],
+        'indicator_code': [f"EVT_{i:05d}" for i in range(n_events)],
+        'observation_date': event_dates.strftime('%Y-%m-%d'),
+        'source_name': 'Synthetic',
+        'confidence': 'medium',
+    })
+
+    parent = np.repeat(events['record_id'].to_numpy(), LINKS_PER_EVENT)
+    related = codes[rng.integers(0, n_indicators, n_links)]
+    links = pd.DataFrame({
+        'record_type': 'impact_link',
+        'parent_id': parent,
+        'pillar': np.where(np.char.startswith(related.astype(str), 'ACC'), 'ACCESS', 'USAGE'),
+        'indicator': np.char.add('Impact on ', related),
+        'indicator_code': np.char.add('IMP_', related),
+        'related_indicator': related,
+        'relationship_type': 'direct',
+        'impact_direction': rng.choice(['increase', 'decrease'], n_links, p=[0.8, 0.2]),
+        'impact_magnitude': rng.choice(['low', 'medium', 'high'], n_links),
+        'impact_estimate': np.round(rng.uniform(0.5, 10, n_links), 2),
+        'lag_months': rng.choice([0, 6, 12, 24], n_links),
+        'evidence_basis': rng.choice(['empirical', 'literature'], n_links),
+        'confidence': 'medium',
+    })
+
+    df = pd.concat([obs, events, links], ignore_index=True)
+    ids = [f"REC_{i:08d}" for i in range(len(df))]
+    df['record_id'] = df['record_id'].where(df['record_id'].notna(), pd.Series(ids, index=df.index))
+    df['collected_by'] = 'Benchmark'
+    df['collection_date'] = '2025-01-01'
+    return df.reindex(columns=UNIFIED_COLUMNS + ['parent_id'])
+
+
+def write_unified(df: pd.DataFrame, path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(path, index=False)
+    return path
+
+
+def split(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Observations, events and impact_links of a synthetic frame"""
+    return {
+        'observations': df[df['record_type'] == 'observation'].reset_index(drop=True),
+        'events': df[df['record_type'] == 'event'].reset_index(drop=True),
+        'impact_links': df[df['record_type'] == 'impact_link'].reset_index(drop=True),
+    }
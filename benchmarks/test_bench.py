@@ -0,0 +1,24 @@
+"""
+pytest-benchmark entry point: pytest benchmarks/test_bench.py --benchmark-only [--benchmark-json out.json]
+
+BENCH_SCALE selects a benchmarks.suite.SCALES preset (default 'tiny').
+"""
+import os
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from benchmarks.suite import BENCHMARKS, SCALES, build_context
+
+
+@pytest.fixture(scope='module')
+def context(tmp_path_factory):
+    rows, events = SCALES[os.environ.get('BENCH_SCALE', 'tiny')]
+    return build_context(rows, events, tmp_path_factory.mktemp('bench'))
+
+
+@pytest.mark.parametrize('name', list(BENCHMARKS))
+def test_benchmark(benchmark, context, name):
+    setup, fn = BENCHMARKS[name]
+    benchmark(fn, *setup(context))
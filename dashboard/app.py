@@ -1,5 +1,6 @@
 
 import os
+import sys
 from pathlib import Path
 import pandas as pd
 import numpy as np
@@ -10,93 +11,105 @@ ROOT = Path(__file__).resolve().parent.parent
 DATA_COMBINED = ROOT / 'data/processed/ethiopia_fi_unified_data_combined.csv'
 FORECAST_CSV = ROOT / 'reports/forecast_access_usage_2025_2027.csv'
 MATRIX_TRIM_CSV = ROOT / 'data/processed/event_indicator_association_trimmed.csv'
+MATRIX_NPZ = ROOT / 'data/processed/event_indicator_association.npz'
+KPI_SNAPSHOT = ROOT / 'data/processed/kpi_snapshot.json'
+CACHE_DIR = ROOT / 'data/cache'
+MAX_CHART_POINTS = 500
+DATA_CACHE_BYTES = 512 * 1024 * 1024
+# Seconds between background checks for regenerated files (0 = check on each rerun only)
+WATCH_INTERVAL = float(os.environ.get('FI_DASHBOARD_WATCH_SECONDS', '0'))
+
+sys.path.insert(0, str(ROOT))
+from src.data_loader import load_unified_data, partition_by_record_type
+from src.association_matrix import load_association_long
+from src.kpi_snapshot import load_kpi_snapshot, snapshot_key, write_kpi_snapshot
+from src.series_tiles import RESOLUTIONS, SeriesTiles
+from src.exports import ExportCache, available_formats, export_filename, export_mime
+from src.data_access import DataStore
 
 st.set_page_config(page_title='Ethiopia FI Dashboard', layout='wide')
 st.title('Ethiopia Financial Inclusion — Event Impacts & Forecasts')
 
-@st.cache_data(show_spinner=False)
 def load_combined():
-    if not DATA_COMBINED.exists():
-        return None, None, None
-    df = pd.read_csv(DATA_COMBINED)
-    obs = df[df['record_type']=='observation'].copy()
-    ev = df[df['record_type']=='event'].copy()
-    links = df[df['record_type']=='impact_link'].copy()
-    # datetime parsing
-    if 'observation_date' in obs.columns:
-        obs['observation_date'] = pd.to_datetime(obs['observation_date'], errors='coerce')
-    return obs, ev, links
-
-@st.cache_data(show_spinner=False)
-def load_forecast():
-    if not FORECAST_CSV.exists():
-        return None
-    f = pd.read_csv(FORECAST_CSV)
-    return f
-
-obs, events, impact_links = load_combined()
-forecast_df = load_forecast()
+    df = load_unified_data(str(DATA_COMBINED), use_cache=True, cache_dir=str(CACHE_DIR))
+    # one pass; dates already parsed by the typed loader
+    parts = partition_by_record_type(df, normalize=False)
+    return parts['observations'], parts['events'], parts['impact_links']
+
+def load_kpis(store):
+    # the snapshot itself is checked against the data file's hash
+    snapshot = load_kpi_snapshot(KPI_SNAPSHOT, DATA_COMBINED)
+    if snapshot is None:
+        write_kpi_snapshot(DATA_COMBINED, KPI_SNAPSHOT, observations=store.get('combined')[0])
+        snapshot = load_kpi_snapshot(KPI_SNAPSHOT)
+    return snapshot
+
+@st.cache_resource(show_spinner=False)
+def data_store():
+    # one cache for every dataset, shared by all sessions; reloads when the files change
+    store = DataStore(max_bytes=DATA_CACHE_BYTES)
+    store.register('combined', DATA_COMBINED, load_combined)
+    store.register('forecast', FORECAST_CSV, lambda: pd.read_csv(FORECAST_CSV))
+    store.register('matrix_trimmed', MATRIX_TRIM_CSV, lambda: pd.read_csv(MATRIX_TRIM_CSV))
+    store.register('association', [MATRIX_NPZ, MATRIX_TRIM_CSV], lambda: load_association_long(MATRIX_NPZ, MATRIX_TRIM_CSV))
+    store.register('kpis', DATA_COMBINED, lambda: load_kpis(store))
+    store.register('tiles', DATA_COMBINED, lambda: SeriesTiles.from_observations(store.get('combined')[0]))
+    if WATCH_INTERVAL:
+        store.start_watcher(WATCH_INTERVAL)
+    return store
+
+@st.cache_resource(show_spinner=False)
+def export_cache():
+    # shared by all sessions; LRU-bounded encoded downloads
+    return ExportCache()
+
+data = data_store()
+obs, events, impact_links = data.get('combined') or (None, None, None)
+forecast_df = data.get('forecast')
+tiles = data.get('tiles')
+kpis = data.get('kpis')
+
+# Utility: download encoded only after "Prepare", then served from the shared export cache
+def lazy_download(label, key, dataset_key, filter_key, build, file_stem):
+    c1, c2 = st.columns([1, 3])
+    fmt = c1.selectbox('Format', options=available_formats(), key=f'{key}_fmt', label_visibility='collapsed')
+    request = (dataset_key, filter_key, fmt)
+    if c2.button(f'Prepare: {label}', key=f'{key}_prepare'):
+        st.session_state[f'{key}_prepared'] = request
+    if st.session_state.get(f'{key}_prepared') == request:
+        data = export_cache().get(dataset_key, filter_key, fmt, build)
+        c2.download_button(label, data, file_name=export_filename(file_stem, fmt), mime=export_mime(fmt), key=f'{key}_download')
 
 # Sidebar navigation
 section = st.sidebar.radio('Section', ['Overview', 'Trends', 'Forecasts', 'Inclusion Projections', 'Downloads'])
 
-# Utility: latest value per indicator
-def latest_value(obs, code):
-    if obs is None: return None
-    s = obs[obs['indicator_code']==code].copy()
-    if s.empty: return None
-    s = s.dropna(subset=['observation_date']).sort_values('observation_date')
-    return float(s['value_numeric'].iloc[-1]) if not s.empty else None
-
-# Utility: YoY change for year-aggregated
-def yoy_change(obs, code):
-    if obs is None: return None
-    s = obs[obs['indicator_code']==code].copy()
-    if s.empty: return None
-    s['observation_date'] = pd.to_datetime(s['observation_date'], errors='coerce')
-    s = s.dropna(subset=['observation_date'])
-    s['year'] = s['observation_date'].dt.year
-    agg = s.groupby('year')['value_numeric'].mean() if code=='ACC_OWNERSHIP' else s.groupby('year')['value_numeric'].sum()
-    if len(agg) < 2: return None
-    last, prev = agg.iloc[-1], agg.iloc[-2]
-    try:
-        return float((last - prev) / (prev if prev != 0 else np.nan) * 100.0)
-    except Exception:
-        return None
+# Utility: one metric of an indicator's national series from the KPI snapshot
+def kpi(code, metric):
+    if kpis is None: return None
+    return kpis['indicators'].get(snapshot_key(code), {}).get(metric)
 
 # Overview
 if section == 'Overview':
     st.subheader('Key Metrics')
     col1, col2, col3 = st.columns(3)
-    acc_latest = latest_value(obs, 'ACC_OWNERSHIP')
-    p2p_latest = yoy_change(obs, 'USG_P2P_COUNT')  # use YoY % for highlight
-    acc_yoy = yoy_change(obs, 'ACC_OWNERSHIP')
+    acc_latest = kpi('ACC_OWNERSHIP', 'latest_value')
+    p2p_latest = kpi('USG_P2P_COUNT', 'yoy_change')  # use YoY % for highlight
+    acc_yoy = kpi('ACC_OWNERSHIP', 'yoy_change')
     with col1:
         st.metric('Account Ownership (%)', f"{acc_latest if acc_latest is not None else '—'}", delta=f"{acc_yoy:.2f}% YoY" if acc_yoy is not None else None)
     # P2P vs ATM crossover ratio (last year totals)
     with col2:
-        p2p = obs[obs['indicator_code']=='USG_P2P_COUNT'].copy() if obs is not None else pd.DataFrame()
-        atm = obs[obs['indicator_code']=='USG_ATM_COUNT'].copy() if obs is not None else pd.DataFrame()
-        for df in (p2p, atm):
-            if not df.empty:
-                df['observation_date'] = pd.to_datetime(df['observation_date'], errors='coerce')
-                df['year'] = df['observation_date'].dt.year
-        p2p_y = p2p.groupby('year')['value_numeric'].sum() if not p2p.empty else pd.Series(dtype=float)
-        atm_y = atm.groupby('year')['value_numeric'].sum() if not atm.empty else pd.Series(dtype=float)
-        if not p2p_y.empty and not atm_y.empty and (p2p_y.index[-1] == atm_y.index[-1]):
-            ratio = float(p2p_y.iloc[-1] / atm_y.iloc[-1]) if atm_y.iloc[-1] else np.nan
-            st.metric('P2P/ATM Crossover Ratio', f"{ratio:.2f}" if not np.isnan(ratio) else '—')
-        else:
-            st.metric('P2P/ATM Crossover Ratio', '—')
+        ratio = kpis['headline']['p2p_atm_ratio'] if kpis is not None else None
+        st.metric('P2P/ATM Crossover Ratio', f"{ratio:.2f}" if ratio is not None else '—')
     with col3:
         st.metric('P2P Transactions YoY (%)', f"{p2p_latest:.2f}%" if p2p_latest is not None else '—')
 
     st.markdown('---')
     st.subheader('Impact Links (non-zero associations)')
-    if MATRIX_TRIM_CSV.exists():
-        mat = pd.read_csv(MATRIX_TRIM_CSV)
+    mat = data.get('matrix_trimmed')
+    if mat is not None:
         st.dataframe(mat, use_container_width=True)
-        st.download_button('Download association matrix (trimmed CSV)', mat.to_csv(index=False).encode('utf-8'), file_name='event_indicator_association_trimmed.csv', mime='text/csv')
+        lazy_download('Download association matrix (trimmed)', 'overview_matrix', data.version('matrix_trimmed'), 'trimmed', lambda: mat, 'event_indicator_association_trimmed')
     else:
         st.info('No trimmed association matrix found yet.')
 
@@ -106,35 +119,37 @@ elif section == 'Trends':
     if obs is None or obs.empty:
         st.warning('No observation data available.')
     else:
-        codes = sorted(obs['indicator_code'].dropna().unique().tolist())
+        codes = tiles.store.indicator_codes()
         code = st.selectbox('Indicator', options=codes, index=(codes.index('ACC_OWNERSHIP') if 'ACC_OWNERSHIP' in codes else 0))
-        df = obs[obs['indicator_code']==code].copy()
-        df['observation_date'] = pd.to_datetime(df['observation_date'], errors='coerce')
-        df = df.dropna(subset=['observation_date'])
-        min_date, max_date = df['observation_date'].min(), df['observation_date'].max()
-        rng = st.slider('Date range', min_value=min_date.to_pydatetime(), max_value=max_date.to_pydatetime(), value=(min_date.to_pydatetime(), max_date.to_pydatetime()))
-        df = df[(df['observation_date']>=pd.Timestamp(rng[0])) & (df['observation_date']<=pd.Timestamp(rng[1]))]
-        chart = alt.Chart(df).mark_line(point=True).encode(
-            x='observation_date:T', y='value_numeric:Q', tooltip=['observation_date:T','value_numeric:Q']
-        ).properties(height=350)
-        st.altair_chart(chart, use_container_width=True)
-        st.download_button('Download filtered series (CSV)', df[['observation_date','indicator_code','value_numeric']].to_csv(index=False).encode('utf-8'), file_name=f'{code}_filtered.csv', mime='text/csv')
+        pairs = tiles.disaggregations(code)
+        gender, location = st.selectbox('Series', options=pairs, format_func=lambda p: f'{p[0]} / {p[1]}')
+        resolution = st.radio('Resolution', options=list(RESOLUTIONS), horizontal=True,
+                              format_func=lambda r: {'raw': 'Observations', 'M': 'Monthly', 'Q': 'Quarterly', 'Y': 'Yearly'}[r])
+        tile = tiles.tile(code, resolution, gender, location)
+        if tile.bounds is None:
+            st.info('No observations for this series.')
+        else:
+            min_date, max_date = tile.bounds
+            if min_date < max_date:
+                rng = st.slider('Date range', min_value=min_date.to_pydatetime(), max_value=max_date.to_pydatetime(), value=(min_date.to_pydatetime(), max_date.to_pydatetime()))
+            else:
+                rng = (min_date, max_date)
+            df = tile.frame(rng[0], rng[1], max_points=MAX_CHART_POINTS, date_col='observation_date', value_col='value_numeric')
+            chart = alt.Chart(df).mark_line(point=True).encode(
+                x='observation_date:T', y='value_numeric:Q', tooltip=['observation_date:T','value_numeric:Q']
+            ).properties(height=350)
+            st.altair_chart(chart, use_container_width=True)
+            def filtered_series():
+                full = tile.frame(rng[0], rng[1], max_points=None, date_col='observation_date', value_col='value_numeric')
+                full.insert(1, 'indicator_code', code)
+                return full
+            lazy_download('Download filtered series', 'trends_series', data.version('combined'), (code, gender, location, resolution, str(rng[0]), str(rng[1])), filtered_series, f'{code}_filtered')
 
     st.markdown('---')
     st.subheader('Channel Comparison: P2P vs ATM (monthly)')
-    if obs is not None and not obs.empty:
-        def build_monthly(code):
-            d = obs[obs['indicator_code']==code].copy()
-            if d.empty: return pd.DataFrame()
-            d['observation_date'] = pd.to_datetime(d['observation_date'], errors='coerce')
-            d = d.dropna(subset=['observation_date'])
-            d['month'] = d['observation_date'].dt.to_period('M').dt.to_timestamp()
-            agg = d.groupby('month')['value_numeric'].sum().reset_index(name='value')
-            agg['series'] = code
-            return agg
-        p2p_m = build_monthly('USG_P2P_COUNT')
-        atm_m = build_monthly('USG_ATM_COUNT')
-        comp = pd.concat([p2p_m, atm_m], ignore_index=True)
+    if tiles is not None:
+        comp = pd.concat([tiles.tile(c, 'M').frame(max_points=MAX_CHART_POINTS, date_col='month').assign(series=c)
+                          for c in ('USG_P2P_COUNT', 'USG_ATM_COUNT')], ignore_index=True)
         if not comp.empty:
             chart2 = alt.Chart(comp).mark_line(point=True).encode(
                 x='month:T', y='value:Q', color='series:N', tooltip=['month:T','series:N','value:Q']
@@ -164,7 +179,7 @@ elif section == 'Forecasts':
         )
         st.altair_chart(band + base, use_container_width=True)
         st.dataframe(sub[['target','scenario','year',y_col,band_lo,band_hi,'event_delta']], use_container_width=True)
-        st.download_button('Download forecast (filtered CSV)', sub.to_csv(index=False).encode('utf-8'), file_name=f'forecast_{target}_{scenario}_{model_sel}.csv', mime='text/csv')
+        lazy_download('Download forecast (filtered)', 'forecasts_table', data.version('forecast'), (target, scenario), lambda: sub, f'forecast_{target}_{scenario}_{model_sel}')
 
 # Inclusion Projections
 elif section == 'Inclusion Projections':
@@ -205,9 +220,9 @@ elif section == 'Downloads':
         st.markdown('### Combined Dataset')
         codes = sorted(obs['indicator_code'].dropna().unique().tolist())
         filt_code = st.selectbox('Filter by indicator (optional)', options=['(all)'] + codes, index=0)
-        df_dl = obs.copy() if filt_code=='(all)' else obs[obs['indicator_code']==filt_code].copy()
-        st.dataframe(df_dl[['observation_date','indicator_code','value_numeric']].head(50), use_container_width=True)
-        st.download_button('Download combined (CSV)', df_dl.to_csv(index=False).encode('utf-8'), file_name=('combined_filtered.csv' if filt_code!='(all)' else 'combined.csv'), mime='text/csv')
+        select_rows = (lambda: obs) if filt_code=='(all)' else (lambda: obs[obs['indicator_code']==filt_code])
+        st.dataframe(select_rows()[['observation_date','indicator_code','value_numeric']].head(50), use_container_width=True)
+        lazy_download('Download combined', 'downloads_combined', data.version('combined'), filt_code, select_rows, ('combined_filtered' if filt_code!='(all)' else 'combined'))
 
     st.markdown('---')
     # Forecast table download
@@ -220,23 +235,23 @@ elif section == 'Downloads':
         mdl = st.selectbox('Model', options=['baseline_forecast','with_events_forecast'], index=1)
         sub = forecast_df[(forecast_df['target']==tgt) & (forecast_df['scenario']==scen)].copy()
         st.dataframe(sub[['target','scenario','year',mdl,'lower_95','upper_95','event_delta']], use_container_width=True)
-        st.download_button('Download forecast (filtered CSV)', sub.to_csv(index=False).encode('utf-8'), file_name=f'forecast_{tgt}_{scen}_{mdl}.csv', mime='text/csv')
+        lazy_download('Download forecast (filtered)', 'downloads_forecast', data.version('forecast'), (tgt, scen), lambda: sub, f'forecast_{tgt}_{scen}_{mdl}')
 
     st.markdown('---')
     # Impact association matrix: show heatmap + download
     st.markdown('### Event–Indicator Association (Trimmed)')
-    if MATRIX_TRIM_CSV.exists():
-        mat = pd.read_csv(MATRIX_TRIM_CSV)
-        # Identify id column for rows
-        id_col = 'event_id' if 'event_id' in mat.columns else mat.columns[0]
-        mat_long = mat.melt(id_vars=[id_col], var_name='indicator', value_name='effect')
+    mat_long = data.get('association')
+    if mat_long is not None:
+        # Non-zero cells only, read in long form from the sparse matrix
         hm = alt.Chart(mat_long).mark_rect().encode(
             x=alt.X('indicator:N', title='Indicator'),
-            y=alt.Y(f'{id_col}:N', title='Event'),
+            y=alt.Y('event_id:N', title='Event'),
             color=alt.Color('effect:Q', scale=alt.Scale(scheme='redblue'), title='Effect'),
-            tooltip=['indicator','effect', id_col]
+            tooltip=['indicator','effect','event_id']
         ).properties(height=400)
         st.altair_chart(hm, use_container_width=True)
-        st.download_button('Download association matrix (trimmed CSV)', mat.to_csv(index=False).encode('utf-8'), file_name='event_indicator_association_trimmed.csv', mime='text/csv')
+        mat = data.get('matrix_trimmed')
+        if mat is not None:
+            lazy_download('Download association matrix (trimmed)', 'downloads_matrix', data.version('matrix_trimmed'), 'trimmed', lambda: mat, 'event_indicator_association_trimmed')
     else:
-        st.info('No trimmed association matrix CSV found.')
+        st.info('No association matrix found (run src/build_event_indicator_matrix.py).')
@@ -0,0 +1,186 @@
+"""
+Sparse (coordinate-format) event x indicator association matrix
+"""
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SparseAssociationMatrix:
+    """
+    Event x indicator effects stored as (row, col, value) triplets
+
+    Only non-zero cells are kept, sorted row-major so each event's cells are
+    contiguous (rows can be sliced CSR-style through indptr). Duplicate cells
+    are combined on construction and explicit zeros dropped.
+    """
+
+    def __init__(self, row_labels, col_labels, rows, cols, data,
+                 row_name: str = 'event_id', col_name: str = 'indicator'):
+        self.row_labels = np.asarray(row_labels, dtype=object)
+        self.col_labels = np.asarray(col_labels, dtype=object)
+        self.row_name = row_name
+        self.col_name = col_name
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        data = np.asarray(data, dtype=float)
+        # Sum duplicate cells (np.unique also sorts the keys row-major), then drop zeros
+        width = max(len(self.col_labels), 1)
+        cells, inverse = np.unique(rows * width + cols, return_inverse=True)
+        totals = np.bincount(inverse, weights=data, minlength=len(cells))
+        keep = totals != 0
+        self.rows = cells[keep] // width
+        self.cols = cells[keep] % width
+        self.data = totals[keep]
+
+    @classmethod
+    def from_long(cls, df: pd.DataFrame, row: str = 'event_id', col: str = 'indicator',
+                  value: str = 'effect', agg: str = 'sum') -> 'SparseAssociationMatrix':
+        """
+        Build from long-form records, combining duplicate cells
+
+        Args:
+            df: One row per (row, col) contribution
+            row, col, value: Column names
+            agg: 'sum' or 'mean' for duplicate cells
+
+        Returns:
+            SparseAssociationMatrix: Labels sorted, rows named after `row`
+        """
+        if agg not in ('sum', 'mean'):
+            raise ValueError(f"Unsupported aggregation: {agg}")
+        values = pd.to_numeric(df[value], errors='coerce').to_numpy(dtype=float)
+        ok = ~np.isnan(values) & df[row].notna().to_numpy() & df[col].notna().to_numpy()
+        r, row_labels = pd.factorize(df[row].to_numpy()[ok], sort=True)
+        c, col_labels = pd.factorize(df[col].to_numpy()[ok], sort=True)
+        key = r.astype(np.int64) * max(len(col_labels), 1) + c
+        cells, inverse = np.unique(key, return_inverse=True)
+        totals = np.bincount(inverse, weights=values[ok], minlength=len(cells))
+        if agg == 'mean':
+            totals = totals / np.bincount(inverse, minlength=len(cells))
+        width = max(len(col_labels), 1)
+        return cls(row_labels, col_labels, cells // width, cells % width, totals, row_name=row, col_name=col)
+
+    @classmethod
+    def from_dense(cls, matrix: pd.DataFrame) -> 'SparseAssociationMatrix':
+        """Build from a dense event x indicator frame"""
+        values = matrix.to_numpy(dtype=float)
+        r, c = np.nonzero(values)
+        return cls(matrix.index.to_numpy(), matrix.columns.to_numpy(), r, c, values[r, c],
+                   row_name=matrix.index.name or 'event_id', col_name=matrix.columns.name or 'indicator')
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.row_labels), len(self.col_labels)
+
+    @property
+    def nnz(self) -> int:
+        return len(self.data)
+
+    @property
+    def density(self) -> float:
+        cells = self.shape[0] * self.shape[1]
+        return self.nnz / cells if cells else 0.0
+
+    @property
+    def indptr(self) -> np.ndarray:
+        """CSR row pointer: cells of row i are [indptr[i], indptr[i + 1])"""
+        return np.searchsorted(self.rows, np.arange(self.shape[0] + 1))
+
+    def __repr__(self) -> str:
+        return f"SparseAssociationMatrix(shape={self.shape}, nnz={self.nnz})"
+
+    def row_sums(self) -> pd.Series:
+        return pd.Series(np.bincount(self.rows, weights=self.data, minlength=self.shape[0]),
+                         index=pd.Index(self.row_labels, name=self.row_name))
+
+    def col_sums(self) -> pd.Series:
+        return pd.Series(np.bincount(self.cols, weights=self.data, minlength=self.shape[1]),
+                         index=pd.Index(self.col_labels, name=self.col_name))
+
+    def row(self, label) -> pd.Series:
+        """Non-zero effects of one event"""
+        pos = np.flatnonzero(self.row_labels == label)
+        if not len(pos):
+            raise KeyError(label)
+        start, stop = self.indptr[pos[0]:pos[0] + 2]
+        return pd.Series(self.data[start:stop], index=pd.Index(self.col_labels[self.cols[start:stop]], name=self.col_name),
+                         name=label)
+
+    def trim(self) -> 'SparseAssociationMatrix':
+        """
+        Drop rows and columns whose sums are zero (same rule as the dense
+        trimmed CSV), without building the dense matrix
+        """
+        keep_r = self.row_sums().to_numpy() != 0
+        keep_c = self.col_sums().to_numpy() != 0
+        cell = keep_r[self.rows] & keep_c[self.cols]
+        new_r = np.cumsum(keep_r) - 1
+        new_c = np.cumsum(keep_c) - 1
+        return SparseAssociationMatrix(self.row_labels[keep_r], self.col_labels[keep_c],
+                                       new_r[self.rows[cell]], new_c[self.cols[cell]], self.data[cell],
+                                       row_name=self.row_name, col_name=self.col_name)
+
+    def to_long(self, value: str = 'effect') -> pd.DataFrame:
+        """Non-zero cells as a (row_name, col_name, value) frame"""
+        return pd.DataFrame({
+            self.row_name: self.row_labels[self.rows],
+            self.col_name: self.col_labels[self.cols],
+            value: self.data,
+        })
+
+    def to_dense(self) -> pd.DataFrame:
+        """Dense event x indicator frame (zeros filled)"""
+        values = np.zeros(self.shape)
+        values[self.rows, self.cols] = self.data
+        return pd.DataFrame(values, index=pd.Index(self.row_labels, name=self.row_name),
+                            columns=pd.Index(self.col_labels, name=self.col_name))
+
+    def save(self, path) -> Path:
+        """
+        Persist as a compressed .npz (labels as unicode arrays, no pickling)
+
+        Returns:
+            Path: The written file
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            row_labels=self.row_labels.astype(str), col_labels=self.col_labels.astype(str),
+            rows=self.rows.astype(np.int32), cols=self.cols.astype(np.int32), data=self.data,
+            names=np.array([self.row_name, self.col_name]),
+        )
+        logger.info(f"Saved {self!r} to {path}")
+        return path
+
+    @classmethod
+    def load(cls, path) -> 'SparseAssociationMatrix':
+        """Read a matrix written by save()"""
+        with np.load(path, allow_pickle=False) as f:
+            row_name, col_name = f['names'].tolist()
+            return cls(f['row_labels'], f['col_labels'], f['rows'], f['cols'], f['data'],
+                       row_name=row_name, col_name=col_name)
+
+
+def load_association_long(npz_path, trimmed_csv: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    Long-form (event_id, indicator, effect) non-zero cells of the trimmed matrix
+
+    Reads the sparse .npz when present, otherwise melts the dense trimmed CSV.
+
+    Returns:
+        pd.DataFrame or None: None when neither file exists
+    """
+    if npz_path is not None and Path(npz_path).exists():
+        return SparseAssociationMatrix.load(npz_path).trim().to_long()
+    if trimmed_csv is not None and Path(trimmed_csv).exists():
+        mat = pd.read_csv(trimmed_csv)
+        id_col = 'event_id' if 'event_id' in mat.columns else mat.columns[0]
+        long = mat.melt(id_vars=[id_col], var_name='indicator', value_name='effect')
+        return long[long['effect'] != 0].rename(columns={id_col: 'event_id'}).reset_index(drop=True)
+    return None
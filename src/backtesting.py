@@ -0,0 +1,340 @@
+"""
+Rolling-origin backtesting of the trend and trend + event forecasts, with cached per-fold fits
+"""
+import sys
+import argparse
+import hashlib
+import logging
+import os
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+if __name__ == '__main__':
+    # Run as a script (python src/backtesting.py): make the repo root importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.data_loader import DEFAULT_CACHE_DIR, DEFAULT_DATA_PATH, load_unified_data, partition_by_record_type
+from src.forecasting import INTERVALS, EffectKernel, SeriesKey, anchored_forecast, effect_kernel, yearly_series
+from src.indicator_store import IndicatorStore
+from src.trend_fitting import fit_trends, stack_series
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKTEST_CACHE = os.path.join(DEFAULT_CACHE_DIR, 'backtest')
+DEFAULT_PREDICTIONS_PATH = "data/processed/backtest_predictions.csv"
+DEFAULT_SUMMARY_PATH = "data/processed/backtest_summary.csv"
+
+BACKTEST_MODELS = ('trend', 'trend_events')
+
+KEY_COLUMNS = ['target', 'gender', 'location']
+FIT_COLUMNS = ['slope', 'intercept', 'n', 'rmse', 'resid_sd', 'x_mean', 'sxx']
+FOLD_COLUMNS = KEY_COLUMNS + ['train_hash', 'anchor_year', 'anchor_value'] + FIT_COLUMNS
+PREDICTION_COLUMNS = KEY_COLUMNS + ['model', 'origin', 'year', 'horizon', 'actual', 'forecast', 'lower', 'upper']
+
+# Training series handed to the fold workers once (set by _init_worker)
+_SHARED: Dict = {}
+
+
+def train_hash(years: np.ndarray, values: np.ndarray) -> str:
+    """Content hash of one series' training window"""
+    return hashlib.sha1(np.concatenate([years, values]).astype(float).tobytes()).hexdigest()
+
+
+def fold_origins(series: Dict[SeriesKey, Tuple], min_train: int = 3, max_horizon: int = 5) -> List[int]:
+    """
+    Forecast origins (last training year) with at least one series to evaluate
+
+    A year is an origin for a series when the series is observed in it, has
+    min_train years up to and including it, and has an observation within
+    max_horizon years after it.
+    """
+    origins = set()
+    for years, _, _ in series.values():
+        years = years.astype(int)
+        for i in range(min_train - 1, len(years) - 1):
+            if years[i + 1] - years[i] <= max_horizon:
+                origins.add(int(years[i]))
+    return sorted(origins)
+
+
+def _fold_training(series: Dict[SeriesKey, Tuple], origin: int, min_train: int) -> Dict[SeriesKey, Tuple]:
+    """Training windows (years <= origin) of the series observed at the origin with enough history"""
+    window = {}
+    for key, (years, values, _) in series.items():
+        keep = years <= origin
+        if keep.sum() >= min_train and years[keep][-1] == origin:
+            window[key] = (years[keep], values[keep])
+    return window
+
+
+def fit_fold(training: Dict[SeriesKey, Tuple]) -> pd.DataFrame:
+    """
+    Fitted state of every series in one fold (one batched least-squares solve)
+
+    Returns:
+        pd.DataFrame: FOLD_COLUMNS; the anchor is the last training year
+    """
+    keys = sorted(training)
+    if not keys:
+        return pd.DataFrame(columns=FOLD_COLUMNS)
+    fit = fit_trends(*stack_series(training[k] for k in keys))
+    state = pd.DataFrame(keys, columns=KEY_COLUMNS)
+    state['train_hash'] = [train_hash(*training[k]) for k in keys]
+    state['anchor_year'] = [float(training[k][0][-1]) for k in keys]
+    state['anchor_value'] = [float(training[k][1][-1]) for k in keys]
+    for name in FIT_COLUMNS:
+        state[name] = fit[name]
+    return state[FOLD_COLUMNS]
+
+
+def _init_worker(shared: Dict) -> None:
+    _SHARED.clear()
+    _SHARED.update(shared)
+
+
+def _fit_fold_task(task: Tuple[int, List[SeriesKey]]) -> Tuple[int, pd.DataFrame]:
+    origin, keys = task
+    training = _fold_training({k: _SHARED['series'][k] for k in keys}, origin, _SHARED['min_train'])
+    return origin, fit_fold(training)
+
+
+def _fold_format() -> str:
+    """Parquet when pyarrow is available, CSV otherwise"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return 'csv'
+    return 'parquet'
+
+
+def _cache_file(cache_dir: str, origin: int, fmt: str) -> Path:
+    return Path(cache_dir) / f"fold-{origin}.{fmt}"
+
+
+def _read_fold(cache_dir: Optional[str], origin: int, fmt: str) -> Optional[pd.DataFrame]:
+    if cache_dir is None or not _cache_file(cache_dir, origin, fmt).exists():
+        return None
+    path = _cache_file(cache_dir, origin, fmt)
+    if fmt == 'csv':
+        # round_trip keeps the cached fits bit-identical to a fresh fit
+        return pd.read_csv(path, dtype={c: str for c in KEY_COLUMNS + ['train_hash']}, keep_default_na=False,
+                           float_precision='round_trip')
+    return pd.read_parquet(path)
+
+
+def _write_fold(cache_dir: Optional[str], origin: int, state: pd.DataFrame, fmt: str) -> None:
+    if cache_dir is None:
+        return
+    path = _cache_file(cache_dir, origin, fmt)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    if fmt == 'csv':
+        state.to_csv(tmp, index=False)
+    else:
+        state.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def fit_folds(series: Dict[SeriesKey, Tuple], origins: Sequence[int], min_train: int = 3,
+              cache_dir: Optional[str] = DEFAULT_BACKTEST_CACHE,
+              max_workers: Optional[int] = None) -> Dict[int, pd.DataFrame]:
+    """
+    Fitted state per fold, refitting only series whose training window changed
+
+    Each fold's state is cached as fold-<origin>.parquet (.csv without
+    pyarrow) in cache_dir with a hash of every series' training window.
+    On a re-run, rows whose hash still
+    matches are reused, so adding a year of data only fits the new fold(s)
+    and series whose history was revised. Folds with work left are fitted in
+    a ProcessPoolExecutor.
+
+    Args:
+        series: forecasting.yearly_series output
+        origins: Fold origins (see fold_origins)
+        min_train: Minimum training years per series
+        cache_dir: Fold cache directory (None disables caching)
+        max_workers: Process count (default os.cpu_count(); 1 runs inline)
+
+    Returns:
+        dict: origin -> FOLD_COLUMNS frame
+    """
+    fmt = _fold_format()
+
+    states, tasks = {}, []
+    for origin in origins:
+        training = _fold_training(series, origin, min_train)
+        hashes = {k: train_hash(*v) for k, v in training.items()}
+        cached = _read_fold(cache_dir, origin, fmt)
+        fresh = set(training)
+        if cached is not None:
+            cached_keys = list(cached[KEY_COLUMNS].itertuples(index=False, name=None))
+            valid = np.array([hashes.get(k) == h for k, h in zip(cached_keys, cached['train_hash'])], dtype=bool)
+            cached = cached[valid].reset_index(drop=True)
+            fresh -= {k for k, ok in zip(cached_keys, valid) if ok}
+        states[origin] = cached
+        if fresh:
+            tasks.append((origin, sorted(fresh)))
+
+    shared = {'series': series, 'min_train': min_train}
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(tasks)))
+    if workers == 1:
+        _init_worker(shared)
+        results = [_fit_fold_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shared,)) as pool:
+            results = list(pool.map(_fit_fold_task, tasks))
+
+    refit = 0
+    for origin, state in results:
+        refit += len(state)
+        if states[origin] is not None and len(states[origin]):
+            state = pd.concat([states[origin], state], ignore_index=True)
+        states[origin] = state.sort_values(KEY_COLUMNS, ignore_index=True)
+        _write_fold(cache_dir, origin, states[origin], fmt)
+    total = sum(len(s) for s in states.values() if s is not None)
+    logger.info(f"Backtest folds: {len(origins)} origins, refitted {refit} of {total} series fits "
+                f"({len(tasks)} fold(s) on {workers} worker(s))")
+    return {o: s if s is not None else pd.DataFrame(columns=FOLD_COLUMNS) for o, s in states.items()}
+
+
+def evaluate_fold(state: pd.DataFrame, origin: int, series: Dict[SeriesKey, Tuple],
+                  kernel: EffectKernel, max_horizon: int = 5, interval: str = 'prediction') -> pd.DataFrame:
+    """
+    Score one fold's fitted state against the observed years after the origin
+
+    Returns:
+        pd.DataFrame: PREDICTION_COLUMNS for both BACKTEST_MODELS
+    """
+    if state.empty:
+        return pd.DataFrame(columns=PREDICTION_COLUMNS)
+    keys = list(state[KEY_COLUMNS].itertuples(index=False, name=None))
+    horizon_years = list(range(origin + 1, origin + max_horizon + 1))
+    fit = {name: state[name].to_numpy(dtype=float) for name in FIT_COLUMNS}
+    anchor_years = state['anchor_year'].to_numpy(dtype=float)
+    yhat, lo, hi = anchored_forecast(fit, state['anchor_value'].to_numpy(dtype=float), anchor_years,
+                                     horizon_years, 1.0, interval)
+
+    # Actuals on the (series, horizon year) grid
+    actual = np.full(yhat.shape, np.nan)
+    is_percent = np.zeros(len(keys), dtype=bool)
+    for i, key in enumerate(keys):
+        years, values, is_percent[i] = series[key]
+        later = (years > origin) & (years <= origin + max_horizon)
+        actual[i, years[later].astype(int) - origin - 1] = values[later]
+    deltas = kernel.deltas([k[0] for k in keys], horizon_years, anchor_years)
+
+    rows, cols = np.nonzero(~np.isnan(actual))
+    frames = []
+    for model, shift in zip(BACKTEST_MODELS, (0.0, deltas)):
+        forecast = yhat + shift
+        lower, upper = lo + shift, hi + shift
+        forecast = np.where(is_percent[:, None], np.clip(forecast, 0, 100), forecast)
+        frame = state.iloc[rows][KEY_COLUMNS].reset_index(drop=True)
+        frame['model'] = model
+        frame['origin'] = origin
+        frame['year'] = np.asarray(horizon_years)[cols]
+        frame['horizon'] = cols + 1
+        frame['actual'] = actual[rows, cols]
+        frame['forecast'] = forecast[rows, cols]
+        frame['lower'] = lower[rows, cols]
+        frame['upper'] = upper[rows, cols]
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)[PREDICTION_COLUMNS]
+
+
+def rolling_origin_backtest(observations, impact_links: Optional[pd.DataFrame] = None,
+                            events: Optional[pd.DataFrame] = None, indicator_codes: Optional[List[str]] = None,
+                            min_train: int = 3, max_horizon: int = 5, interval: str = 'prediction',
+                            cache_dir: Optional[str] = DEFAULT_BACKTEST_CACHE,
+                            max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Rolling-origin evaluation of the trend and trend + event models
+
+    For every origin year, each series is fitted on the years up to the
+    origin, forecast from its last training value (as forecasting.forecast_all
+    does) and compared with the observations up to max_horizon years later.
+    The trend + event model adds the change in ramped event effect between
+    the anchor year and the target year.
+
+    Args:
+        observations: Observations dataframe or a prebuilt IndicatorStore
+        impact_links, events: Links and events for the trend + event model
+        indicator_codes: Restrict to these indicators
+        min_train: Minimum training years per fold
+        max_horizon: Longest horizon scored, in years
+        interval: 'prediction' or 'band' (see forecasting.anchored_forecast)
+        cache_dir: Fold cache directory (None disables caching)
+        max_workers: Processes used to fit folds
+
+    Returns:
+        pd.DataFrame: PREDICTION_COLUMNS, one row per model x series x origin x scored year
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"Unknown interval: {interval}")
+    store = observations if isinstance(observations, IndicatorStore) else IndicatorStore(observations)
+    series = yearly_series(store, indicator_codes)
+    origins = fold_origins(series, min_train, max_horizon)
+    if not origins:
+        return pd.DataFrame(columns=PREDICTION_COLUMNS)
+    states = fit_folds(series, origins, min_train, cache_dir, max_workers)
+
+    kernel = effect_kernel(impact_links, events)
+    frames = [evaluate_fold(states[o], o, series, kernel, max_horizon, interval) for o in origins]
+    return pd.concat(frames, ignore_index=True)
+
+
+def accuracy_table(predictions: pd.DataFrame, by: Sequence[str] = ('model', 'horizon')) -> pd.DataFrame:
+    """
+    MAE, MAPE (%, zero actuals excluded) and interval coverage per group
+
+    Args:
+        predictions: rolling_origin_backtest output
+        by: Grouping columns, e.g. ('model',), ('model', 'horizon') or ('model', 'target')
+
+    Returns:
+        pd.DataFrame: by columns plus n, mae, mape and coverage
+    """
+    df = predictions.copy()
+    err = (df['forecast'] - df['actual']).abs()
+    df['abs_error'] = err
+    df['ape'] = (err / df['actual'].abs()).where(df['actual'] != 0) * 100
+    df['covered'] = ((df['actual'] >= df['lower']) & (df['actual'] <= df['upper'])).where(df['lower'].notna())
+    table = df.groupby(list(by), sort=True).agg(n=('abs_error', 'size'), mae=('abs_error', 'mean'),
+                                                mape=('ape', 'mean'), coverage=('covered', 'mean'))
+    return table.reset_index()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--data', type=Path, default=Path(DEFAULT_DATA_PATH), help='Unified data CSV')
+    parser.add_argument('--out', type=Path, default=Path(DEFAULT_PREDICTIONS_PATH), help='Per-forecast CSV')
+    parser.add_argument('--summary', type=Path, default=Path(DEFAULT_SUMMARY_PATH), help='Accuracy table CSV')
+    parser.add_argument('--min-train', type=int, default=3)
+    parser.add_argument('--max-horizon', type=int, default=5)
+    parser.add_argument('--interval', choices=INTERVALS, default='prediction')
+    parser.add_argument('--cache-dir', default=DEFAULT_BACKTEST_CACHE)
+    parser.add_argument('--no-cache', action='store_true', help='Refit every fold')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    df = load_unified_data(str(args.data), use_cache=True)
+    parts = partition_by_record_type(df, normalize=False)
+    predictions = rolling_origin_backtest(parts['observations'], parts['impact_links'], parts['events'],
+                                          min_train=args.min_train, max_horizon=args.max_horizon,
+                                          interval=args.interval,
+                                          cache_dir=None if args.no_cache else args.cache_dir,
+                                          max_workers=args.workers)
+    summary = accuracy_table(predictions)
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.summary.parent.mkdir(parents=True, exist_ok=True)
+    predictions.to_csv(args.out, index=False)
+    summary.to_csv(args.summary, index=False)
+    print(summary.to_string(index=False))
+    print(f"Wrote {args.out} ({len(predictions)} rows) and {args.summary}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -1,54 +1,205 @@
-
+"""
+Build the event x indicator association matrix, recomputing only events whose links changed
+"""
+import sys
+import argparse
+import hashlib
+import logging
 import pandas as pd
+import numpy as np
 from pathlib import Path
+from typing import List, Optional, Tuple
+
+if __name__ == '__main__':
+    # Run as a script (python src/build_event_indicator_matrix.py): make the repo root importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.data_loader import DEFAULT_CACHE_DIR, load_unified_data, partition_by_record_type
+from src.association_matrix import SparseAssociationMatrix
+from src.events_impact_modeler import link_effects
+
+logger = logging.getLogger(__name__)
 
 DATA_PATH = Path('data/processed/ethiopia_fi_unified_data_combined.csv')
 OUT_CSV = Path('data/processed/event_indicator_association.csv')
 OUT_TRIM = Path('data/processed/event_indicator_association_trimmed.csv')
+OUT_HASHES = Path('data/processed/event_indicator_association_hashes.csv')
+OUT_NPZ = Path('data/processed/event_indicator_association.npz')
 OUT_PNG = Path('reports/figures/event_indicator_heatmap_trimmed.png')
 
-# Load
-df = pd.read_csv(DATA_PATH)
-impact_links = df[df['record_type']=='impact_link'].copy()
-events = df[df['record_type']=='event'].copy()
+# Link fields that determine an event's matrix row
+HASH_COLUMNS = ['related_indicator', 'impact_magnitude', 'impact_direction']
+
+
+def link_hashes(links: pd.DataFrame) -> pd.Series:
+    """
+    Content hash of each event's links (independent of row order)
+
+    Returns:
+        pd.Series: event_id -> sha1 hex digest
+    """
+    if links.empty:
+        return pd.Series(dtype=str, name='link_hash', index=pd.Index([], name='event_id'))
+    cols = [c for c in HASH_COLUMNS if c in links.columns]
+    keyed = links[['parent_id'] + cols].astype(object)
+    # Missing fields read back as NaN from CSV but None from the parquet cache
+    keyed = keyed.where(keyed.notna(), '').astype(str)
+    row_hash = pd.util.hash_pandas_object(keyed[cols], index=False).to_numpy()
+    order = np.lexsort((row_hash, keyed['parent_id'].to_numpy()))
+    event_ids = keyed['parent_id'].to_numpy()[order]
+    row_hash = row_hash[order]
+    starts = np.flatnonzero(np.r_[True, event_ids[1:] != event_ids[:-1]])
+    stops = np.r_[starts[1:], len(event_ids)]
+    digests = [hashlib.sha1(row_hash[a:b].tobytes()).hexdigest() for a, b in zip(starts, stops)]
+    return pd.Series(digests, index=pd.Index(event_ids[starts], name='event_id'), name='link_hash')
+
+
+def _event_links(impact_links: pd.DataFrame, events: pd.DataFrame) -> pd.DataFrame:
+    """Links whose parent event exists, with related_indicator and effect filled"""
+    links = impact_links[impact_links['parent_id'].isin(events['record_id'])].copy()
+    if 'related_indicator' not in links.columns:
+        links['related_indicator'] = links['indicator_code']
+    links['effect'] = link_effects(links) if len(links) else pd.Series(dtype=float)
+    return links
+
+
+def _pivot(links: pd.DataFrame) -> pd.DataFrame:
+    if links.empty:
+        return pd.DataFrame(index=pd.Index([], name='event_id'), dtype=float)
+    return links.pivot_table(index='parent_id', columns='related_indicator', values='effect',
+                             aggfunc='sum', fill_value=0).rename_axis(index='event_id')
+
+
+def build_matrix(impact_links: pd.DataFrame, events: pd.DataFrame,
+                 previous: Optional[pd.DataFrame] = None,
+                 previous_hashes: Optional[pd.Series] = None) -> Tuple[pd.DataFrame, pd.Series, List[str]]:
+    """
+    Build the association matrix, reusing unchanged rows of a previous build
+
+    Args:
+        impact_links: Impact link records
+        events: Event records
+        previous: Matrix from an earlier build (event_id x indicator)
+        previous_hashes: link_hashes from that build
 
-# Merge
-links = impact_links.merge(events.rename(columns={'record_id':'event_id'}), left_on='parent_id', right_on='event_id', how='left')
+    Returns:
+        tuple: (matrix, link hashes, event_ids whose rows were recomputed or dropped)
+    """
+    links = _event_links(impact_links, events)
+    hashes = link_hashes(links)
+    if previous is None or previous_hashes is None:
+        return _pivot(links), hashes, hashes.index.tolist()
 
-# Map magnitudes/directions
+    old = previous_hashes.reindex(hashes.index)
+    changed = hashes.index[old.to_numpy() != hashes.to_numpy()]
+    removed = previous_hashes.index.difference(hashes.index)
+    stale = changed.union(removed)
+    if not len(stale):
+        return previous, hashes, []
 
-def to_numeric_mag(x):
-    try:
-        return float(x)
-    except Exception:
-        s = str(x).strip().lower()
-        return {'low':0.5,'medium':1.0,'high':1.5}.get(s, 1.0)
+    kept = previous.drop(index=previous.index.intersection(stale))
+    fresh = _pivot(links[links['parent_id'].isin(changed)])
+    matrix = pd.concat([kept, fresh]).fillna(0)
+    # Same columns as a full pivot: every indicator with at least one link
+    columns = sorted(links['related_indicator'].dropna().unique())
+    matrix = matrix.reindex(columns=columns, fill_value=0).sort_index()
+    matrix.columns.name = 'related_indicator'
+    logger.info(f"Recomputed {len(changed)} event rows, dropped {len(removed)}, reused {len(kept)}")
+    return matrix, hashes, stale.tolist()
 
-links['mag_num'] = links['impact_magnitude'].apply(to_numeric_mag)
-links['dir_num'] = links['impact_direction'].map({'positive':1,'negative':-1}).fillna(1)
-links['effect'] = links['mag_num'] * links['dir_num']
 
-col_name = 'related_indicator' if 'related_indicator' in links.columns else 'indicator_code'
-mat = links.pivot_table(index='event_id', columns=col_name, values='effect', aggfunc='sum', fill_value=0)
+def build_sparse_matrix(impact_links: pd.DataFrame, events: pd.DataFrame) -> SparseAssociationMatrix:
+    """Sparse association matrix built straight from the links (no dense pivot)"""
+    links = _event_links(impact_links, events)[['parent_id', 'related_indicator', 'effect']]
+    links = links.rename(columns={'parent_id': 'event_id', 'related_indicator': 'indicator'})
+    return SparseAssociationMatrix.from_long(links, row='event_id', col='indicator', value='effect')
 
-# Save full matrix
-OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
-mat.to_csv(OUT_CSV)
 
-# Trim to non-zero rows/cols
-mat_trim = mat.loc[(mat.sum(axis=1)!=0), (mat.sum(axis=0)!=0)]
-mat_trim.to_csv(OUT_TRIM)
+def trim_matrix(matrix: pd.DataFrame) -> pd.DataFrame:
+    """Keep only rows and columns with a non-zero sum"""
+    return matrix.loc[(matrix.sum(axis=1) != 0), (matrix.sum(axis=0) != 0)]
 
-# Try plotting heatmap; fallback gracefully if matplotlib/seaborn unavailable
-try:
+
+def plot_heatmap(mat_trim: pd.DataFrame, out_png: Path) -> None:
     import seaborn as sns
     import matplotlib.pyplot as plt
-    OUT_PNG.parent.mkdir(parents=True, exist_ok=True)
+    out_png.parent.mkdir(parents=True, exist_ok=True)
     plt.figure(figsize=(max(8, 0.6*mat_trim.shape[1]), max(6, 0.4*mat_trim.shape[0])))
     sns.heatmap(mat_trim, cmap='RdBu_r', center=0)
     plt.title('Event–Indicator Association (non-zero only)')
     plt.tight_layout()
-    plt.savefig(OUT_PNG)
-    print(f"Saved matrix to {OUT_CSV}, trimmed to {OUT_TRIM}, heatmap to {OUT_PNG}")
-except Exception as e:
-    print(f"Saved matrix to {OUT_CSV} and {OUT_TRIM}. Heatmap skipped: {e}")
+    plt.savefig(out_png)
+    plt.close()
+
+
+def update_matrix(data_path: Path = DATA_PATH, out_csv: Path = OUT_CSV, out_trim: Path = OUT_TRIM,
+                  out_hashes: Path = OUT_HASHES, out_png: Optional[Path] = OUT_PNG,
+                  full: bool = False, out_npz: Optional[Path] = OUT_NPZ,
+                  cache_dir: str = DEFAULT_CACHE_DIR) -> List[str]:
+    """
+    Rebuild the persisted matrix, touching only events whose links changed
+
+    Args:
+        data_path: Combined unified CSV
+        out_csv, out_trim, out_hashes: Matrix, trimmed matrix and link-hash files
+        out_png: Heatmap path (None to skip plotting)
+        out_npz: Sparse matrix for the dashboard (None to skip)
+        full: Ignore the persisted state and recompute every row
+        cache_dir: Directory for the columnar cache of data_path
+
+    Returns:
+        list: event_ids that were recomputed or dropped
+    """
+    df = load_unified_data(str(data_path), use_cache=True, cache_dir=str(cache_dir),
+                           record_types=['impact_link', 'event'])
+    parts = partition_by_record_type(df, normalize=False)
+
+    previous = previous_hashes = None
+    if not full and out_csv.exists() and out_hashes.exists():
+        previous = pd.read_csv(out_csv, index_col='event_id')
+        previous.columns.name = 'related_indicator'
+        previous_hashes = pd.read_csv(out_hashes, index_col='event_id')['link_hash']
+
+    mat, hashes, stale = build_matrix(parts['impact_links'], parts['events'], previous, previous_hashes)
+    outputs_present = all(p is None or p.exists() for p in (out_png, out_npz))
+    if previous is not None and not stale and outputs_present:
+        print(f"No event links changed; {out_csv} is up to date")
+        return stale
+
+    out_csv.parent.mkdir(parents=True, exist_ok=True)
+    mat.to_csv(out_csv)
+    hashes.to_csv(out_hashes)
+    mat_trim = trim_matrix(mat)
+    mat_trim.to_csv(out_trim)
+    if out_npz is not None:
+        build_sparse_matrix(parts['impact_links'], parts['events']).save(out_npz)
+    print(f"Saved matrix to {out_csv} ({len(stale)} event rows rebuilt), trimmed to {out_trim}")
+
+    if out_png is not None:
+        # Fall back gracefully if matplotlib/seaborn are unavailable
+        try:
+            plot_heatmap(mat_trim, out_png)
+            print(f"Saved heatmap to {out_png}")
+        except Exception as e:
+            print(f"Heatmap skipped: {e}")
+    return stale
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--data', type=Path, default=DATA_PATH, help='Combined unified CSV')
+    parser.add_argument('--out', type=Path, default=OUT_CSV, help='Full matrix CSV')
+    parser.add_argument('--trimmed', type=Path, default=OUT_TRIM, help='Trimmed matrix CSV')
+    parser.add_argument('--hashes', type=Path, default=OUT_HASHES, help='Per-event link hash CSV')
+    parser.add_argument('--npz', type=Path, default=OUT_NPZ, help='Sparse matrix (.npz)')
+    parser.add_argument('--png', type=Path, default=OUT_PNG, help='Heatmap image')
+    parser.add_argument('--no-plot', action='store_true', help='Skip the heatmap')
+    parser.add_argument('--full', action='store_true', help='Recompute every row')
+    parser.add_argument('--cache-dir', type=Path, default=Path(DEFAULT_CACHE_DIR), help='Columnar cache directory')
+    args = parser.parse_args(argv)
+    update_matrix(args.data, args.out, args.trimmed, args.hashes, None if args.no_plot else args.png, args.full,
+                  args.npz, args.cache_dir)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
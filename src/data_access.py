@@ -0,0 +1,215 @@
+"""
+File-version-aware, memory-bounded dataset cache shared by the dashboard
+"""
+import hashlib
+import sys
+import threading
+import pandas as pd
+import numpy as np
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+
+from src.data_loader import file_fingerprint
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def estimate_nbytes(obj: Any) -> int:
+    """Approximate in-memory size of a dataset (frames, arrays and containers of them)"""
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        usage = obj.memory_usage(deep=True, index=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sum(estimate_nbytes(k) + estimate_nbytes(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set)):
+        return sum(estimate_nbytes(v) for v in obj)
+    if hasattr(obj, '__dict__'):
+        return estimate_nbytes(vars(obj))
+    return sys.getsizeof(obj)
+
+
+def _content_hash(paths: Sequence[Path]) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        if not path.exists():
+            digest.update(b'\0missing')
+            continue
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DataStore:
+    """
+    Named datasets loaded from files and served from one LRU cache
+
+    Each dataset is registered with the files it is built from and a
+    zero-argument loader. get() stats the files (microseconds) and reloads
+    only when a file's mtime or size changed; with hash_contents=True a
+    changed stat is confirmed against a SHA-256 of the contents first, so a
+    rewrite with identical bytes does not reload. Cached datasets are
+    evicted least-recently-used once their estimated size exceeds max_bytes.
+    An optional background thread (start_watcher) reloads changed files
+    before the next request needs them.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, hash_contents: bool = False):
+        self.max_bytes = max_bytes
+        self.hash_contents = hash_contents
+        self._loaders: Dict[str, Tuple[Tuple[Path, ...], Callable[[], Any]]] = {}
+        # name -> (fingerprints, content hash, value, nbytes)
+        self._entries: 'OrderedDict[str, Tuple]' = OrderedDict()
+        self._lock = threading.RLock()
+        self._load_locks: Dict[str, threading.RLock] = {}
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.size_bytes = 0
+        self.loads = 0
+
+    def register(self, name: str, paths, loader: Callable[[], Any]) -> None:
+        """
+        Declare a dataset
+
+        Args:
+            name: Dataset name
+            paths: File path or list of paths the dataset is derived from
+            loader: Builds the dataset; may call get() for other datasets
+        """
+        paths = (paths,) if isinstance(paths, (str, Path)) else tuple(paths)
+        with self._lock:
+            self._loaders[name] = (tuple(Path(p) for p in paths), loader)
+            self._load_locks.setdefault(name, threading.RLock())
+            self._drop(name)
+
+    def names(self) -> List[str]:
+        return list(self._loaders)
+
+    def version(self, name: str) -> Optional[Tuple]:
+        """
+        Fingerprints of the dataset's files (None for a missing file), or
+        None when none of them exists
+        """
+        paths, _ = self._loaders[name]
+        version = tuple(file_fingerprint(str(p)) if p.exists() else None for p in paths)
+        return version if any(v is not None for v in version) else None
+
+    def get(self, name: str) -> Any:
+        """
+        The dataset, reloaded if its files changed
+
+        The store lock only guards the cache bookkeeping; loading runs under
+        a per-dataset lock, so a slow reload blocks callers of that dataset
+        but not reads of other (cached) datasets.
+
+        Returns:
+            The loader's result, or None when no source file exists
+        """
+        with self._lock:
+            paths, loader = self._loaders[name]
+            load_lock = self._load_locks[name]
+        version = self.version(name)
+        if version is None:
+            with self._lock:
+                self._drop(name)
+            return None
+        cached = self._cached(name, version)
+        if cached is not None:
+            return cached[0]
+
+        with load_lock:
+            # Another caller may have loaded it while we waited
+            cached = self._cached(name, version)
+            if cached is not None:
+                return cached[0]
+            digest = _content_hash(paths) if self.hash_contents else None
+            if digest is not None:
+                cached = self._cached(name, version, digest)
+                if cached is not None:
+                    return cached[0]
+
+            value = loader()
+            nbytes = estimate_nbytes(value)
+            with self._lock:
+                self.loads += 1
+                if self._loaders.get(name, (None, None))[1] is not loader:
+                    # Re-registered while loading; do not cache the old loader's result
+                    return value
+                self._drop(name)
+                self._entries[name] = (version, digest, value, nbytes)
+                self.size_bytes += nbytes
+                self._evict(keep=name)
+            logger.info(f"Loaded dataset {name} ({nbytes / 1e6:.1f} MB cached)")
+            return value
+
+    def _cached(self, name: str, version: Tuple, digest: Optional[str] = None) -> Optional[Tuple[Any]]:
+        """(value,) when the cached entry matches the version (or, given, the content digest)"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            if entry[0] != version:
+                if digest is None or entry[1] != digest:
+                    return None
+                self._entries[name] = (version,) + entry[1:]
+            self._entries.move_to_end(name)
+            return (entry[2],)
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Forget one cached dataset (or all)"""
+        with self._lock:
+            for n in ([name] if name is not None else list(self._entries)):
+                self._drop(n)
+
+    def refresh(self) -> List[str]:
+        """Reload cached datasets whose files changed; returns their names"""
+        with self._lock:
+            stale = [n for n, entry in self._entries.items() if self.version(n) != entry[0]]
+        for name in stale:
+            self.get(name)
+        return stale
+
+    def start_watcher(self, interval: float = 2.0) -> None:
+        """Poll the cached datasets' files every `interval` seconds in a daemon thread"""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop.clear()
+
+        def watch():
+            while not self._stop.wait(interval):
+                try:
+                    reloaded = self.refresh()
+                    if reloaded:
+                        logger.info(f"Reloaded changed datasets: {', '.join(reloaded)}")
+                except Exception as e:
+                    logger.warning(f"Dataset watcher error: {e}")
+
+        self._watcher = threading.Thread(target=watch, name='DataStoreWatcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def stats(self) -> Dict[str, int]:
+        return {'datasets': len(self._entries), 'size_bytes': self.size_bytes, 'loads': self.loads}
+
+    def _drop(self, name: str) -> None:
+        entry = self._entries.pop(name, None)
+        if entry is not None:
+            self.size_bytes -= entry[3]
+
+    def _evict(self, keep: str) -> None:
+        for name in list(self._entries):
+            if self.size_bytes <= self.max_bytes:
+                break
+            if name != keep:
+                self._drop(name)
@@ -3,13 +3,59 @@ Data enrichment utilities for adding new observations and events
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional
+from typing import IO, Dict, Iterable, List, Optional, Union
 from datetime import datetime
+from pathlib import Path
 import logging
 
+from src.data_summary import DataSummary
+from src.instrumentation import instrument
+
 logger = logging.getLogger(__name__)
 
+# ID prefix per record type
+ID_PREFIXES = {
+    'observation': 'OBS',
+    'event': 'EVT',
+    'impact_link': 'IMP'
+}
+
+# Fields a new record must carry, per record type
+REQUIRED_FIELDS = {
+    'observation': ['indicator', 'indicator_code', 'value_numeric', 'observation_date', 'pillar', 'source_name'],
+    'event': ['indicator', 'observation_date', 'category', 'source_name'],
+    'impact_link': ['parent_id', 'pillar', 'related_indicator', 'impact_direction', 'impact_magnitude',
+                    'lag_months', 'evidence_basis']
+}
+
+VALID_CONFIDENCE = ['high', 'medium', 'low', 'estimated']
+
+
+def next_id_number(df: pd.DataFrame, prefix: str) -> int:
+    """
+    Next free numeric suffix for IDs like '<prefix>_001'
+    
+    Looks at both 'id' and 'record_id' so IDs never collide with existing
+    ones, even after rows have been deleted.
+    
+    Args:
+        df: Existing records
+        prefix: ID prefix (e.g. 'OBS')
+        
+    Returns:
+        int: One past the largest suffix in use (1 if none)
+    """
+    largest = 0
+    for col in ('id', 'record_id'):
+        if col in df.columns and len(df):
+            suffix = df[col].astype(str).str.extract(rf'^{prefix}_(\d+)$', expand=False)
+            suffix = pd.to_numeric(suffix, errors='coerce')
+            if suffix.notna().any():
+                largest = max(largest, int(suffix.max()))
+    return largest + 1
+
 
+@instrument
 def add_new_observation(
     observations_df: pd.DataFrame,
     indicator: str,
@@ -43,7 +89,7 @@ def add_new_observation(
         Updated observations DataFrame
     """
     # Create a new ID
-    new_id = f"OBS_{len(observations_df) + 1:03d}"
+    new_id = f"OBS_{next_id_number(observations_df, 'OBS'):03d}"
     
     # Create new observation record
     new_obs = pd.DataFrame([{
@@ -77,6 +123,7 @@ def add_new_observation(
     return updated_obs
 
 
+@instrument
 def add_new_event(
     events_df: pd.DataFrame,
     indicator: str,
@@ -106,7 +153,7 @@ def add_new_event(
         Updated events DataFrame
     """
     # Create a new ID
-    new_id = f"EVT_{len(events_df) + 1:03d}"
+    new_id = f"EVT_{next_id_number(events_df, 'EVT'):03d}"
     
     # Create new event record
     new_event = pd.DataFrame([{
@@ -140,6 +187,7 @@ def add_new_event(
     return updated_events
 
 
+@instrument
 def add_impact_link(
     impact_links_df: pd.DataFrame,
     event_id: str,
@@ -173,7 +221,7 @@ def add_impact_link(
         Updated impact links DataFrame
     """
     # Create a new ID
-    new_id = f"IMP_{len(impact_links_df) + 1:03d}"
+    new_id = f"IMP_{next_id_number(impact_links_df, 'IMP'):03d}"
     
     # Create new impact link record
     new_link = pd.DataFrame([{
@@ -207,10 +255,180 @@ def add_impact_link(
     return updated_links
 
 
+@instrument
+def read_records(source, fmt: Optional[str] = None) -> pd.DataFrame:
+    """
+    Read new records from a CSV, JSON array or JSON Lines file (or open stream)
+    
+    Args:
+        source: Path or file-like object
+        fmt: 'csv', 'json' (array of records) or 'jsonl'; inferred from the
+            file suffix when omitted
+        
+    Returns:
+        pd.DataFrame: One row per record
+    """
+    if fmt is None:
+        suffix = Path(getattr(source, 'name', str(source))).suffix.lower()
+        fmt = 'jsonl' if suffix in ('.jsonl', '.ndjson') else 'json' if suffix == '.json' else 'csv'
+    if fmt == 'jsonl':
+        return pd.read_json(source, lines=True, dtype=False)
+    if fmt == 'json':
+        return pd.read_json(source, orient='records', dtype=False)
+    if fmt == 'csv':
+        return pd.read_csv(source)
+    raise ValueError(f"Unsupported record format: {fmt}")
+
+
+@instrument
+def validate_new_records(records: pd.DataFrame, record_type: str) -> pd.DataFrame:
+    """
+    Check new records column-wise before they are appended
+    
+    Args:
+        records: Candidate records
+        record_type: 'observation', 'event' or 'impact_link'
+        
+    Returns:
+        pd.DataFrame: One row per problem with columns (row, field, problem);
+            empty when every record is valid
+    """
+    problems = []
+
+    def flag(mask, field, problem):
+        rows = records.index[np.asarray(mask, dtype=bool)]
+        if len(rows):
+            problems.append(pd.DataFrame({'row': rows, 'field': field, 'problem': problem}))
+
+    for field in REQUIRED_FIELDS[record_type]:
+        if field not in records.columns:
+            flag(np.ones(len(records)), field, 'missing')
+        else:
+            col = records[field]
+            flag(col.isna() | (col.astype(str).str.strip() == ''), field, 'missing')
+
+    for field in ('value_numeric', 'lag_months'):
+        if field in records.columns:
+            raw = records[field]
+            num = pd.to_numeric(raw, errors='coerce')
+            flag(raw.notna() & num.isna(), field, 'not numeric')
+            if field == 'lag_months':
+                flag(num < 0, field, 'negative')
+
+    if 'observation_date' in records.columns:
+        raw = records['observation_date']
+        parsed = pd.to_datetime(raw, errors='coerce', format='mixed')
+        flag(raw.notna() & parsed.isna(), 'observation_date', 'unparseable date')
+
+    if 'confidence' in records.columns:
+        conf = records['confidence']
+        flag(conf.notna() & ~conf.isin(VALID_CONFIDENCE), 'confidence', 'unknown confidence')
+
+    if not problems:
+        return pd.DataFrame(columns=['row', 'field', 'problem'])
+    return pd.concat(problems, ignore_index=True).sort_values('row', kind='stable').reset_index(drop=True)
+
+
+@instrument
+def add_records(
+    existing_df: pd.DataFrame,
+    records: Union[pd.DataFrame, Iterable[Dict], str, Path, IO],
+    record_type: str,
+    errors: str = 'raise',
+    collected_by: str = 'Data Scientist',
+    summary: Optional[DataSummary] = None,
+    fmt: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Append many observations, events or impact links in one step
+    
+    Records are validated column-wise, given sequential collision-free IDs
+    and appended with a single concat, so adding N records costs one copy of
+    the existing frame rather than N. A DataSummary passed as summary is
+    updated in place with just the appended records.
+    
+    Args:
+        existing_df: Existing records of the same type
+        records: DataFrame, iterable of dicts, or path to / open stream of a
+            CSV, JSON or JSONL file
+        record_type: 'observation', 'event' or 'impact_link'
+        errors: 'raise' to reject the batch on any invalid record,
+            'drop' to skip invalid records with a warning
+        collected_by: Default collector for records that don't name one
+        summary: Running summary of the dataset to keep in step (optional)
+        fmt: Format of a file or stream source (see read_records); needed
+            for streams without a name, which are otherwise read as CSV
+        
+    Returns:
+        Updated DataFrame
+    """
+    if record_type not in ID_PREFIXES:
+        raise ValueError(f"Unsupported record type: {record_type}")
+    if errors not in ('raise', 'drop'):
+        raise ValueError(f"errors must be 'raise' or 'drop', got {errors!r}")
+    if isinstance(records, (str, Path)) or hasattr(records, 'read'):
+        new = read_records(records, fmt)
+    elif isinstance(records, pd.DataFrame):
+        new = records.copy()
+    else:
+        new = pd.DataFrame.from_records(list(records))
+    new = new.reset_index(drop=True)
+    if new.empty:
+        return existing_df
+
+    # Accept the add_impact_link argument name for the parent event
+    if record_type == 'impact_link' and 'event_id' in new.columns and 'parent_id' not in new.columns:
+        new = new.rename(columns={'event_id': 'parent_id'})
+
+    problems = validate_new_records(new, record_type)
+    if not problems.empty:
+        if errors == 'raise':
+            raise ValueError(f"{problems['row'].nunique()} invalid {record_type} records, first: "
+                             f"{problems.head(5).to_dict('records')}")
+        logger.warning(f"Dropping {problems['row'].nunique()} invalid {record_type} records")
+        new = new.drop(index=problems['row'].unique()).reset_index(drop=True)
+        if new.empty:
+            return existing_df
+
+    def default(col, value):
+        if col not in new.columns:
+            new[col] = value
+        else:
+            new[col] = new[col].where(new[col].notna(), value)
+
+    default('notes', '')
+    default('confidence', 'medium')
+    default('collected_by', collected_by)
+    default('collection_date', datetime.now().strftime('%Y-%m-%d'))
+    default('original_text', new['notes'])
+    default('parent_id', None)
+    if record_type == 'event':
+        default('pillar', None)  # Events don't have pillars by design
+        default('indicator_code', 'EVENT_' + new['category'].astype(str).str.upper())
+    elif record_type == 'impact_link':
+        related = new['related_indicator'].astype(str)
+        default('indicator', 'Impact of event ' + new['parent_id'].astype(str) + ' on ' + related)
+        default('indicator_code', 'IMPACT_' + new['pillar'].astype(str) + '_' + related.str[:10])
+        default('source_name', new['evidence_basis'])
+
+    prefix = ID_PREFIXES[record_type]
+    start = next_id_number(existing_df, prefix)
+    new['id'] = [f"{prefix}_{n:03d}" for n in range(start, start + len(new))]
+    new['record_type'] = record_type
+
+    updated = pd.concat([existing_df, new], ignore_index=True)
+    if summary is not None:
+        summary.update(new)
+    logger.info(f"Added {len(new)} {record_type} records ({new['id'].iloc[0]}..{new['id'].iloc[-1]})")
+    return updated
+
+
+@instrument
 def save_enriched_data(
     enriched_data: Dict[str, pd.DataFrame],
     output_dir: str,
-    filename_prefix: str = 'ethiopia_fi_enriched'
+    filename_prefix: str = 'ethiopia_fi_enriched',
+    kpi_snapshot_path: Optional[str] = None
 ) -> None:
     """
     Save enriched data to CSV files
@@ -219,6 +437,8 @@ def save_enriched_data(
         enriched_data: Dictionary with dataframes for each record type
         output_dir: Directory to save files
         filename_prefix: Prefix for output files
+        kpi_snapshot_path: If given, also materialize the dashboard KPI
+            snapshot for the combined file there (see src.kpi_snapshot)
     """
     import os
     
@@ -236,4 +456,8 @@ def save_enriched_data(
     combined = pd.concat(enriched_data.values(), ignore_index=True)
     combined_filepath = os.path.join(output_dir, f"{filename_prefix}_combined.csv")
     combined.to_csv(combined_filepath, index=False)
-    logger.info(f"Saved combined dataset to {combined_filepath}")
\ No newline at end of file
+    logger.info(f"Saved combined dataset to {combined_filepath}")
+
+    if kpi_snapshot_path is not None:
+        from src.kpi_snapshot import write_kpi_snapshot
+        write_kpi_snapshot(combined_filepath, kpi_snapshot_path)
\ No newline at end of file
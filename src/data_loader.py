@@ -3,30 +3,160 @@ Data loading and validation utilities for Ethiopia Financial Inclusion Forecasti
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
+from pathlib import Path
+import hashlib
 import logging
+import os
+
+from src.schema_validator import compile_reference_codes, validate_records
+from src.data_summary import DataSummary
+from src.instrumentation import instrument
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Default paths
 DEFAULT_DATA_PATH = "data/raw/ethiopia_fi_unified_data.csv"
 DEFAULT_REF_PATH = "data/raw/reference_codes .csv"
+DEFAULT_CACHE_DIR = "data/cache"
+
+# Typed layout of the unified schema, shared by the columnar cache and loaders
+UNIFIED_CATEGORICAL_COLUMNS = ['record_type', 'pillar', 'indicator_code', 'gender']
+UNIFIED_DATE_COLUMNS = ['observation_date', 'period_start', 'period_end', 'collection_date']
+UNIFIED_NUMERIC_COLUMNS = ['value_numeric', 'impact_estimate', 'lag_months']
+
+# Columns every unified dataset must have
+REQUIRED_COLUMNS = [
+    'record_id', 'record_type', 'pillar', 'indicator',
+    'indicator_code', 'value_numeric', 'observation_date'
+]
+
+
+def file_fingerprint(filepath: str) -> Tuple[str, int, int]:
+    """
+    Identify a file version by absolute path, modification time and size
+    
+    Args:
+        filepath: Path to the file
+        
+    Returns:
+        tuple: (absolute_path, mtime_ns, size_bytes)
+    """
+    stat = os.stat(filepath)
+    return str(Path(filepath).resolve()), stat.st_mtime_ns, stat.st_size
+
+
+def normalize_unified_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Coerce unified-schema columns to their analysis dtypes
+    
+    Categorical codes become pandas categoricals, date columns are parsed to
+    datetimes and numeric columns are coerced to floats. Columns missing from
+    the frame are ignored; already-typed columns are left untouched.
+    
+    Args:
+        df: Unified dataset (or any subset of its columns)
+        
+    Returns:
+        pandas.DataFrame: Frame with normalized dtypes
+    """
+    df = df.copy()
+    for col in UNIFIED_CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    for col in UNIFIED_DATE_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors='coerce', format='mixed').astype('datetime64[ns]')
+    for col in UNIFIED_NUMERIC_COLUMNS:
+        if col in df.columns and not pd.api.types.is_float_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(float)
+    return df
 
 
-def load_unified_data(filepath: str = DEFAULT_DATA_PATH) -> pd.DataFrame:
+def _cache_prefix(filepath: str) -> str:
+    """Cache file prefix for one source path: its stem plus a hash of the resolved path"""
+    path_key = hashlib.sha1(str(Path(filepath).resolve()).encode('utf-8')).hexdigest()[:12]
+    return f"{Path(filepath).stem}-{path_key}"
+
+
+def _cache_path(filepath: str, cache_dir: str) -> Path:
+    key = hashlib.sha1(repr(file_fingerprint(filepath)).encode('utf-8')).hexdigest()[:16]
+    return Path(cache_dir) / f"{_cache_prefix(filepath)}-{key}.parquet"
+
+
+def _select(df: pd.DataFrame, columns: Optional[List[str]], record_types: Optional[List[str]]) -> pd.DataFrame:
+    if record_types is not None:
+        df = df[df['record_type'].isin(record_types)]
+    if columns is not None:
+        df = df[list(columns)]
+    return df.reset_index(drop=True)
+
+
+def _load_cached(filepath: str, cache_dir: str,
+                 columns: Optional[List[str]], record_types: Optional[List[str]]) -> Optional[pd.DataFrame]:
+    """Read from (or build) the Parquet cache; None when pyarrow is unavailable"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        logger.warning("pyarrow not installed; reading CSV without cache")
+        return None
+
+    cache_file = _cache_path(filepath, cache_dir)
+    if not cache_file.exists():
+        df = normalize_unified_dtypes(pd.read_csv(filepath))
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        # Older versions of this file only; other sources sharing the stem keep their caches
+        prefix = _cache_prefix(filepath)
+        for stale in cache_file.parent.glob(f"{prefix}-*.parquet"):
+            if stale.stem.rsplit('-', 1)[0] == prefix:
+                stale.unlink()
+        tmp = cache_file.with_suffix('.tmp')
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, cache_file)
+        logger.info(f"Wrote columnar cache {cache_file}")
+        return _select(df, columns, record_types)
+
+    filters = [('record_type', 'in', list(record_types))] if record_types is not None else None
+    df = pd.read_parquet(cache_file, columns=list(columns) if columns is not None else None, filters=filters)
+    logger.info(f"Loaded {filepath} from cache {cache_file}")
+    return df.reset_index(drop=True)
+
+
+@instrument
+def load_unified_data(filepath: str = DEFAULT_DATA_PATH,
+                      use_cache: bool = False,
+                      cache_dir: str = DEFAULT_CACHE_DIR,
+                      columns: Optional[List[str]] = None,
+                      record_types: Optional[List[str]] = None) -> pd.DataFrame:
     """
     Load the unified dataset from CSV
     
+    With use_cache=True the CSV is parsed once into a typed Parquet copy under
+    cache_dir (see normalize_unified_dtypes), keyed on the file's path, mtime
+    and size, and later calls read that copy while the CSV is unchanged.
+    
     Args:
         filepath: Path to the CSV file (defaults to DEFAULT_DATA_PATH)
+        use_cache: Serve typed data from the columnar cache
+        cache_dir: Directory holding cache files (defaults to DEFAULT_CACHE_DIR)
+        columns: Only return these columns
+        record_types: Only return rows with these record_type values
         
     Returns:
         pandas.DataFrame: The loaded dataset
     """
     try:
-        df = pd.read_csv(filepath)
+        df = None
+        if use_cache:
+            df = _load_cached(filepath, cache_dir, columns, record_types)
+        if df is None:
+            usecols = None
+            if columns is not None:
+                usecols = list(columns) + (['record_type'] if record_types is not None and 'record_type' not in columns else [])
+            df = pd.read_csv(filepath, usecols=usecols)
+            if use_cache:
+                df = normalize_unified_dtypes(df)
+            df = _select(df, columns, record_types)
         logger.info(f"Successfully loaded data from {filepath}")
         logger.info(f"Dataset shape: {df.shape}")
         return df
@@ -38,12 +168,18 @@ def load_unified_data(filepath: str = DEFAULT_DATA_PATH) -> pd.DataFrame:
         raise
 
 
-def validate_unified_schema(df: pd.DataFrame) -> Tuple[bool, Dict]:
+@instrument
+def validate_unified_schema(df: pd.DataFrame, ref_codes: Optional[pd.DataFrame] = None) -> Tuple[bool, Dict]:
     """
     Validate that the dataset follows the unified schema
     
+    When reference codes are given, every row is also checked against them
+    and the field rules in schema_validator; the per-row table is returned
+    under 'violations' and summarized under 'violation_counts'.
+    
     Args:
         df: The dataset to validate
+        ref_codes: Reference codes from load_reference_codes (optional)
         
     Returns:
         tuple: (is_valid, validation_report)
@@ -53,17 +189,13 @@ def validate_unified_schema(df: pd.DataFrame) -> Tuple[bool, Dict]:
         'required_columns_present': True,
         'record_type_distribution': None,
         'null_counts': None,
-        'date_range': None
+        'date_range': None,
+        'violations': None,
+        'violation_counts': None
     }
     
-    # Required columns based on the schema description
-    required_columns = [
-        'record_id', 'record_type', 'pillar', 'indicator', 
-        'indicator_code', 'value_numeric', 'observation_date'
-    ]
-    
     # Check for missing columns
-    missing = [col for col in required_columns if col not in df.columns]
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
     if missing:
         report['missing_columns'] = missing
         report['required_columns_present'] = False
@@ -93,32 +225,69 @@ def validate_unified_schema(df: pd.DataFrame) -> Tuple[bool, Dict]:
         except:
             pass
     
+    # Row-level checks against reference codes and field rules
+    if ref_codes is not None and not ref_codes.empty:
+        violations = validate_records(df, compile_reference_codes(ref_codes))
+        report['violations'] = violations
+        report['violation_counts'] = violations.groupby(['field', 'rule']).size().to_dict()
+        if not violations.empty:
+            logger.warning(f"{len(violations)} schema violations in {violations['row'].nunique()} rows")
+    
     is_valid = report['required_columns_present']
     return is_valid, report
 
 
-def separate_by_record_type(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
-    """
-    Separate the unified dataset by record_type
+# record_type value -> key used in the separated dictionary
+RECORD_TYPE_KEYS = {
+    'observation': 'observations',
+    'event': 'events',
+    'impact_link': 'impact_links',
+    'target': 'targets'
+}
+
+
+def partition_by_record_type(df: pd.DataFrame, normalize: bool = True) -> Dict[str, pd.DataFrame]:
     """
-    separated = {}
+    Partition the unified dataset by record_type in a single pass
     
-    # Your data has these record_types
-    record_types = {
-        'observation': 'observations',
-        'event': 'events', 
-        'target': 'targets'
-        # Note: No impact_links in the data yet!
-    }
-    
-    for record_type, key_name in record_types.items():
-        mask = df['record_type'] == record_type
-        separated[key_name] = df[mask].copy()
-        logger.info(f"Separated {len(separated[key_name])} {key_name}")
+    Row positions for every record type come from one groupby; the frame is
+    gathered once in partition order and each partition is a contiguous
+    slice of that gather (a lazy copy-on-write view, not a fresh copy).
+    Dtypes are normalized once up front so consumers don't re-parse dates or
+    re-coerce numerics per partition.
     
-    # Impact links will be created separately
-    separated['impact_links'] = pd.DataFrame()
+    Args:
+        df: Unified dataset
+        normalize: Apply normalize_unified_dtypes before partitioning
+        
+    Returns:
+        dict: 'observations', 'events', 'impact_links', 'targets' (always
+            present, possibly empty) plus '<record_type>s' for any other type
+    """
+    if normalize:
+        df = normalize_unified_dtypes(df)
+    positions = df.groupby('record_type', sort=False, observed=True).indices
+    ordered = df.take(np.concatenate(list(positions.values()))) if positions else df.iloc[0:0]
+
+    partitions = {key: ordered.iloc[0:0] for key in RECORD_TYPE_KEYS.values()}
+    start = 0
+    for record_type, pos in positions.items():
+        key = RECORD_TYPE_KEYS.get(record_type, f"{record_type}s")
+        partitions[key] = ordered.iloc[start:start + len(pos)]
+        start += len(pos)
+    return partitions
+
+
+@instrument
+def separate_by_record_type(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Separate the unified dataset by record_type
     
+    Thin wrapper over partition_by_record_type that logs partition sizes.
+    """
+    separated = partition_by_record_type(df)
+    for key_name, part in separated.items():
+        logger.info(f"Separated {len(part)} {key_name}")
     return separated
 
 
@@ -141,79 +310,68 @@ def load_reference_codes(filepath: str = DEFAULT_REF_PATH) -> pd.DataFrame:
         return pd.DataFrame()
 
 
-def get_data_summary(df: pd.DataFrame, separated_data: Dict) -> Dict:
+def get_data_summary(df: pd.DataFrame, separated_data: Optional[Dict] = None) -> Dict:
     """
     Generate a comprehensive summary of the dataset
     
+    Computed through DataSummary, whose per-record-type statistics come from
+    the full frame; keep a DataSummary and update() it with appended records
+    instead of calling this again after each batch.
+    
     Args:
         df: Full unified dataset
-        separated_data: Dictionary from separate_by_record_type
+        separated_data: Dictionary from separate_by_record_type (not needed;
+            kept for existing callers)
         
     Returns:
         dict: Summary statistics
     """
-    summary = {}
-    
-    # Basic info
-    summary['total_records'] = len(df)
-    summary['columns'] = df.columns.tolist()
-    
-    # Record type distribution
-    summary['record_type_counts'] = df['record_type'].value_counts().to_dict()
-    
-    # Pillar distribution (for observations and impact links)
-    for key in ['observations', 'impact_links']:
-        if key in separated_data and 'pillar' in separated_data[key].columns:
-            summary[f'{key}_pillar_dist'] = separated_data[key]['pillar'].value_counts().to_dict()
-    
-    # Indicator coverage
-    if 'observations' in separated_data:
-        obs = separated_data['observations']
-        summary['unique_indicators'] = obs['indicator'].nunique()
-        summary['indicator_coverage'] = obs.groupby('indicator')['observation_date'].agg(['min', 'max', 'count']).to_dict()
-    
-    # Event categories
-    if 'events' in separated_data and 'category' in separated_data['events'].columns:
-        summary['event_categories'] = separated_data['events']['category'].value_counts().to_dict()
-    
-    # Temporal coverage
-    if 'observation_date' in df.columns:
-        try:
-            dates = pd.to_datetime(df['observation_date'], errors='coerce')
-            valid_dates = dates.dropna()
-            if not valid_dates.empty:
-                summary['date_range'] = {
-                    'start': valid_dates.min(),
-                    'end': valid_dates.max(),
-                    'years_covered': (valid_dates.max() - valid_dates.min()).days / 365.25
-                }
-        except:
-            pass
-    
-    return summary
+    return DataSummary.from_frame(df).to_dict()
 
 
+@instrument(rows_out=lambda result: result['summary']['total_records'])
 def load_and_prepare_data(main_filepath: str = DEFAULT_DATA_PATH, 
-                           ref_filepath: Optional[str] = DEFAULT_REF_PATH) -> Dict:
+                           ref_filepath: Optional[str] = DEFAULT_REF_PATH,
+                           use_cache: bool = False,
+                           stream: bool = False,
+                           out_dir: Optional[str] = None,
+                           chunksize: Optional[int] = None) -> Dict:
     """
     Main function to load and prepare all data
     
     Args:
         main_filepath: Path to ethiopia_fi_unified_data.csv (defaults to DEFAULT_DATA_PATH)
         ref_filepath: Path to reference_codes.csv (defaults to DEFAULT_REF_PATH)
+        use_cache: Load through the columnar cache (see load_unified_data)
+        stream: Process the file chunk by chunk in bounded memory and write the
+            partitions to out_dir instead of returning them (see
+            streaming_loader.stream_and_prepare_data)
+        out_dir: Partition directory for stream=True
+        chunksize: Rows per chunk for stream=True
         
     Returns:
-        dict: Dictionary containing all data and metadata
+        dict: Dictionary containing all data and metadata; with stream=True
+            'outputs' (partition -> file path) replaces 'full_data' and 'separated'
     """
+    if stream:
+        from src.streaming_loader import DEFAULT_CHUNKSIZE, DEFAULT_STREAM_DIR, stream_and_prepare_data
+        return stream_and_prepare_data(main_filepath, ref_filepath, out_dir or DEFAULT_STREAM_DIR,
+                                       chunksize or DEFAULT_CHUNKSIZE)
+
     logger.info("=" * 60)
     logger.info("Loading Ethiopia Financial Inclusion Data")
     logger.info("=" * 60)
     
     # Load main dataset
-    df = load_unified_data(main_filepath)
+    df = load_unified_data(main_filepath, use_cache=use_cache)
+    
+    # Load reference codes if provided
+    ref_codes = None
+    if ref_filepath:
+        ref_codes = load_reference_codes(ref_filepath)
     
     # Validate schema
-    is_valid, validation_report = validate_unified_schema(df)
+    is_valid, validation_report = validate_unified_schema(df, ref_codes)
     if not is_valid:
         logger.error("Dataset validation failed!")
         for key, value in validation_report.items():
@@ -222,11 +380,6 @@ def load_and_prepare_data(main_filepath: str = DEFAULT_DATA_PATH,
     # Separate by record type
     separated = separate_by_record_type(df)
     
-    # Load reference codes if provided
-    ref_codes = None
-    if ref_filepath:
-        ref_codes = load_reference_codes(ref_filepath)
-    
     # Generate summary
     summary = get_data_summary(df, separated)
     
@@ -0,0 +1,175 @@
+"""
+Mergeable dataset summary: updated from appended records or combined across partitions
+"""
+import pandas as pd
+from collections import Counter
+from functools import reduce
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Partitions whose pillar distribution is summarized
+PILLAR_KEYS = {'observation': 'observations', 'impact_link': 'impact_links'}
+
+
+def _min(a, b):
+    return b if pd.isna(a) else a if pd.isna(b) else min(a, b)
+
+
+def _max(a, b):
+    return b if pd.isna(a) else a if pd.isna(b) else max(a, b)
+
+
+def _parse_dates(values: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    return pd.to_datetime(values, errors='coerce', format='mixed')
+
+
+class DataSummary:
+    """
+    Counts, date range and per-indicator coverage of unified records
+
+    Summaries form a monoid: DataSummary() is the identity and merge() is
+    associative, so summaries of disjoint row sets (chunks, partitions
+    computed in parallel, appended batches) combine into the summary of
+    their union. Every statistic is a count, a min or a max keyed by column,
+    record type, pillar, category or indicator, held in plain dicts, so
+    update() costs O(rows added + keys they touch), independent of how many
+    records are already summarized.
+
+    to_dict() returns the layout of data_loader.get_data_summary.
+    """
+
+    def __init__(self):
+        self.total_records = 0
+        self.columns: List[str] = []
+        self.null_counts: Counter = Counter()
+        self.record_type_counts: Counter = Counter()
+        self.pillar_counts: Dict[str, Counter] = {key: Counter() for key in PILLAR_KEYS.values()}
+        self.event_categories: Counter = Counter()
+        # indicator -> [first date, last date, dated observations]
+        self.coverage: Dict[str, list] = {}
+        self.date_min = pd.NaT
+        self.date_max = pd.NaT
+
+    def __repr__(self) -> str:
+        return f"DataSummary(records={self.total_records}, indicators={len(self.coverage)})"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, DataSummary) and self._state() == other._state()
+
+    def _state(self) -> Tuple:
+        # NaT != NaT, so compare missing dates as None
+        date = lambda v: None if pd.isna(v) else v  # noqa: E731
+        return (self.total_records, self.columns, dict(self.null_counts), dict(self.record_type_counts),
+                {k: dict(v) for k, v in self.pillar_counts.items()}, dict(self.event_categories),
+                {k: (date(lo), date(hi), n) for k, (lo, hi, n) in self.coverage.items()},
+                date(self.date_min), date(self.date_max))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'DataSummary':
+        """Summary of a unified-schema frame (raw or dtype-normalized)"""
+        summary = cls()
+        summary.total_records = len(df)
+        summary.columns = df.columns.tolist()
+        summary.null_counts.update(df.isnull().sum().to_dict())
+        if 'record_type' not in df.columns or df.empty:
+            return summary
+        record_type = df['record_type'].astype(object)
+        summary.record_type_counts.update(record_type.value_counts().to_dict())
+
+        if 'pillar' in df.columns:
+            for record_type_value, key in PILLAR_KEYS.items():
+                summary.pillar_counts[key].update(df.loc[record_type == record_type_value, 'pillar']
+                                                  .value_counts().to_dict())
+        if 'category' in df.columns:
+            summary.event_categories.update(df.loc[record_type == 'event', 'category'].value_counts().to_dict())
+
+        if 'observation_date' in df.columns:
+            dates = _parse_dates(df['observation_date'])
+            summary.date_min, summary.date_max = dates.min(), dates.max()
+            if 'indicator' in df.columns:
+                is_obs = (record_type == 'observation').to_numpy()
+                cov = (pd.DataFrame({'indicator': df['indicator'].to_numpy()[is_obs], 'date': dates.to_numpy()[is_obs]})
+                       .groupby('indicator')['date'].agg(['min', 'max', 'count']))
+                summary.coverage = {ind: [lo, hi, int(n)] for ind, lo, hi, n
+                                    in zip(cov.index, cov['min'], cov['max'], cov['count'])}
+        return summary
+
+    @classmethod
+    def combine(cls, summaries: Iterable['DataSummary']) -> 'DataSummary':
+        """Merge any number of summaries (e.g. computed in parallel over partitions)"""
+        return reduce(lambda acc, s: acc._absorb(s), summaries, cls())
+
+    def merge(self, other: 'DataSummary') -> 'DataSummary':
+        """Summary of both row sets, as a new object"""
+        return DataSummary()._absorb(self)._absorb(other)
+
+    __add__ = merge
+
+    def update(self, records: pd.DataFrame) -> 'DataSummary':
+        """Fold appended records into this summary in place; returns self"""
+        return self._absorb(DataSummary.from_frame(records))
+
+    def _absorb(self, other: 'DataSummary') -> 'DataSummary':
+        # Rows of one side have every column the other side lacks missing
+        mine, theirs = set(self.columns), set(other.columns)
+        for col in self.columns:
+            if col not in theirs:
+                self.null_counts[col] += other.total_records
+        for col in other.columns:
+            self.null_counts[col] += other.null_counts[col] + (0 if col in mine else self.total_records)
+        self.columns = self.columns + [c for c in other.columns if c not in mine]
+        self.total_records += other.total_records
+
+        self.record_type_counts.update(other.record_type_counts)
+        for key, counts in other.pillar_counts.items():
+            self.pillar_counts[key].update(counts)
+        self.event_categories.update(other.event_categories)
+        for ind, (lo, hi, n) in other.coverage.items():
+            cur = self.coverage.get(ind)
+            self.coverage[ind] = [lo, hi, n] if cur is None else [_min(cur[0], lo), _max(cur[1], hi), cur[2] + n]
+        self.date_min = _min(self.date_min, other.date_min)
+        self.date_max = _max(self.date_max, other.date_max)
+        return self
+
+    @property
+    def date_range(self) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """(first, last) observation_date, or None when no row has a valid date"""
+        return None if pd.isna(self.date_min) else (self.date_min, self.date_max)
+
+    def to_dict(self) -> Dict:
+        """
+        Summary in the get_data_summary layout
+
+        Returns:
+            dict: total_records, columns, record_type_counts, pillar
+                distributions, unique_indicators, indicator_coverage
+                ({'min'|'max'|'count': {indicator: value}}), event_categories
+                and date_range
+        """
+        positive = lambda counts: {k: v for k, v in counts.items() if v > 0}  # noqa: E731
+        summary = {
+            'total_records': self.total_records,
+            'columns': list(self.columns),
+            'record_type_counts': positive(self.record_type_counts),
+        }
+        if 'pillar' in self.columns:
+            for key, counts in self.pillar_counts.items():
+                summary[f'{key}_pillar_dist'] = positive(counts)
+        indicators = sorted(self.coverage)
+        summary['unique_indicators'] = len(indicators)
+        summary['indicator_coverage'] = {
+            stat: {ind: self.coverage[ind][i] for ind in indicators} for i, stat in enumerate(('min', 'max', 'count'))
+        }
+        if 'category' in self.columns:
+            summary['event_categories'] = positive(self.event_categories)
+        if self.date_range is not None:
+            summary['date_range'] = {
+                'start': self.date_min,
+                'end': self.date_max,
+                'years_covered': (self.date_max - self.date_min).days / 365.25,
+            }
+        return summary
@@ -0,0 +1,124 @@
+"""
+Event-adjusted forecasts of the report targets (notebook 04's with_events_forecast)
+"""
+import sys
+import argparse
+import logging
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+if __name__ == '__main__':
+    # Run as a script (python src/event_forecast.py): make the repo root importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.data_loader import DEFAULT_DATA_PATH, load_unified_data, partition_by_record_type
+from src.forecasting import (DEFAULT_FORECAST_YEARS, INTERVALS, SCENARIOS, EffectKernel, anchor_points,
+                             effect_kernel, scenario_outputs, yearly_series)
+from src.indicator_store import DEFAULT_GENDER, DEFAULT_LOCATION, IndicatorStore
+from src.trend_fitting import fit_trends, stack_series
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_PATH = "data/processed/forecast_access_usage_2025_2027.csv"
+DEFAULT_ANCHOR_YEAR = 2024
+
+# Schema of the report CSV read by the dashboard and tests/test_forecasting_outputs.py
+REPORT_COLUMNS = ['target', 'scenario', 'year', 'baseline_forecast', 'with_events_forecast',
+                  'lower_95', 'upper_95', 'event_delta']
+
+# Notebook 04 targets: indicator code -> label written to the 'target' column
+DEFAULT_TARGETS = {
+    'ACC_OWNERSHIP': 'ACC_OWNERSHIP',
+    'USG_P2P_COUNT': 'USG_P2P_COUNT (usage proxy)',
+}
+
+
+def event_adjusted_forecast(observations, impact_links: Optional[pd.DataFrame] = None,
+                            events: Optional[pd.DataFrame] = None, targets: Optional[Dict[str, str]] = None,
+                            forecast_years: Sequence[int] = DEFAULT_FORECAST_YEARS,
+                            anchor_year: Optional[int] = DEFAULT_ANCHOR_YEAR, scenarios: Optional[Dict] = None,
+                            interval: str = 'band', kernel: Optional[EffectKernel] = None) -> pd.DataFrame:
+    """
+    Trend forecasts with and without event effects for the national totals of some indicators
+
+    Uses the same trend fit, effect kernel and scenario assembly as
+    forecasting.forecast_all, restricted to the national totals and labelled
+    for the report. The kernel is built once per link set (effect_kernel),
+    so further scenarios and forecast years are lookups plus arithmetic.
+
+    Args:
+        observations: Observations dataframe or a prebuilt IndicatorStore
+        impact_links, events: Link set for the with-events forecast (ignored
+            when a kernel is given)
+        targets: indicator code -> 'target' label (default DEFAULT_TARGETS)
+        forecast_years: Years to forecast
+        anchor_year: Anchor year (None: each target's last observed year)
+        scenarios: Scenario multipliers (defaults to forecasting.SCENARIOS)
+        interval: 'band' (notebook 04) or 'prediction' (see forecasting.anchored_forecast)
+        kernel: Precomputed forecasting.EffectKernel (default: effect_kernel(impact_links, events))
+
+    Returns:
+        pd.DataFrame: REPORT_COLUMNS, target x scenario x year; targets
+            without enough history are left out
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"Unknown interval: {interval}")
+    targets = targets or DEFAULT_TARGETS
+    scenarios = scenarios or SCENARIOS
+    kernel = kernel if kernel is not None else effect_kernel(impact_links, events)
+    store = observations if isinstance(observations, IndicatorStore) else IndicatorStore(observations)
+    series = yearly_series(store, list(targets))
+    codes = [c for c in targets if (c, DEFAULT_GENDER, DEFAULT_LOCATION) in series]
+    missing = [c for c in targets if c not in codes]
+    if missing:
+        logger.warning(f"Not enough history to forecast: {missing}")
+    if not codes:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+
+    keys = [(c, DEFAULT_GENDER, DEFAULT_LOCATION) for c in codes]
+    x, y, mask = stack_series((series[k][0], series[k][1]) for k in keys)
+    fit = fit_trends(x, y, mask)
+    anchor_years, anchor_values = anchor_points(x, y, mask, fit, anchor_year)
+    is_percent = np.array([series[k][2] for k in keys], dtype=bool)
+    deltas = kernel.deltas(codes, forecast_years, anchor_years)
+    outputs = scenario_outputs(fit, anchor_values, anchor_years, forecast_years, deltas, is_percent, scenarios,
+                               interval)
+
+    # Target-major rows: target x scenario x year, as in the report
+    n, s, h = len(codes), len(scenarios), len(forecast_years)
+    forecast = pd.DataFrame({
+        'target': np.repeat([targets[c] for c in codes], s * h),
+        'scenario': np.tile(np.repeat(list(scenarios), h), n),
+        'year': np.tile(list(forecast_years), n * s),
+    })
+    for name, values in outputs.items():
+        forecast[name] = values.ravel()
+    return forecast[REPORT_COLUMNS]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--data', type=Path, default=Path(DEFAULT_DATA_PATH), help='Unified data CSV')
+    parser.add_argument('--out', type=Path, default=Path(DEFAULT_OUTPUT_PATH), help='Output CSV (report schema)')
+    parser.add_argument('--years', type=int, nargs='+', default=list(DEFAULT_FORECAST_YEARS))
+    parser.add_argument('--anchor-year', type=int, default=DEFAULT_ANCHOR_YEAR)
+    parser.add_argument('--interval', choices=INTERVALS, default='band', help='Forecast interval method')
+    args = parser.parse_args(argv)
+
+    parts = partition_by_record_type(load_unified_data(str(args.data)))
+    links = parts['impact_links']
+    if links.empty:
+        from src.events_impact_modeler import create_all_impact_links
+        logger.info("No impact links in the data; deriving them from the rule table")
+        links = create_all_impact_links(parts['events'], parts['observations'])
+    forecast = event_adjusted_forecast(parts['observations'], links, parts['events'], forecast_years=args.years,
+                                       anchor_year=args.anchor_year, interval=args.interval)
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    forecast.to_csv(args.out, index=False)
+    print(f"Wrote {args.out} ({len(forecast)} rows)")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -7,6 +7,10 @@ from typing import Dict, List, Optional
 from datetime import datetime
 import logging
 
+from src.association_matrix import SparseAssociationMatrix
+from src.indicator_store import IndicatorStore, DEFAULT_GENDER, DEFAULT_LOCATION
+from src.instrumentation import instrument
+
 logger = logging.getLogger(__name__)
 
 
@@ -55,57 +59,149 @@ def create_impact_link_template() -> Dict:
     }
 
 
-def analyze_telebirr_impact(observations: pd.DataFrame) -> Dict:
+EVENT_WINDOW_COLUMNS = [
+    'event_id', 'event_code', 'event_date', 'indicator_code',
+    'before_date', 'before_value', 'after_date', 'after_value',
+    'n_before', 'n_after', 'change', 'pct_change', 'change_per_year'
+]
+
+
+def analyze_event_windows(events: pd.DataFrame, observations, indicator_codes: Optional[List[str]] = None,
+                          before_months: Optional[int] = None, after_months: Optional[int] = None,
+                          gender: str = DEFAULT_GENDER, location: str = DEFAULT_LOCATION) -> pd.DataFrame:
+    """
+    Before/after growth statistics for every event x indicator pair
+    
+    For each pair the "before" value is the last observation on or before the
+    event date (within before_months, if given) and the "after" value is the
+    last observation after it (within after_months, if given). All indicator
+    series are laid out on one sorted (indicator, day) key so every window
+    boundary is found with a single searchsorted call.
+    
+    Args:
+        events: Events dataframe (record_id plus event_date/observation_date)
+        observations: Observations dataframe or a prebuilt IndicatorStore
+        indicator_codes: Indicators to analyze (default: all in the store)
+        before_months: Look-back window length (None = unbounded)
+        after_months: Look-ahead window length (None = unbounded)
+        gender: Series disaggregation to use
+        location: Series disaggregation to use
+        
+    Returns:
+        pd.DataFrame: One row per event x indicator with EVENT_WINDOW_COLUMNS
+    """
+    store = observations if isinstance(observations, IndicatorStore) else IndicatorStore(observations)
+    if indicator_codes is None:
+        indicator_codes = [k[0] for k in store.keys() if k[1] == gender and k[2] == location]
+    codes = list(dict.fromkeys(indicator_codes))
+
+    date_col = next((c for c in ['event_date', 'observation_date', 'date', 'period_start'] if c in events.columns), None)
+    event_dates = (pd.to_datetime(events[date_col], errors='coerce') if date_col
+                   else pd.Series(pd.NaT, index=events.index)).to_numpy(dtype='datetime64[ns]')
+    event_ids = events['record_id'].to_numpy() if 'record_id' in events.columns else events.index.to_numpy()
+    event_codes = events['indicator_code'].to_numpy() if 'indicator_code' in events.columns else event_ids
+    valid = ~np.isnat(event_dates)
+    if not valid.all():
+        logger.warning(f"Skipping {int((~valid).sum())} events without a parseable date")
+    event_dates, event_ids, event_codes = event_dates[valid], event_ids[valid], event_codes[valid]
+    if not len(codes) or not len(event_dates):
+        return pd.DataFrame(columns=EVENT_WINDOW_COLUMNS)
+
+    # Concatenate all series; key = indicator slot * span + day offset keeps them sorted
+    arrays = [store.arrays(code, gender, location) for code in codes]
+    counts = np.array([len(d) for d, _ in arrays])
+    obs_dates = np.concatenate([d for d, _ in arrays])
+    days = obs_dates.astype('datetime64[D]').astype(np.int64)
+    # Trailing NaN/NaT sentinel is what empty windows point at
+    values = np.append(np.concatenate([v for _, v in arrays]), np.nan)
+    obs_dates = np.append(obs_dates, np.datetime64('NaT', 'ns'))
+
+    def months_shift(d, months):
+        return (pd.DatetimeIndex(d) + pd.DateOffset(months=months)).to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+    event_days = event_dates.astype('datetime64[D]').astype(np.int64)
+    lo_days = months_shift(event_dates, -before_months) if before_months is not None else None
+    hi_days = months_shift(event_dates, after_months) if after_months is not None else None
+    all_days = [d for d in (days, event_days, lo_days, hi_days) if d is not None and len(d)]
+    origin = min(d.min() for d in all_days) - 1
+    span = max(d.max() for d in all_days) - origin + 2
+    keys = np.repeat(np.arange(len(codes)), counts) * span + (days - origin)
+
+    n_events, n_codes = len(event_days), len(codes)
+    pair_slot = np.tile(np.arange(n_codes), n_events)
+
+    def bound(offsets, side):
+        return np.searchsorted(keys, pair_slot * span + np.repeat(offsets, n_codes), side=side)
+
+    start = bound(np.zeros(n_events, dtype=np.int64) if lo_days is None else lo_days - origin, 'left')
+    split = bound(event_days - origin, 'right')
+    stop = bound(np.full(n_events, span - 1) if hi_days is None else hi_days - origin, 'right')
+
+    n_before = split - start
+    n_after = stop - split
+    before_pos = np.where(n_before > 0, split - 1, -1)
+    after_pos = np.where(n_after > 0, stop - 1, -1)
+    before_value, before_date = values[before_pos], obs_dates[before_pos]
+    after_value, after_date = values[after_pos], obs_dates[after_pos]
+
+    change = after_value - before_value
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct_change = np.where(before_value != 0, change / before_value * 100.0, np.nan)
+        years = (after_date - before_date) / np.timedelta64(1, 'D') / 365.25
+        change_per_year = np.where(years > 0, change / years, np.nan)
+
+    result = pd.DataFrame({
+        'event_id': np.repeat(event_ids, n_codes),
+        'event_code': np.repeat(event_codes, n_codes),
+        'event_date': np.repeat(event_dates, n_codes),
+        'indicator_code': np.asarray(codes, dtype=object)[pair_slot],
+        'before_date': before_date,
+        'before_value': before_value,
+        'after_date': after_date,
+        'after_value': after_value,
+        'n_before': n_before,
+        'n_after': n_after,
+        'change': change,
+        'pct_change': pct_change,
+        'change_per_year': change_per_year,
+    })
+    logger.info(f"Analyzed {n_events} events x {n_codes} indicators")
+    return result
+
+
+def analyze_telebirr_impact(observations) -> Dict:
     """
     Analyze the impact of Telebirr launch based on observed data
     
     Args:
-        observations: Observations dataframe
+        observations: Observations dataframe or a prebuilt IndicatorStore
         
     Returns:
         dict: Analysis results
     """
-    # Get mobile money account data before and after Telebirr
-    mm_data = observations[
-        (observations['indicator_code'] == 'ACC_MM_ACCOUNT') &
-        (observations['gender'] == 'all')
-    ].sort_values('observation_date')
-    
-    # Get account ownership data
-    acc_data = observations[
-        (observations['indicator_code'] == 'ACC_OWNERSHIP') &
-        (observations['gender'] == 'all') &
-        (observations['observation_date'].astype(str).str.contains('2021|2024'))
-    ].sort_values('observation_date')
-    
+    store = observations if isinstance(observations, IndicatorStore) else IndicatorStore(observations)
     analysis = {
         'mm_growth': None,
         'acc_growth': None,
         'mm_before_after': {}
     }
     
-    if len(mm_data) >= 2:
-        # Calculate growth in mobile money accounts
-        mm_2021 = mm_data[mm_data['observation_date'].astype(str).str.contains('2021')]['value_numeric'].values
-        mm_2024 = mm_data[mm_data['observation_date'].astype(str).str.contains('2024')]['value_numeric'].values
-        
-        if len(mm_2021) > 0 and len(mm_2024) > 0:
-            growth = mm_2024[0] - mm_2021[0]
-            analysis['mm_growth'] = growth
-            analysis['mm_before_after'] = {
-                'before': mm_2021[0],
-                'after': mm_2024[0],
-                'growth_pp': growth
-            }
+    # Mobile money accounts, 2021 Findex vs 2024 Findex
+    mm_2021 = store.value_in_year('ACC_MM_ACCOUNT', 2021)
+    mm_2024 = store.value_in_year('ACC_MM_ACCOUNT', 2024)
+    if mm_2021 is not None and mm_2024 is not None:
+        growth = mm_2024 - mm_2021
+        analysis['mm_growth'] = growth
+        analysis['mm_before_after'] = {
+            'before': mm_2021,
+            'after': mm_2024,
+            'growth_pp': growth
+        }
     
-    if len(acc_data) >= 2:
-        # Get 2021 and 2024 account ownership
-        acc_2021 = acc_data[acc_data['observation_date'].astype(str).str.contains('2021')]
-        acc_2024 = acc_data[acc_data['observation_date'].astype(str).str.contains('2024')]
-        
-        if not acc_2021.empty and not acc_2024.empty:
-            growth = acc_2024['value_numeric'].iloc[0] - acc_2021['value_numeric'].iloc[0]
-            analysis['acc_growth'] = growth
+    acc_2021 = store.value_in_year('ACC_OWNERSHIP', 2021)
+    acc_2024 = store.value_in_year('ACC_OWNERSHIP', 2024)
+    if acc_2021 is not None and acc_2024 is not None:
+        analysis['acc_growth'] = acc_2024 - acc_2021
     
     return analysis
 
@@ -170,37 +266,26 @@ def create_telebirr_impact_links(telebirr_event: pd.Series, analysis: Dict) -> L
     return impact_links
 
 
-def analyze_mpesa_impact(observations: pd.DataFrame) -> Dict:
+def analyze_mpesa_impact(observations) -> Dict:
     """
     Analyze the impact of M-Pesa launch based on observed data
     """
-    # Get P2P transaction data
-    p2p_data = observations[
-        observations['indicator_code'] == 'USG_P2P_COUNT'
-    ].sort_values('observation_date')
-    
+    store = observations if isinstance(observations, IndicatorStore) else IndicatorStore(observations)
     analysis = {
         'p2p_growth_rate': None,
         'p2p_values': {}
     }
     
-    if len(p2p_data) >= 2:
-        # Calculate YoY growth
-        p2p_2024 = p2p_data[p2p_data['observation_date'].astype(str).str.contains('2024')]
-        p2p_2025 = p2p_data[p2p_data['observation_date'].astype(str).str.contains('2025')]
-        
-        if not p2p_2024.empty and not p2p_2025.empty:
-            val_2024 = p2p_2024['value_numeric'].iloc[0]
-            val_2025 = p2p_2025['value_numeric'].iloc[0]
-            
-            if val_2024 > 0:
-                growth_rate = (val_2025 - val_2024) / val_2024
-                analysis['p2p_growth_rate'] = growth_rate
-                analysis['p2p_values'] = {
-                    '2024': val_2024,
-                    '2025': val_2025,
-                    'growth': val_2025 - val_2024
-                }
+    # P2P transaction counts, year over year
+    val_2024 = store.value_in_year('USG_P2P_COUNT', 2024)
+    val_2025 = store.value_in_year('USG_P2P_COUNT', 2025)
+    if val_2024 is not None and val_2025 is not None and val_2024 > 0:
+        analysis['p2p_growth_rate'] = (val_2025 - val_2024) / val_2024
+        analysis['p2p_values'] = {
+            '2024': val_2024,
+            '2025': val_2025,
+            'growth': val_2025 - val_2024
+        }
     
     return analysis
 
@@ -259,21 +344,24 @@ def create_mpesa_impact_links(mpesa_event: pd.Series, analysis: Dict) -> List[Di
     return impact_links
 
 
-def create_fayda_impact_links(fayda_event: pd.Series, observations: pd.DataFrame) -> List[Dict]:
+def create_fayda_impact_links(fayda_event: pd.Series, observations) -> List[Dict]:
     """
     Create impact links for Fayda Digital ID rollout
+
+    Args:
+        fayda_event: Fayda event record
+        observations: Observations dataframe or a prebuilt IndicatorStore
     """
+    store = observations if isinstance(observations, IndicatorStore) else IndicatorStore(observations)
     impact_links = []
     
     # Get Fayda enrollment data
-    fayda_data = observations[
-        observations['indicator_code'] == 'ACC_FAYDA'
-    ].sort_values('observation_date')
+    _, fayda_values = store.arrays('ACC_FAYDA')
     
     enrollment_growth = None
-    if len(fayda_data) >= 2:
-        latest = fayda_data.iloc[-1]['value_numeric']
-        earliest = fayda_data.iloc[0]['value_numeric']
+    if len(fayda_values) >= 2:
+        latest = fayda_values[-1]
+        earliest = fayda_values[0]
         if earliest > 0:
             enrollment_growth = (latest - earliest) / earliest
     
@@ -324,129 +412,67 @@ def create_fayda_impact_links(fayda_event: pd.Series, observations: pd.DataFrame
     return impact_links
 
 
-def create_all_impact_links(events_df: pd.DataFrame, observations_df: pd.DataFrame) -> pd.DataFrame:
+def create_all_impact_links(events_df: pd.DataFrame, observations_df: pd.DataFrame,
+                            rules_path: Optional[str] = None) -> pd.DataFrame:
     """
-    Create all 14 impact links based on events and observations
+    Create impact links for all events from the impact-link rule table
     
     Args:
         events_df: Events dataframe
         observations_df: Observations dataframe
+        rules_path: Rule CSV (defaults to impact_link_rules.DEFAULT_RULES_PATH)
         
     Returns:
         pd.DataFrame: Dataframe with all impact links
     """
-    all_links = []
-    
-    # Get specific events
-    telebirr = events_df[events_df['indicator_code'] == 'EVT_TELEBIRR'].iloc[0]
-    mpesa = events_df[events_df['indicator_code'] == 'EVT_MPESA'].iloc[0]
-    fayda = events_df[events_df['indicator_code'] == 'EVT_FAYDA'].iloc[0]
-    nfis = events_df[events_df['indicator_code'] == 'EVT_NFIS2'].iloc[0]
-    crossover = events_df[events_df['indicator_code'] == 'EVT_CROSSOVER'].iloc[0]
-    infrastructure = events_df[events_df['indicator_code'] == 'EVT_ETHIOPAY'].iloc[0]
-    
-    # Analyze impacts
-    telebirr_analysis = analyze_telebirr_impact(observations_df)
-    mpesa_analysis = analyze_mpesa_impact(observations_df)
-    
-    # Create impact links
-    all_links.extend(create_telebirr_impact_links(telebirr, telebirr_analysis))
-    all_links.extend(create_mpesa_impact_links(mpesa, mpesa_analysis))
-    all_links.extend(create_fayda_impact_links(fayda, observations_df))
-    
-    # Create remaining impact links to reach 14 total
-    # Impact 7: 4G Coverage → Mobile Money Usage
-    link7 = create_impact_link_template()
-    link7.update({
-        'record_id': 'IMP_007',
-        'parent_id': '',  # Need to find 4G expansion event or create one
-        'pillar': 'ACCESS',
-        'indicator': 'Impact: 4G Coverage Expansion on Mobile Money',
-        'indicator_code': 'IMP_4G_MM',
-        'related_indicator': 'ACC_MM_ACCOUNT',
-        'relationship_type': 'enabling',
-        'impact_direction': 'increase',
-        'impact_magnitude': 'medium',
-        'impact_estimate': 0.03,  # 3% increase per 10pp coverage increase
-        'lag_months': 12,
-        'evidence_basis': 'literature',
-        'comparable_country': 'Multiple African markets',
-        'source_name': 'GSMA research on mobile infrastructure impact',
-        'original_text': '4G coverage expansion from 37.5% to 70.8% enables mobile money growth',
-        'notes': 'Infrastructure enables usage; correlation observed in multiple markets',
-        'collected_by': 'Your Name'  # CHANGE THIS
-    })
-    all_links.append(link7)
+    from src.impact_link_rules import DEFAULT_RULES_PATH, generate_impact_links, load_impact_link_rules
     
-    # Continue creating more links...
-    # You'll need to create links 8-14 similarly
-    
-    # Convert to DataFrame
-    impact_links_df = pd.DataFrame(all_links)
+    rules = load_impact_link_rules(rules_path or DEFAULT_RULES_PATH)
+    impact_links_df = generate_impact_links(rules, events_df, observations_df)
     
     logger.info(f"Created {len(impact_links_df)} impact links")
     
     return impact_links_df
 
 
-import pandas as pd
-import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
-from typing import Optional
-
-plt.style.use('seaborn-v0_8-whitegrid')
-
-
-def build_association_matrix(events: pd.DataFrame, impact_links: pd.DataFrame):
-    imp = impact_links.copy()
-    effect_col = 'impact_magnitude' if 'impact_magnitude' in imp.columns else ('impact_estimate' if 'impact_estimate' in imp.columns else None)
-    if effect_col is None:
-        imp['effect_value'] = imp['impact_direction'].map({'positive':1,'negative':-1}).fillna(0)
-    else:
-        imp['effect_value'] = pd.to_numeric(imp[effect_col], errors='coerce').fillna(0)
-    ev = events.rename(columns={'record_id':'event_id'})
-    imp = imp.rename(columns={'parent_id':'event_id'})
-    merged = pd.merge(imp, ev[['event_id','event_name','event_date','category']] if 'event_name' in ev.columns else ev[['event_id','event_date','category']], on='event_id', how='left')
-    if 'related_indicator' not in merged.columns and 'indicator_code' in merged.columns:
-        merged['related_indicator'] = merged['indicator_code']
-    row_label = 'event_name' if 'event_name' in merged.columns else 'event_id'
-    assoc = merged.pivot_table(index=row_label, columns='related_indicator', values='effect_value', aggfunc='mean', fill_value=0)
-    return assoc
-
 
 def plot_association_heatmap(assoc: pd.DataFrame, out_path: Optional[str]=None):
-    plt.figure(figsize=(12,6))
-    sns.heatmap(assoc, cmap='RdBu_r', center=0, annot=False)
-    plt.title('Event-Indicator Association (mean effect)')
-    plt.tight_layout()
-    if out_path:
-        plt.savefig(out_path)
+    # Plotting stack is imported on first use so modeling-only callers never load it
+    import seaborn as sns
+    import matplotlib.pyplot as plt
+    with plt.style.context('seaborn-v0_8-whitegrid'):
+        plt.figure(figsize=(12,6))
+        sns.heatmap(assoc, cmap='RdBu_r', center=0, annot=False)
+        plt.title('Event-Indicator Association (mean effect)')
+        plt.tight_layout()
+        if out_path:
+            plt.savefig(out_path)
     return assoc
 
+def apply_event_effects_series(observations, effects: pd.DataFrame, indicator_code: str,
+                               gender: str = DEFAULT_GENDER, location: str = DEFAULT_LOCATION) -> pd.DataFrame:
+    """
+    Monthly series of one indicator with and without event effects (one link at a time)
 
-def build_event_effects(impact_links: pd.DataFrame, events: pd.DataFrame) -> pd.DataFrame:
-    imp = impact_links.rename(columns={'parent_id':'event_id'})
-    ev = events.rename(columns={'record_id':'event_id'})
-    merged = pd.merge(imp, ev[['event_id','event_date']], on='event_id', how='left')
-    effect_col = 'impact_magnitude' if 'impact_magnitude' in merged.columns else ('impact_estimate' if 'impact_estimate' in merged.columns else None)
-    if effect_col is None:
-        merged['effect_value'] = merged['impact_direction'].map({'positive':1,'negative':-1}).fillna(0)
-    else:
-        merged['effect_value'] = pd.to_numeric(merged[effect_col], errors='coerce').fillna(0)
-    merged['lag_months'] = pd.to_numeric(merged['lag_months'], errors='coerce').fillna(0).astype(int) if 'lag_months' in merged.columns else 0
-    if 'related_indicator' not in merged.columns and 'indicator_code' in merged.columns:
-        merged['related_indicator'] = merged['indicator_code']
-    return merged[['event_id','event_date','related_indicator','effect_value','lag_months']]
-
+    Args:
+        observations: Observations dataframe (observation_date or date column)
+            or a prebuilt IndicatorStore
+        effects: Output of build_event_effects
+        indicator_code: Indicator to compute
+        gender, location: Series to use (default: the national total)
 
-def apply_event_effects_series(observations: pd.DataFrame, effects: pd.DataFrame, indicator_code: str) -> pd.DataFrame:
-    date_col = 'observation_date' if 'observation_date' in observations.columns else ('date' if 'date' in observations.columns else None)
-    o = observations[(observations['indicator_code']==indicator_code) & observations[date_col].notna()].copy()
-    if o.empty:
+    Returns:
+        pd.DataFrame: 'base' and 'predicted' columns on a month-start index;
+            empty when the series has no observations
+    """
+    if not isinstance(observations, IndicatorStore):
+        if 'observation_date' not in observations.columns and 'date' in observations.columns:
+            observations = observations.rename(columns={'date': 'observation_date'})
+        observations = IndicatorStore(observations)
+    observed = observations.series(indicator_code, gender, location)
+    if observed.empty:
         return pd.DataFrame()
-    o[date_col] = pd.to_datetime(o[date_col])
-    base = o.set_index(date_col)['value_numeric'].resample('MS').ffill()
+    base = observed.resample('MS').ffill()
     pred = base.copy().astype(float)
     effs = effects[effects['related_indicator']==indicator_code]
     for _, row in effs.iterrows():
@@ -456,6 +482,144 @@ def apply_event_effects_series(observations: pd.DataFrame, effects: pd.DataFrame
     return pd.DataFrame({'base': base, 'predicted': pred})
 
 
+def _month_ordinal(dates) -> np.ndarray:
+    """Months since year 0 for each date (NaT -> -1)."""
+    d = pd.to_datetime(pd.Series(dates), errors='coerce')
+    ords = d.dt.year * 12 + d.dt.month - 1
+    return ords.fillna(-1).astype(np.int64).to_numpy()
+
+
+def apply_event_effects_matrix(observations: pd.DataFrame, effects: pd.DataFrame, indicator_codes: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Vectorized equivalent of apply_event_effects_series for many indicators at once
+
+    All links are scattered onto one (indicators x months) step matrix with
+    np.add.at and turned into cumulative effects with a single cumsum, instead
+    of a pandas slice update per link. Semantics match the row loop: an effect
+    starts the month after the event plus lag_months and is only applied when
+    that month falls inside the indicator's observed monthly range.
+
+    Args:
+        observations: Observations dataframe
+        effects: Output of build_event_effects
+        indicator_codes: Indicators to compute (defaults to all with observations)
+
+    Returns:
+        dict: indicator_code -> DataFrame with 'base' and 'predicted' columns
+    """
+    date_col = 'observation_date' if 'observation_date' in observations.columns else ('date' if 'date' in observations.columns else None)
+    o = observations[observations[date_col].notna()]
+    if indicator_codes is not None:
+        o = o[o['indicator_code'].isin(indicator_codes)]
+    if o.empty:
+        return {}
+    o = o[['indicator_code', date_col, 'value_numeric']].copy()
+    o[date_col] = pd.to_datetime(o[date_col])
+
+    bases = {}
+    for code, grp in o.groupby('indicator_code', sort=False):
+        bases[code] = grp.set_index(date_col)['value_numeric'].resample('MS').ffill()
+    codes = list(bases.keys())
+    first = np.array([_month_ordinal([b.index[0]])[0] for b in bases.values()], dtype=np.int64)
+    last = np.array([_month_ordinal([b.index[-1]])[0] for b in bases.values()], dtype=np.int64)
+    origin = int(first.min())
+    n_months = int(last.max()) - origin + 1
+
+    effs = effects[effects['related_indicator'].isin(codes)]
+    steps = np.zeros((len(codes), n_months + 1), dtype=float)
+    if not effs.empty:
+        row = pd.Index(codes).get_indexer(effs['related_indicator'])
+        event_month = _month_ordinal(effs['event_date'])
+        start = event_month + 1 + effs['lag_months'].to_numpy(dtype=np.int64)
+        ok = (event_month >= 0) & (start >= first[row]) & (start <= last[row])
+        np.add.at(steps, (row[ok], start[ok] - origin), effs['effect_value'].to_numpy(dtype=float)[ok])
+    cumulative = np.cumsum(steps[:, :n_months], axis=1)
+
+    out = {}
+    for i, code in enumerate(codes):
+        base = bases[code]
+        lo = first[i] - origin
+        pred = base.astype(float) + cumulative[i, lo:lo + len(base)]
+        out[code] = pd.DataFrame({'base': base, 'predicted': pred})
+    return out
+
+
+def build_ramp_timelines(effects: pd.DataFrame, start=None, end=None, by: str = 'related_indicator', value_col: str = 'effect_value') -> pd.DataFrame:
+    """
+    Ramped effect timelines for every link on a monthly grid in one broadcast
+
+    Each link contributes effect * min(1, t / lag_months) where t is the exact
+    number of calendar months elapsed since the event (fractional for events
+    that fall mid-month). Links without a positive lag act as a step at the
+    event date. Contributions are summed per `by` group.
+
+    Args:
+        effects: Links with event_date, lag_months, `by` and `value_col` columns
+            (e.g. the output of build_event_effects)
+        start: First month of the grid (defaults to the earliest event date)
+        end: Last month of the grid (defaults to the latest event date + lag)
+        by: Column to aggregate on ('related_indicator', 'event_id', ...)
+        value_col: Column holding the full effect size
+
+    Returns:
+        pd.DataFrame: Tidy frame with columns [by, 'month', 'effect']
+    """
+    event_date = pd.to_datetime(effects['event_date'], errors='coerce')
+    keep = event_date.notna() & effects[by].notna()
+    eff = effects[keep]
+    event_date = event_date[keep]
+    if eff.empty:
+        return pd.DataFrame(columns=[by, 'month', 'effect'])
+
+    lag = pd.to_numeric(eff['lag_months'], errors='coerce').fillna(0).to_numpy(dtype=float) if 'lag_months' in eff.columns else np.zeros(len(eff))
+    if start is None:
+        start = event_date.min()
+    if end is None:
+        end = (event_date + pd.to_timedelta(np.ceil(lag) * 31, unit='D')).max()
+    idx = pd.date_range(start, end, freq='MS')
+
+    # Months elapsed between each grid point (a month start) and each event
+    event_pos = _month_ordinal(event_date) + (event_date.dt.day.to_numpy() - 1) / event_date.dt.days_in_month.to_numpy()
+    elapsed = _month_ordinal(idx)[None, :] - event_pos[:, None]
+    lag_col = lag[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weight = np.where(lag_col > 0, np.clip(elapsed / lag_col, 0.0, 1.0), (elapsed >= 0).astype(float))
+    contrib = weight * pd.to_numeric(eff[value_col], errors='coerce').fillna(0).to_numpy(dtype=float)[:, None]
+
+    groups, inverse = np.unique(eff[by].astype(str).to_numpy(), return_inverse=True)
+    order = np.argsort(inverse, kind='stable')
+    bounds = np.flatnonzero(np.r_[True, np.diff(inverse[order]) != 0])
+    totals = np.add.reduceat(contrib[order], bounds, axis=0) if len(idx) else np.zeros((len(groups), 0))
+
+    return pd.DataFrame({
+        by: np.repeat(groups, len(idx)),
+        'month': np.tile(idx.to_numpy(), len(groups)),
+        'effect': totals.ravel(),
+    })
+
+
+
+# Effect size per impact_magnitude label, and sign per impact_direction
+MAGNITUDE_SCALE = {'low': 0.5, 'medium': 1.0, 'high': 1.5}
+DIRECTION_SIGN = {'positive': 1, 'increase': 1, 'negative': -1, 'decrease': -1}
+
+
+def link_effects(links: pd.DataFrame) -> pd.Series:
+    """
+    Signed numeric effect per link
+
+    Numeric magnitudes are used as-is; labels go through a hashed index
+    lookup into MAGNITUDE_SCALE (unknown labels count as 1.0). Directions
+    other than those in DIRECTION_SIGN count as positive.
+    """
+    raw = links['impact_magnitude']
+    numeric = pd.to_numeric(raw, errors='coerce').to_numpy(dtype=float)
+    codes = pd.Index(list(MAGNITUDE_SCALE)).get_indexer(raw.astype(str).str.strip().str.lower())
+    scale = np.append(np.array(list(MAGNITUDE_SCALE.values())), 1.0)[codes]
+    magnitude = np.where(np.isnan(numeric), scale, numeric)
+    direction = links['impact_direction'].astype(str).str.strip().str.lower().map(DIRECTION_SIGN).fillna(1)
+    return pd.Series(magnitude * direction.to_numpy(dtype=float), index=links.index, name='effect')
+
 
 def _select_effect_column(df):
     import pandas as pd
@@ -466,8 +630,8 @@ def _select_effect_column(df):
                 return c
     return None
 
-# Override build_association_matrix to use selector
-def build_association_matrix(events: pd.DataFrame, impact_links: pd.DataFrame):
+@instrument
+def build_association_matrix(events: pd.DataFrame, impact_links: pd.DataFrame, sparse: bool = False):
     imp = impact_links.copy()
     col = _select_effect_column(imp)
     if col is None:
@@ -486,10 +650,14 @@ def build_association_matrix(events: pd.DataFrame, impact_links: pd.DataFrame):
     if 'related_indicator' not in merged.columns and 'indicator_code' in merged.columns:
         merged['related_indicator'] = merged['indicator_code']
     row_label = 'event_name' if 'event_name' in merged.columns else 'event_id'
+    if sparse:
+        # Same cell means, without the dense zero-filled frame
+        return SparseAssociationMatrix.from_long(merged, row=row_label, col='related_indicator',
+                                                 value='effect_value', agg='mean')
     assoc = merged.pivot_table(index=row_label, columns='related_indicator', values='effect_value', aggfunc='mean', fill_value=0)
     return assoc
 
-# Override build_event_effects with selector and date handling
+@instrument
 def build_event_effects(impact_links: pd.DataFrame, events: pd.DataFrame) -> pd.DataFrame:
     import pandas as pd
     imp = impact_links.rename(columns={'parent_id':'event_id'})
@@ -0,0 +1,133 @@
+"""
+Lazy, cached download encodings (CSV, gzip CSV, Parquet) for dashboard exports
+"""
+import gzip
+import io
+import threading
+import pandas as pd
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# format -> (file suffix, MIME type)
+EXPORT_FORMATS = {
+    'csv': ('.csv', 'text/csv'),
+    'csv.gz': ('.csv.gz', 'application/gzip'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+}
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def available_formats() -> List[str]:
+    """Export formats usable here (Parquet needs pyarrow)"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return [f for f in EXPORT_FORMATS if f != 'parquet']
+    return list(EXPORT_FORMATS)
+
+
+def encode_frame(df: pd.DataFrame, fmt: str = 'csv') -> bytes:
+    """
+    Serialize a frame for download
+
+    gzip output is deterministic (no embedded timestamp), so identical data
+    gives identical bytes.
+
+    Raises:
+        ValueError: For a format not in EXPORT_FORMATS
+    """
+    if fmt == 'csv':
+        return df.to_csv(index=False).encode('utf-8')
+    if fmt == 'csv.gz':
+        return gzip.compress(df.to_csv(index=False).encode('utf-8'), mtime=0)
+    if fmt == 'parquet':
+        buf = io.BytesIO()
+        df.to_parquet(buf, index=False)
+        return buf.getvalue()
+    raise ValueError(f"Unsupported export format: {fmt}")
+
+
+def export_filename(stem: str, fmt: str) -> str:
+    return f"{stem}{EXPORT_FORMATS[fmt][0]}"
+
+
+def export_mime(fmt: str) -> str:
+    return EXPORT_FORMATS[fmt][1]
+
+
+class ExportCache:
+    """
+    LRU cache of encoded downloads keyed by (dataset key, filter key, format)
+
+    The dataset key identifies the data version (e.g. a file fingerprint or
+    hash) and the filter key the selection, so the frame is only built and
+    serialized on a miss. Entries are evicted least-recently-used once the
+    total size exceeds max_bytes. Safe to share between sessions.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, max_entries: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Tuple) -> bool:
+        return key in self._entries
+
+    def get(self, dataset_key: Hashable, filter_key: Hashable, fmt: str,
+            build: Callable[[], pd.DataFrame]) -> bytes:
+        """
+        Encoded bytes for a selection, building and encoding on a miss
+
+        Args:
+            dataset_key: Data version identifier
+            filter_key: Selection identifier (any hashable, e.g. a tuple of widget values)
+            fmt: One of EXPORT_FORMATS
+            build: Returns the frame to export; only called on a miss
+
+        Returns:
+            bytes: The encoded download
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        key = (dataset_key, filter_key, fmt)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+        data = encode_frame(build(), fmt)
+        with self._lock:
+            self.misses += 1
+            if key not in self._entries:
+                self._entries[key] = data
+                self.size_bytes += len(data)
+            self._evict()
+        logger.info(f"Encoded {fmt} export {filter_key!r} ({len(data)} bytes)")
+        return data
+
+    def _evict(self) -> None:
+        # Keep at least the newest entry even if it alone exceeds max_bytes
+        while len(self._entries) > 1 and (self.size_bytes > self.max_bytes or
+                                          (self.max_entries is not None and len(self._entries) > self.max_entries)):
+            _, old = self._entries.popitem(last=False)
+            self.size_bytes -= len(old)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {'entries': len(self._entries), 'size_bytes': self.size_bytes, 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,373 @@
+"""
+Forecasting pipeline: trend + event-effect forecasts for every indicator series, fanned out over processes
+"""
+import sys
+import argparse
+import hashlib
+import logging
+import os
+import pandas as pd
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+if __name__ == '__main__':
+    # Run as a script (python src/forecasting.py): make the repo root importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.data_loader import DEFAULT_DATA_PATH, load_unified_data, partition_by_record_type
+from src.indicator_store import IndicatorStore
+from src.scenario_engine import link_uncertainty, ramp_weights
+from src.trend_fitting import fit_trends, predict_trends, stack_series
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_PATH = "data/processed/forecast_all_series.csv"
+DEFAULT_FORECAST_YEARS = (2025, 2026, 2027)
+
+# Same scenario multipliers as notebook 04
+SCENARIOS = {
+    'pessimistic': {'trend_slope_mult': 0.8, 'event_effect_mult': 0.5},
+    'base':        {'trend_slope_mult': 1.0, 'event_effect_mult': 1.0},
+    'optimistic':  {'trend_slope_mult': 1.2, 'event_effect_mult': 1.5},
+}
+
+# reports/forecast_access_usage_2025_2027.csv columns, plus the series disaggregation
+FORECAST_COLUMNS = ['target', 'gender', 'location', 'scenario', 'year', 'baseline_forecast',
+                    'with_events_forecast', 'lower_95', 'upper_95', 'event_delta']
+
+# Forecast values per series x scenario x year
+OUTPUT_COLUMNS = FORECAST_COLUMNS[5:]
+
+# Minimum distinct years needed to fit a trend
+MIN_YEARS = 2
+
+# Forecast interval methods (see anchored_forecast)
+INTERVALS = ('prediction', 'band')
+
+SeriesKey = Tuple[str, str, str]
+
+# Read-only inputs shared by the worker processes (set once per worker by _init_worker)
+_SHARED: Dict = {}
+
+
+def anchored_forecast(fit: Dict[str, np.ndarray], anchor_values: np.ndarray, anchor_years: np.ndarray,
+                      forecast_years: Sequence[int], slope_mult: float,
+                      interval: str = 'prediction') -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Trend forecasts anchored on each series' anchor-year value, for a batch of series
+
+    Args:
+        fit: trend_fitting.fit_trends output for the batch
+        anchor_values, anchor_years: Per-series anchor level and year
+        forecast_years: Years to forecast
+        slope_mult: Scenario multiplier on the fitted slope
+        interval: 'prediction' for t-based OLS prediction intervals (series
+            with fewer than three years fall back to the band), or 'band'
+            for notebook 04's ±1.96 x max(RMSE, 15% of the level)
+
+    Returns:
+        tuple: yhat, lower, upper of shape (n_series, len(forecast_years))
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"Unknown interval: {interval}")
+    fy = np.asarray(forecast_years, dtype=float)[None, :]
+    yhat = fit['slope'][:, None] * slope_mult * (fy - anchor_years[:, None]) + anchor_values[:, None]
+    half = 1.96 * np.maximum(0.15 * np.abs(yhat), fit['rmse'][:, None])
+    if interval == 'prediction':
+        fitted, lower, _ = predict_trends(fit, fy[0])
+        half = np.where(np.isnan(lower), half, fitted - lower)
+    return yhat, yhat - half, yhat + half
+
+
+def anchor_points(x: np.ndarray, y: np.ndarray, mask: np.ndarray, fit: Dict[str, np.ndarray],
+                  anchor_year: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Anchor year and level of each stacked series
+
+    The level is the mean observation in the anchor year, or the trend value
+    there when the series has no observation that year.
+
+    Args:
+        x, y, mask: trend_fitting.stack_series output
+        fit: fit_trends output for the same batch
+        anchor_year: Common anchor year (default: each series' last observed year)
+
+    Returns:
+        tuple: anchor_years, anchor_values (one per series)
+    """
+    anchor_years = np.full(len(x), float(anchor_year)) if anchor_year else np.nanmax(x, axis=1)
+    at_anchor = mask & (x == anchor_years[:, None])
+    with np.errstate(invalid='ignore'):
+        observed = np.where(at_anchor, y, 0.0).sum(axis=1) / at_anchor.sum(axis=1)
+    anchor_values = np.where(at_anchor.any(axis=1), observed, fit['slope'] * anchor_years + fit['intercept'])
+    return anchor_years, anchor_values
+
+
+class EffectKernel:
+    """
+    Cumulative ramped event effect per indicator on a monthly grid
+
+    Built once per link set from link_uncertainty (signed effect per link,
+    see events_impact_modeler.link_effects) and ramp_weights. The grid runs
+    from the first event month to a month past the last completed ramp, so
+    the level at a year-end is an index lookup: zero before the grid and
+    the full cumulative effect after it. Forecasts for other years, anchors
+    or scenario multipliers reuse the kernel without touching the links.
+    """
+
+    def __init__(self, impact_links: Optional[pd.DataFrame] = None, events: Optional[pd.DataFrame] = None):
+        self._levels: Dict[str, np.ndarray] = {}
+        self._start = 0
+        if impact_links is None or impact_links.empty or events is None:
+            return
+        links = link_uncertainty(impact_links, events)
+        if links.empty:
+            return
+        event_month = links['event_month'].to_numpy(dtype=float)
+        lag = links['lag_months'].to_numpy(dtype=float)
+        self._start = int(np.floor(event_month.min()))
+        months = np.arange(self._start, int(np.ceil((event_month + lag).max())) + 2, dtype=float)
+        contrib = links['effect'].to_numpy()[:, None] * ramp_weights(months[None, :] - event_month[:, None],
+                                                                     lag[:, None])
+        codes, inverse = np.unique(links['related_indicator'].astype(str).to_numpy(), return_inverse=True)
+        levels = np.zeros((len(codes), len(months)))
+        np.add.at(levels, inverse, contrib)
+        self._levels = dict(zip(codes, levels))
+        logger.info(f"Built effect kernel: {len(links)} links, {len(codes)} indicators, {len(months)} months")
+
+    def __contains__(self, code: str) -> bool:
+        return code in self._levels
+
+    def __repr__(self) -> str:
+        return f"EffectKernel(indicators={len(self._levels)})"
+
+    def indicators(self) -> List[str]:
+        return sorted(self._levels)
+
+    def levels(self, code: str, years: Sequence[int]) -> np.ndarray:
+        """Cumulative effect on an indicator at each year-end (zeros for an unlinked indicator)"""
+        kernel = self._levels.get(code)
+        if kernel is None:
+            return np.zeros(len(years))
+        # Dec 31 of a year is month ordinal year * 12 + 12
+        pos = (np.asarray(years, dtype=np.int64) + 1) * 12 - self._start
+        return np.where(pos < 0, 0.0, kernel[np.clip(pos, 0, len(kernel) - 1)])
+
+    def deltas(self, codes: Sequence[str], years: Sequence[int], anchor_years: Sequence[float]) -> np.ndarray:
+        """
+        Effect added between each series' anchor year-end and each year-end
+
+        Returns:
+            np.ndarray: (len(codes), len(years))
+        """
+        out = np.zeros((len(codes), len(years)))
+        for i, (code, anchor) in enumerate(zip(codes, anchor_years)):
+            if code in self._levels:
+                out[i] = self.levels(code, years) - self.levels(code, [int(anchor)])[0]
+        return out
+
+
+# Kernels kept by effect_kernel, keyed on a hash of the link set
+MAX_CACHED_KERNELS = 8
+_KERNELS: 'OrderedDict[str, EffectKernel]' = OrderedDict()
+
+
+def _links_hash(impact_links: Optional[pd.DataFrame], events: Optional[pd.DataFrame]) -> str:
+    digest = hashlib.sha256()
+    for frame in (impact_links, events):
+        if frame is None:
+            digest.update(b'\0none')
+            continue
+        digest.update(repr(list(frame.columns)).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(frame.astype(str), index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def effect_kernel(impact_links: Optional[pd.DataFrame], events: Optional[pd.DataFrame]) -> EffectKernel:
+    """EffectKernel for a link set, built on the first request and reused while the links are unchanged"""
+    key = _links_hash(impact_links, events)
+    kernel = _KERNELS.get(key)
+    if kernel is None:
+        kernel = EffectKernel(impact_links, events)
+        _KERNELS[key] = kernel
+        while len(_KERNELS) > MAX_CACHED_KERNELS:
+            _KERNELS.popitem(last=False)
+    _KERNELS.move_to_end(key)
+    return kernel
+
+
+def scenario_outputs(fit: Dict[str, np.ndarray], anchor_values: np.ndarray, anchor_years: np.ndarray,
+                     forecast_years: Sequence[int], deltas: np.ndarray, is_percent: np.ndarray,
+                     scenarios: Dict, interval: str = 'prediction') -> Dict[str, np.ndarray]:
+    """
+    Baseline and with-events forecasts of a batch of series under every scenario
+
+    Each scenario scales the trend slope and the event deltas; percentage
+    series are clipped to [0, 100].
+
+    Args:
+        fit, anchor_values, anchor_years: As for anchored_forecast
+        forecast_years: Years to forecast
+        deltas: (n_series, n_years) event deltas (EffectKernel.deltas)
+        is_percent: (n_series,) bool
+        scenarios: Scenario multipliers (see SCENARIOS)
+        interval: See anchored_forecast
+
+    Returns:
+        dict: output column -> (n_series, n_scenarios, n_years) array
+    """
+    pct = np.asarray(is_percent, dtype=bool)[:, None]
+    outputs = {name: [] for name in OUTPUT_COLUMNS}
+    for pars in scenarios.values():
+        yhat, lo, hi = anchored_forecast(fit, anchor_values, anchor_years, forecast_years,
+                                         pars['trend_slope_mult'], interval)
+        delta = deltas * pars['event_effect_mult']
+        with_events = yhat + delta
+        outputs['baseline_forecast'].append(np.where(pct, np.clip(yhat, 0, 100), yhat))
+        outputs['with_events_forecast'].append(np.where(pct, np.clip(with_events, 0, 100), with_events))
+        outputs['lower_95'].append(np.where(pct, np.maximum(lo, 0.0), lo))
+        outputs['upper_95'].append(np.where(pct, np.minimum(hi, 100.0), hi))
+        outputs['event_delta'].append(delta)
+    return {name: np.stack(arrays, axis=1) for name, arrays in outputs.items()}
+
+
+def _init_worker(shared: Dict) -> None:
+    _SHARED.clear()
+    _SHARED.update(shared)
+
+
+def _forecast_chunk(keys: List[SeriesKey]) -> pd.DataFrame:
+    """Forecast a chunk of series with one batched trend fit, using the inputs in _SHARED"""
+    series = _SHARED['series']
+    forecast_years = _SHARED['forecast_years']
+    scenarios = _SHARED['scenarios']
+    n, s, h = len(keys), len(scenarios), len(forecast_years)
+
+    x, y, mask = stack_series((series[k][0], series[k][1]) for k in keys)
+    fit = fit_trends(x, y, mask)
+    anchor_years, anchor_values = anchor_points(x, y, mask, fit, _SHARED['anchor_year'])
+    is_percent = np.array([series[k][2] for k in keys], dtype=bool)
+    deltas = _SHARED['kernel'].deltas([k[0] for k in keys], forecast_years, anchor_years)
+    outputs = scenario_outputs(fit, anchor_values, anchor_years, forecast_years, deltas, is_percent, scenarios,
+                               _SHARED['interval'])
+
+    # Series-major rows: series x scenario x year
+    frame = pd.DataFrame({
+        'target': np.repeat([k[0] for k in keys], s * h), 'gender': np.repeat([k[1] for k in keys], s * h),
+        'location': np.repeat([k[2] for k in keys], s * h), 'scenario': np.tile(np.repeat(list(scenarios), h), n),
+        'year': np.tile(forecast_years, n * s),
+    })
+    for name, values in outputs.items():
+        frame[name] = values.ravel()
+    return frame
+
+
+def yearly_series(store: IndicatorStore, indicator_codes: Optional[List[str]] = None) -> Dict[SeriesKey, Tuple]:
+    """
+    Annual training series for every (indicator_code, gender, location)
+
+    Years are aggregated with IndicatorStore.yearly (mean for level-type
+    indicators, sum for flows); series with fewer than MIN_YEARS years are
+    left out.
+
+    Returns:
+        dict: key -> (years, values, is_percentage)
+    """
+    wanted = set(indicator_codes) if indicator_codes is not None else None
+    series = {}
+    for key in store.keys():
+        if wanted is not None and key[0] not in wanted:
+            continue
+        yearly = store.yearly(*key).dropna()
+        if len(yearly) < MIN_YEARS:
+            continue
+        series[key] = (yearly.index.to_numpy(dtype=float), yearly.to_numpy(dtype=float),
+                       store.value_type(*key) == 'percentage')
+    return series
+
+
+def forecast_all(observations, impact_links: Optional[pd.DataFrame] = None, events: Optional[pd.DataFrame] = None,
+                 forecast_years: Sequence[int] = DEFAULT_FORECAST_YEARS, anchor_year: Optional[int] = None,
+                 indicator_codes: Optional[List[str]] = None, scenarios: Optional[Dict] = None,
+                 max_workers: Optional[int] = None, chunk_size: Optional[int] = None,
+                 interval: str = 'prediction') -> pd.DataFrame:
+    """
+    Forecast every indicator x gender x location series
+
+    Series are split into chunks and fitted in a ProcessPoolExecutor; the
+    series table and event effect kernel are handed to each worker once
+    through the pool initializer rather than with every task. Each chunk is fitted with a
+    single batched least-squares solve (src.trend_fitting).
+
+    Args:
+        observations: Observations dataframe or a prebuilt IndicatorStore
+        impact_links: Impact links for the with-events forecast (optional)
+        events: Events matching impact_links
+        forecast_years: Years to forecast
+        anchor_year: Anchor year (default: last observed year per series)
+        indicator_codes: Restrict to these indicators
+        scenarios: Scenario multipliers (defaults to SCENARIOS)
+        max_workers: Process count (default os.cpu_count(); 1 runs inline)
+        chunk_size: Series per task (default: about four tasks per worker)
+        interval: 'prediction' (t-based OLS intervals) or 'band' (notebook 04)
+
+    Returns:
+        pd.DataFrame: FORECAST_COLUMNS, one row per series x scenario x year
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"Unknown interval: {interval}")
+    store = observations if isinstance(observations, IndicatorStore) else IndicatorStore(observations)
+    series = yearly_series(store, indicator_codes)
+    keys = sorted(series)
+    if not keys:
+        return pd.DataFrame(columns=FORECAST_COLUMNS)
+
+    shared = {
+        'series': series,
+        'kernel': effect_kernel(impact_links, events),
+        'forecast_years': list(forecast_years),
+        'anchor_year': anchor_year,
+        'scenarios': scenarios or SCENARIOS,
+        'interval': interval,
+    }
+
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(keys)))
+    chunk_size = chunk_size or max(1, -(-len(keys) // (workers * 4)))
+    chunks = [keys[i:i + chunk_size] for i in range(0, len(keys), chunk_size)]
+    if workers == 1:
+        _init_worker(shared)
+        results = [_forecast_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shared,)) as pool:
+            results = list(pool.map(_forecast_chunk, chunks))
+
+    forecast = pd.concat(results, ignore_index=True)[FORECAST_COLUMNS]
+    logger.info(f"Forecast {len(keys)} series in {len(chunks)} chunks on {workers} worker(s)")
+    return forecast
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--data', type=Path, default=Path(DEFAULT_DATA_PATH), help='Unified data CSV')
+    parser.add_argument('--out', type=Path, default=Path(DEFAULT_OUTPUT_PATH), help='Output CSV')
+    parser.add_argument('--years', type=int, nargs='+', default=list(DEFAULT_FORECAST_YEARS))
+    parser.add_argument('--anchor-year', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--interval', choices=INTERVALS, default='prediction', help='Forecast interval method')
+    args = parser.parse_args(argv)
+
+    df = load_unified_data(str(args.data), use_cache=True)
+    parts = partition_by_record_type(df, normalize=False)
+    forecast = forecast_all(parts['observations'], parts['impact_links'], parts['events'],
+                            forecast_years=args.years, anchor_year=args.anchor_year, max_workers=args.workers,
+                            interval=args.interval)
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    forecast.to_csv(args.out, index=False)
+    print(f"Wrote {args.out} ({len(forecast)} rows)")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,212 @@
+"""
+Declarative impact-link generation from a rule table
+"""
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional
+from datetime import datetime
+import logging
+
+from src.data_loader import normalize_unified_dtypes
+from src.events_impact_modeler import analyze_event_windows, create_impact_link_template
+from src.indicator_store import IndicatorStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_PATH = "data/raw/impact_link_rules.csv"
+
+# How a rule turns observations into impact_estimate:
+#   fixed          - the rule's impact_estimate as given
+#   year_change    - first value in to_year minus first value in from_year
+#   year_growth    - year_change relative to the from_year value
+#   window_change  - after minus before around the event (analyze_event_windows)
+#   window_growth  - window_change relative to the before value
+#   series_growth  - last vs first observation of the whole series
+# Empirical methods fall back to the rule's impact_estimate when data is missing
+ESTIMATE_METHODS = ['fixed', 'year_change', 'year_growth', 'window_change', 'window_growth', 'series_growth']
+
+RULE_COLUMNS = ['rule_id', 'event_code', 'event_category', 'related_indicator', 'pillar',
+                'relationship_type', 'impact_direction', 'impact_magnitude', 'lag_months',
+                'evidence_basis', 'estimate_method']
+
+RULE_NUMERIC_COLUMNS = ['lag_months', 'from_year', 'to_year', 'before_months', 'after_months', 'impact_estimate']
+
+# Rule columns copied verbatim onto the generated links
+LINK_FIELDS = ['pillar', 'indicator_code', 'indicator', 'related_indicator', 'relationship_type',
+               'impact_direction', 'impact_magnitude', 'lag_months', 'evidence_basis', 'confidence',
+               'comparable_country', 'source_name', 'notes']
+
+
+def load_impact_link_rules(filepath: str = DEFAULT_RULES_PATH) -> pd.DataFrame:
+    """
+    Load and check the impact-link rule table
+
+    Each rule selects events by event_code (events' indicator_code) or, when
+    that is blank, by event_category; a rule with neither produces a single
+    link without a parent event.
+
+    Args:
+        filepath: Path to the rule CSV (defaults to DEFAULT_RULES_PATH)
+
+    Returns:
+        pd.DataFrame: Rules with numeric columns parsed
+    """
+    rules = pd.read_csv(filepath)
+    missing = [c for c in RULE_COLUMNS if c not in rules.columns]
+    if missing:
+        raise ValueError(f"Rule table {filepath} is missing columns: {missing}")
+    unknown = sorted(set(rules['estimate_method'].dropna()) - set(ESTIMATE_METHODS))
+    if unknown:
+        raise ValueError(f"Unknown estimate_method values: {unknown}")
+    if rules['rule_id'].duplicated().any():
+        raise ValueError(f"Duplicate rule_id values: {rules.loc[rules['rule_id'].duplicated(), 'rule_id'].tolist()}")
+    for col in RULE_NUMERIC_COLUMNS:
+        rules[col] = pd.to_numeric(rules[col], errors='coerce') if col in rules.columns else np.nan
+    logger.info(f"Loaded {len(rules)} impact link rules from {filepath}")
+    return rules
+
+
+def _match_events(rules: pd.DataFrame, events: pd.DataFrame) -> pd.DataFrame:
+    """One row per (rule, event) match, in rule order then event order"""
+    ev = pd.DataFrame({
+        'event_id': events['record_id'].to_numpy(),
+        'match_code': events['indicator_code'].to_numpy() if 'indicator_code' in events.columns else None,
+        'match_category': events['category'].to_numpy() if 'category' in events.columns else None,
+        'event_pos': np.arange(len(events)),
+    })
+    rules = rules.assign(rule_pos=np.arange(len(rules)))
+    has_code = rules['event_code'].notna()
+    has_category = ~has_code & rules['event_category'].notna()
+    parts = [
+        rules[has_code].merge(ev, left_on='event_code', right_on='match_code'),
+        rules[has_category].merge(ev, left_on='event_category', right_on='match_category'),
+        rules[~has_code & ~has_category].assign(event_id=None, event_pos=-1),
+    ]
+    matched = pd.concat([p for p in parts if len(p)] or [parts[-1]], ignore_index=True)
+    unmatched = rules.loc[has_code & ~rules['event_code'].isin(ev['match_code']), 'rule_id'].tolist()
+    if unmatched:
+        logger.warning(f"Rules with no matching event: {unmatched}")
+    return matched.sort_values(['rule_pos', 'event_pos'], kind='stable').reset_index(drop=True)
+
+
+def _year_and_series_values(store: IndicatorStore, codes) -> Dict[str, pd.Series]:
+    """First value per (indicator, year) plus first/last value per indicator"""
+    year_keys, year_values, first, last = [], [], {}, {}
+    for code in codes:
+        dates, values = store.arrays(code)
+        if not len(dates):
+            continue
+        years = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+        uniq, first_pos = np.unique(years, return_index=True)
+        year_keys.extend((code, int(y)) for y in uniq)
+        year_values.extend(values[first_pos])
+        first[code], last[code] = values[0], values[-1]
+    return {
+        'year': pd.Series(year_values, index=pd.MultiIndex.from_tuples(year_keys) if year_keys else None,
+                          dtype=float),
+        'first': pd.Series(first, dtype=float),
+        'last': pd.Series(last, dtype=float),
+    }
+
+
+def _format_text(templates: pd.Series, before, after, estimate) -> List[Optional[str]]:
+    """Fill {before}/{after}/{estimate} placeholders; None if a used value is missing"""
+    texts = []
+    for text, b, a, e in zip(templates, before, after, estimate):
+        if not isinstance(text, str) or '{' not in text:
+            texts.append(text if isinstance(text, str) else None)
+            continue
+        used = {'before': b, 'after': a, 'estimate': e}
+        if any(f'{{{k}' in text and pd.isna(v) for k, v in used.items()):
+            texts.append(None)
+            continue
+        texts.append(text.format(**used))
+    return texts
+
+
+def generate_impact_links(rules: pd.DataFrame, events: pd.DataFrame, observations,
+                          start_number: int = 1, collected_by: str = 'Data Scientist') -> pd.DataFrame:
+    """
+    Evaluate the rule table against events and observations in one batch
+
+    Args:
+        rules: Output of load_impact_link_rules
+        events: Events dataframe (record_id, indicator_code, category, date)
+        observations: Observations dataframe or a prebuilt IndicatorStore
+        start_number: Numeric suffix of the first generated IMP_ id
+        collected_by: Value for the collected_by field
+
+    Returns:
+        pd.DataFrame: Impact link records in the unified schema, typed with
+            data_loader.normalize_unified_dtypes
+    """
+    store = observations if isinstance(observations, IndicatorStore) else IndicatorStore(observations)
+    links = _match_events(rules, events)
+    n = len(links)
+    method = links['estimate_method'].fillna('fixed').to_numpy()
+    before = np.full(n, np.nan)
+    after = np.full(n, np.nan)
+
+    # Calendar-year comparisons and whole-series growth
+    lookup = _year_and_series_values(store, links['related_indicator'].dropna().unique())
+    is_year = np.isin(method, ['year_change', 'year_growth'])
+    if is_year.any():
+        code = links['related_indicator'].to_numpy()[is_year]
+        for years, out in (('from_year', before), ('to_year', after)):
+            idx = pd.MultiIndex.from_arrays([code, links[years].to_numpy()[is_year]])
+            out[is_year] = lookup['year'].reindex(idx).to_numpy() if len(lookup['year']) else np.nan
+    is_series = method == 'series_growth'
+    if is_series.any():
+        code = links.loc[is_series, 'related_indicator']
+        before[is_series] = lookup['first'].reindex(code).to_numpy()
+        after[is_series] = lookup['last'].reindex(code).to_numpy()
+
+    # Event windows: one batched analyzer call per distinct window length
+    is_window = np.isin(method, ['window_change', 'window_growth']) & links['event_id'].notna().to_numpy()
+    if is_window.any():
+        bounds = links.loc[is_window, ['before_months', 'after_months']].fillna(-1).astype(int)
+        for (bm, am), grp in bounds.groupby(['before_months', 'after_months'], sort=False):
+            rows = links.loc[grp.index]
+            stats = analyze_event_windows(
+                events[events['record_id'].isin(rows['event_id'])], store,
+                rows['related_indicator'].unique().tolist(),
+                before_months=bm if bm >= 0 else None, after_months=am if am >= 0 else None)
+            stats = stats.set_index(['event_id', 'indicator_code'])
+            idx = pd.MultiIndex.from_arrays([rows['event_id'], rows['related_indicator']])
+            before[grp.index] = stats['before_value'].reindex(idx).to_numpy()
+            after[grp.index] = stats['after_value'].reindex(idx).to_numpy()
+
+    change = after - before
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = np.where(before != 0, change / before, np.nan)
+    computed = np.select(
+        [np.isin(method, ['year_change', 'window_change']),
+         np.isin(method, ['year_growth', 'window_growth', 'series_growth'])],
+        [change, growth], default=np.nan)
+    fallback = links['impact_estimate'].to_numpy(dtype=float)
+    estimate = np.where(np.isnan(computed), fallback, computed)
+    n_fallback = int((np.isnan(computed) & (method != 'fixed')).sum())
+    if n_fallback:
+        logger.info(f"{n_fallback} empirical estimates fell back to the rule's impact_estimate")
+
+    template = create_impact_link_template()
+    out = pd.DataFrame({col: [template[col]] * n for col in template})
+    out['record_id'] = [f"IMP_{i:03d}" for i in range(start_number, start_number + n)]
+    out['parent_id'] = links['event_id'].to_numpy()
+    for col in LINK_FIELDS:
+        if col in links.columns:
+            out[col] = links[col].to_numpy()
+    event_suffix = links['event_code'].fillna(links['event_category']).fillna('LINK').astype(str).str.replace(r'^EVT_', '', regex=True)
+    default_code = 'IMP_' + event_suffix.str.upper() + '_' + links['related_indicator'].astype(str)
+    out['indicator_code'] = out['indicator_code'].where(out['indicator_code'].notna(), default_code.to_numpy())
+    out['indicator'] = out['indicator'].where(out['indicator'].notna(),
+                                              ('Impact: ' + event_suffix + ' on ' + links['related_indicator'].astype(str)).to_numpy())
+    out['confidence'] = out['confidence'].fillna(template['confidence'])
+    out['impact_estimate'] = estimate
+    out['original_text'] = _format_text(links['original_text'] if 'original_text' in links.columns else pd.Series([None] * n),
+                                        before, after, estimate)
+    out['collected_by'] = collected_by
+    out['collection_date'] = datetime.now().strftime('%Y-%m-%d')
+
+    logger.info(f"Generated {n} impact links from {len(rules)} rules")
+    return normalize_unified_dtypes(out)
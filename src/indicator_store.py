@@ -0,0 +1,179 @@
+"""
+Indexed store of observation series keyed by (indicator_code, gender, location)
+"""
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GENDER = 'all'
+DEFAULT_LOCATION = 'national'
+
+# Level-type value_types are averaged within a year; everything else (counts,
+# currency volumes) is summed
+MEAN_VALUE_TYPES = ['percentage', 'ratio', 'rate', 'index', 'gap_pp']
+
+SeriesKey = Tuple[str, str, str]
+
+
+class IndicatorStore:
+    """
+    Pre-sorted observation series with O(1) lookup
+
+    The observations frame is parsed and sorted once; each
+    (indicator_code, gender, location) series is kept as a pair of NumPy
+    arrays (dates, values) so repeated lookups never rescan the frame.
+    Missing gender/location are treated as DEFAULT_GENDER/DEFAULT_LOCATION.
+    """
+
+    def __init__(self, observations: pd.DataFrame):
+        cols = ['indicator_code', 'observation_date', 'value_numeric']
+        obs = observations[cols].copy()
+        obs['gender'] = observations['gender'] if 'gender' in observations.columns else DEFAULT_GENDER
+        obs['location'] = observations['location'] if 'location' in observations.columns else DEFAULT_LOCATION
+        obs['value_type'] = observations['value_type'] if 'value_type' in observations.columns else None
+        obs['observation_date'] = pd.to_datetime(obs['observation_date'], errors='coerce')
+        obs['value_numeric'] = pd.to_numeric(obs['value_numeric'], errors='coerce')
+        obs = obs.dropna(subset=['indicator_code', 'observation_date'])
+        for col, default in (('gender', DEFAULT_GENDER), ('location', DEFAULT_LOCATION)):
+            obs[col] = obs[col].astype(object).where(obs[col].notna(), default).astype(str)
+        obs['indicator_code'] = obs['indicator_code'].astype(str)
+        obs = obs.sort_values(['indicator_code', 'gender', 'location', 'observation_date'], kind='stable')
+
+        dates = obs['observation_date'].to_numpy(dtype='datetime64[ns]')
+        values = obs['value_numeric'].to_numpy(dtype=float)
+        group = obs.groupby(['indicator_code', 'gender', 'location'], sort=False).ngroup().to_numpy()
+        starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]]) if len(group) else np.array([], dtype=int)
+        stops = np.r_[starts[1:], len(group)].astype(int)
+        heads = obs.iloc[starts]
+
+        self._series: Dict[SeriesKey, Tuple[np.ndarray, np.ndarray]] = {}
+        self._value_types: Dict[SeriesKey, Optional[str]] = {}
+        self._yearly: Dict[Tuple[SeriesKey, str], pd.Series] = {}
+        for start, stop, code, gender, location, vt in zip(starts, stops, heads['indicator_code'], heads['gender'],
+                                                           heads['location'], heads['value_type']):
+            key = (code, gender, location)
+            self._series[key] = (dates[start:stop], values[start:stop])
+            self._value_types[key] = vt if isinstance(vt, str) else None
+        logger.info(f"Indexed {len(self._series)} indicator series")
+
+    def __contains__(self, key) -> bool:
+        return self._key(*key) in self._series if isinstance(key, tuple) else self._key(key) in self._series
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    @staticmethod
+    def _key(code: str, gender: str = DEFAULT_GENDER, location: str = DEFAULT_LOCATION) -> SeriesKey:
+        return (code, gender, location)
+
+    def keys(self) -> List[SeriesKey]:
+        """All (indicator_code, gender, location) keys in the store"""
+        return list(self._series.keys())
+
+    def indicator_codes(self) -> List[str]:
+        """Distinct indicator codes, sorted"""
+        return sorted({k[0] for k in self._series})
+
+    def arrays(self, code: str, gender: str = DEFAULT_GENDER,
+               location: str = DEFAULT_LOCATION) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sorted (dates, values) arrays for one series
+
+        Returns:
+            tuple: datetime64[ns] dates and float values; empty if unknown
+        """
+        return self._series.get(self._key(code, gender, location),
+                                (np.array([], dtype='datetime64[ns]'), np.array([], dtype=float)))
+
+    def series(self, code: str, gender: str = DEFAULT_GENDER, location: str = DEFAULT_LOCATION) -> pd.Series:
+        """Date-indexed value series (empty if unknown)"""
+        dates, values = self.arrays(code, gender, location)
+        return pd.Series(values, index=pd.DatetimeIndex(dates, name='observation_date'), name=code)
+
+    def value_type(self, code: str, gender: str = DEFAULT_GENDER, location: str = DEFAULT_LOCATION) -> Optional[str]:
+        """value_type of the series (first observation), or None"""
+        return self._value_types.get(self._key(code, gender, location))
+
+    def aggregation_for(self, code: str, gender: str = DEFAULT_GENDER, location: str = DEFAULT_LOCATION) -> str:
+        """'mean' for level-type indicators, 'sum' for flows such as counts"""
+        vt = self.value_type(code, gender, location)
+        return 'mean' if vt in MEAN_VALUE_TYPES else 'sum'
+
+    def latest_value(self, code: str, gender: str = DEFAULT_GENDER,
+                     location: str = DEFAULT_LOCATION) -> Optional[float]:
+        """Most recent observed value, or None"""
+        _, values = self.arrays(code, gender, location)
+        return float(values[-1]) if len(values) else None
+
+    def latest_date(self, code: str, gender: str = DEFAULT_GENDER,
+                    location: str = DEFAULT_LOCATION) -> Optional[pd.Timestamp]:
+        """Date of the most recent observation, or None"""
+        dates, _ = self.arrays(code, gender, location)
+        return pd.Timestamp(dates[-1]) if len(dates) else None
+
+    def value_in_year(self, code: str, year: int, gender: str = DEFAULT_GENDER,
+                      location: str = DEFAULT_LOCATION, which: str = 'first') -> Optional[float]:
+        """
+        First or last observed value within a calendar year
+
+        Args:
+            year: Calendar year
+            which: 'first' or 'last' observation of the year
+
+        Returns:
+            float or None: None when the series has no observation that year
+        """
+        dates, values = self.arrays(code, gender, location)
+        bounds = np.array([f'{year}-01-01', f'{year + 1}-01-01'], dtype='datetime64[ns]')
+        lo, hi = np.searchsorted(dates, bounds, side='left')
+        if lo == hi:
+            return None
+        return float(values[lo if which == 'first' else hi - 1])
+
+    def yearly(self, code: str, gender: str = DEFAULT_GENDER, location: str = DEFAULT_LOCATION,
+               how: Optional[str] = None) -> pd.Series:
+        """
+        Calendar-year aggregate of a series (memoized)
+
+        Args:
+            how: 'mean' or 'sum'; defaults to aggregation_for the series
+
+        Returns:
+            pd.Series: year -> aggregated value (NaN values are skipped)
+        """
+        key = self._key(code, gender, location)
+        how = how or self.aggregation_for(*key)
+        cached = self._yearly.get((key, how))
+        if cached is not None:
+            return cached
+        dates, values = self.arrays(*key)
+        ok = ~np.isnan(values)
+        years = dates[ok].astype('datetime64[Y]').astype(np.int64) + 1970
+        uniq, inverse = np.unique(years, return_inverse=True)
+        totals = np.bincount(inverse, weights=values[ok], minlength=len(uniq))
+        if how == 'mean':
+            totals = totals / np.bincount(inverse, minlength=len(uniq))
+        elif how != 'sum':
+            raise ValueError(f"Unsupported aggregation: {how}")
+        result = pd.Series(totals, index=pd.Index(uniq, name='year'), name=code)
+        self._yearly[(key, how)] = result
+        return result
+
+    def yoy_change(self, code: str, gender: str = DEFAULT_GENDER, location: str = DEFAULT_LOCATION,
+                   how: Optional[str] = None) -> Optional[float]:
+        """
+        Percent change between the last two years with data
+
+        Returns:
+            float or None: None with fewer than two years or a zero base
+        """
+        agg = self.yearly(code, gender, location, how)
+        if len(agg) < 2:
+            return None
+        last, prev = agg.iloc[-1], agg.iloc[-2]
+        if prev == 0:
+            return None
+        return float((last - prev) / prev * 100.0)
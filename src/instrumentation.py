@@ -0,0 +1,268 @@
+"""
+Opt-in stage timing and memory instrumentation for the data pipeline
+
+Pipeline entry points are wrapped with @instrument; nothing is recorded
+until a Trace is enabled, and while disabled a wrapped call costs one
+attribute check. Each recorded stage carries wall time, rows in/out and
+(optionally) its tracemalloc peak, and a trace exports to JSON or to the
+Chrome trace format (chrome://tracing, Perfetto).
+
+    from src.instrumentation import tracing
+    with tracing() as trace:
+        load_and_prepare_data(path)
+    print(trace.summary())
+    trace.to_chrome_trace('reports/trace.json')
+
+Setting FI_TRACE=<path> enables tracing for the whole process and writes a
+Chrome trace there on exit.
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import pandas as pd
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+STAGE_COLUMNS = ['stage', 'start_s', 'wall_s', 'rows_in', 'rows_out', 'peak_bytes', 'depth', 'thread']
+
+
+def count_rows(obj: Any) -> Optional[int]:
+    """
+    Rows carried by a stage argument or result
+
+    DataFrames and Series count their length; dicts, lists and tuples the
+    sum over their frames; anything else (or a container with no frames)
+    is None.
+    """
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return len(obj)
+    values = obj.values() if isinstance(obj, dict) else obj if isinstance(obj, (list, tuple)) else ()
+    counts = [count_rows(v) for v in values if isinstance(v, (pd.DataFrame, pd.Series, dict))]
+    counts = [c for c in counts if c is not None]
+    return sum(counts) if counts else None
+
+
+def _rows_in(args: tuple, kwargs: dict) -> Optional[int]:
+    for value in list(args) + list(kwargs.values()):
+        rows = count_rows(value) if isinstance(value, (pd.DataFrame, pd.Series, dict)) else None
+        if rows is not None:
+            return rows
+    return None
+
+
+class Trace:
+    """
+    Recorded stages of one profiling session
+
+    Peak memory is the tracemalloc high-water mark above the memory in use
+    when the stage started, so nested stages each report their own peak.
+    tracemalloc is process-wide: with concurrent threads a stage's peak
+    includes the other threads' allocations.
+    """
+
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.stages: List[Dict] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+        self._started_tracemalloc = False
+
+    def _stack(self) -> list:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def start(self) -> None:
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def stop(self) -> None:
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def enter(self, name: str, rows_in: Optional[int] = None) -> Dict:
+        stack = self._stack()
+        frame = {'stage': name, 'rows_in': rows_in, 'depth': len(stack)}
+        if self.trace_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]['_max'] = max(stack[-1]['_max'], peak)
+            tracemalloc.reset_peak()
+            frame['_base'] = frame['_max'] = current
+        stack.append(frame)
+        frame['_t0'] = time.perf_counter()
+        return frame
+
+    def exit(self, frame: Dict, rows_out: Optional[int] = None) -> None:
+        end = time.perf_counter()
+        stack = self._stack()
+        stack.pop()
+        peak = None
+        if '_base' in frame and tracemalloc.is_tracing():
+            frame['_max'] = max(frame['_max'], tracemalloc.get_traced_memory()[1])
+            peak = frame['_max'] - frame['_base']
+            if stack:
+                stack[-1]['_max'] = max(stack[-1]['_max'], frame['_max'])
+        record = {
+            'stage': frame['stage'], 'start_s': frame['_t0'] - self._origin, 'wall_s': end - frame['_t0'],
+            'rows_in': frame['rows_in'], 'rows_out': rows_out, 'peak_bytes': peak, 'depth': frame['depth'],
+            'thread': threading.get_ident(),
+        }
+        with self._lock:
+            self.stages.append(record)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Per-stage totals, slowest first
+
+        Returns:
+            pd.DataFrame: stage, calls, wall_s, rows_in, rows_out, peak_bytes (max)
+        """
+        stages = pd.DataFrame(self.stages, columns=STAGE_COLUMNS)
+        return (stages.groupby('stage', sort=False)
+                .agg(calls=('wall_s', 'size'), wall_s=('wall_s', 'sum'), rows_in=('rows_in', 'sum'),
+                     rows_out=('rows_out', 'sum'), peak_bytes=('peak_bytes', 'max'))
+                .sort_values('wall_s', ascending=False).reset_index())
+
+    def to_json(self, path) -> Path:
+        """Write the raw stage records as JSON"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({'stages': self.stages}, indent=1))
+        return path
+
+    def to_chrome_trace(self, path) -> Path:
+        """Write complete ('X') events in the Chrome trace event format"""
+        pid = os.getpid()
+        events = [{
+            'name': s['stage'], 'cat': 'stage', 'ph': 'X', 'pid': pid, 'tid': s['thread'],
+            'ts': s['start_s'] * 1e6, 'dur': s['wall_s'] * 1e6,
+            'args': {k: s[k] for k in ('rows_in', 'rows_out', 'peak_bytes')},
+        } for s in self.stages]
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'}))
+        return path
+
+
+# The active trace; None means instrumentation is off
+_active: Optional[Trace] = None
+
+
+def enable(trace_memory: bool = True) -> Trace:
+    """Start recording into a new Trace (replacing any active one)"""
+    global _active
+    disable()
+    trace = Trace(trace_memory)
+    trace.start()
+    _active = trace
+    return trace
+
+
+def disable() -> Optional[Trace]:
+    """Stop recording; returns the trace that was active"""
+    global _active
+    trace, _active = _active, None
+    if trace is not None:
+        trace.stop()
+    return trace
+
+
+def enable_trace(trace: Trace) -> None:
+    """Resume recording into an existing Trace"""
+    global _active
+    trace.start()
+    _active = trace
+
+
+def active_trace() -> Optional[Trace]:
+    return _active
+
+
+@contextmanager
+def tracing(trace_memory: bool = True):
+    """Record stages for the duration of the block and yield the Trace"""
+    previous = _active
+    trace = enable(trace_memory)
+    try:
+        yield trace
+    finally:
+        disable()
+        if previous is not None:
+            enable_trace(previous)
+
+
+@contextmanager
+def stage(name: str, rows_in: Optional[int] = None):
+    """
+    Record a block as a stage; yields a dict whose 'rows_out' may be set
+
+        with stage('merge', rows_in=len(df)) as s:
+            out = df.merge(...)
+            s['rows_out'] = len(out)
+    """
+    trace = _active
+    if trace is None:
+        yield {}
+        return
+    result = {'rows_out': None}
+    frame = trace.enter(name, rows_in)
+    try:
+        yield result
+    finally:
+        trace.exit(frame, result['rows_out'])
+
+
+def instrument(fn: Optional[Callable] = None, *, name: Optional[str] = None,
+               rows_out: Callable[[Any], Optional[int]] = count_rows):
+    """
+    Decorator recording each call of a function as a stage
+
+    rows_in is taken from the first DataFrame/Series/dict argument and
+    rows_out from the result (count_rows unless a rows_out callable is
+    given). Usable bare (@instrument) or with options (@instrument(name='load')).
+    """
+    def decorate(func: Callable) -> Callable:
+        stage_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _active
+            if trace is None:
+                return func(*args, **kwargs)
+            frame = trace.enter(stage_name, _rows_in(args, kwargs))
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            finally:
+                trace.exit(frame, rows_out(result) if result is not None else None)
+        return wrapper
+
+    return decorate(fn) if fn is not None else decorate
+
+
+def _trace_from_env() -> None:
+    path = os.environ.get('FI_TRACE')
+    if not path:
+        return
+    trace = enable()
+
+    def write():
+        trace.to_chrome_trace(path)
+        logger.info(f"Wrote trace of {len(trace.stages)} stages to {path}")
+    atexit.register(write)
+
+
+_trace_from_env()
@@ -0,0 +1,165 @@
+"""
+KPI snapshot: headline metrics for every indicator series, materialized once per data file version
+"""
+import sys
+import argparse
+import hashlib
+import json
+import logging
+import os
+import numpy as np
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+if __name__ == '__main__':
+    # Run as a script (python src/kpi_snapshot.py): make the repo root importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.data_loader import load_unified_data, partition_by_record_type
+from src.indicator_store import DEFAULT_GENDER, DEFAULT_LOCATION, IndicatorStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_PATH = "data/processed/ethiopia_fi_unified_data_combined.csv"
+DEFAULT_SNAPSHOT_PATH = "data/processed/kpi_snapshot.json"
+SNAPSHOT_VERSION = 1
+
+# Series behind the P2P/ATM crossover headline
+P2P_CODE = 'USG_P2P_COUNT'
+ATM_CODE = 'USG_ATM_COUNT'
+
+
+def file_sha256(filepath, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents, read in chunks"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot_key(code: str, gender: str = DEFAULT_GENDER, location: str = DEFAULT_LOCATION) -> str:
+    """Key of a series in snapshot['indicators']"""
+    return f"{code}|{gender}|{location}"
+
+
+def _number(value) -> Optional[float]:
+    """JSON-safe float (NaN/inf/None -> None)"""
+    if value is None:
+        return None
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def compute_kpis(observations) -> Dict:
+    """
+    Headline metrics for every indicator x gender x location series
+
+    Args:
+        observations: Observations dataframe or a prebuilt IndicatorStore
+
+    Returns:
+        dict: 'indicators' (snapshot_key -> metrics) and 'headline' (cross-series KPIs)
+    """
+    store = observations if isinstance(observations, IndicatorStore) else IndicatorStore(observations)
+    indicators = {}
+    for key in store.keys():
+        dates, _ = store.arrays(*key)
+        yearly = store.yearly(*key)
+        latest_date = store.latest_date(*key)
+        indicators[snapshot_key(*key)] = {
+            'indicator_code': key[0], 'gender': key[1], 'location': key[2],
+            'value_type': store.value_type(*key),
+            'aggregation': store.aggregation_for(*key),
+            'n_observations': int(len(dates)),
+            'latest_value': _number(store.latest_value(*key)),
+            'latest_date': latest_date.date().isoformat() if latest_date is not None else None,
+            'latest_year': int(yearly.index[-1]) if len(yearly) else None,
+            'latest_year_value': _number(yearly.iloc[-1]) if len(yearly) else None,
+            'yoy_change': _number(store.yoy_change(*key)),
+        }
+
+    # P2P/ATM crossover: ratio of last-year totals when both series end in the same year
+    ratio = ratio_year = None
+    if P2P_CODE in store and ATM_CODE in store:
+        p2p = store.yearly(P2P_CODE, how='sum')
+        atm = store.yearly(ATM_CODE, how='sum')
+        if len(p2p) and len(atm) and p2p.index[-1] == atm.index[-1]:
+            ratio_year = int(p2p.index[-1])
+            ratio = _number(p2p.iloc[-1] / atm.iloc[-1]) if atm.iloc[-1] else None
+    headline = {'p2p_atm_ratio': ratio, 'p2p_atm_ratio_year': ratio_year}
+    return {'indicators': indicators, 'headline': headline}
+
+
+def write_kpi_snapshot(data_path: str = DEFAULT_DATA_PATH, out_path: str = DEFAULT_SNAPSHOT_PATH,
+                       observations=None) -> Path:
+    """
+    Materialize the KPI snapshot for a data file
+
+    The snapshot records the SHA-256 of data_path so readers can tell
+    whether it still matches the data. Written atomically.
+
+    Args:
+        data_path: Unified data CSV the metrics describe
+        out_path: Snapshot JSON path
+        observations: Already-loaded observations (or IndicatorStore) for
+            data_path, to skip re-reading the file
+
+    Returns:
+        Path: The written snapshot
+    """
+    if observations is None:
+        df = load_unified_data(str(data_path), record_types=['observation'])
+        observations = partition_by_record_type(df, normalize=False)['observations']
+    snapshot = {
+        'version': SNAPSHOT_VERSION,
+        'data_path': str(data_path),
+        'data_sha256': file_sha256(data_path),
+        'generated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        **compute_kpis(observations),
+    }
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_suffix('.tmp')
+    tmp.write_text(json.dumps(snapshot, indent=1))
+    os.replace(tmp, out_path)
+    logger.info(f"Wrote KPI snapshot for {len(snapshot['indicators'])} series to {out_path}")
+    return out_path
+
+
+def load_kpi_snapshot(path: str = DEFAULT_SNAPSHOT_PATH, data_path: Optional[str] = None) -> Optional[Dict]:
+    """
+    Read a KPI snapshot
+
+    Args:
+        path: Snapshot JSON path
+        data_path: When given, the snapshot is only returned if it was built
+            from this file's current contents
+
+    Returns:
+        dict or None: None when missing, from another version, or stale
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    snapshot = json.loads(path.read_text())
+    if snapshot.get('version') != SNAPSHOT_VERSION:
+        return None
+    if data_path is not None and snapshot.get('data_sha256') != file_sha256(data_path):
+        logger.info(f"KPI snapshot {path} is stale for {data_path}")
+        return None
+    return snapshot
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--data', default=DEFAULT_DATA_PATH, help='Unified data CSV')
+    parser.add_argument('--out', default=DEFAULT_SNAPSHOT_PATH, help='Snapshot JSON')
+    args = parser.parse_args(argv)
+    out = write_kpi_snapshot(args.data, args.out)
+    print(f"Wrote {out}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
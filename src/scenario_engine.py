@@ -0,0 +1,197 @@
+"""
+Monte Carlo scenario engine: simulated forecast paths with trend, impact-magnitude and lag uncertainty
+"""
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+import logging
+
+from src.events_impact_modeler import link_effects
+from src.indicator_store import IndicatorStore
+from src.trend_fitting import fit_trends
+
+logger = logging.getLogger(__name__)
+
+# Coefficient of variation of a link's magnitude and lag, by link confidence
+CONFIDENCE_CV = {'high': 0.1, 'medium': 0.25, 'low': 0.5, 'estimated': 0.35}
+DEFAULT_CV = 0.35
+
+# Multiplier on that spread, by evidence basis (weaker evidence -> wider)
+EVIDENCE_SCALE = {'empirical': 1.0, 'literature': 1.5, 'expert': 1.75, 'theoretical': 2.0}
+DEFAULT_EVIDENCE_SCALE = 1.5
+
+DEFAULT_PERCENTILES = (2.5, 50.0, 97.5)
+
+# Upper bound on path x link x year cells held in memory at once
+MAX_CHUNK_CELLS = 20_000_000
+
+
+def link_uncertainty(impact_links: pd.DataFrame, events: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-link simulation inputs
+
+    Returns:
+        pd.DataFrame: related_indicator, event_month (months since year 0),
+            effect, lag_months and sigma (log-scale spread) per dated link
+    """
+    links = impact_links.copy()
+    if 'related_indicator' not in links.columns:
+        links['related_indicator'] = links.get('indicator_code')
+    date_col = next((c for c in ['event_date', 'observation_date', 'date', 'period_start'] if c in events.columns), None)
+    if 'event_date' not in links.columns:
+        ev = pd.DataFrame({'parent_id': events['record_id'].to_numpy(),
+                           'event_date': events[date_col].to_numpy() if date_col else pd.NaT})
+        links = links.merge(ev.drop_duplicates('parent_id'), on='parent_id', how='left')
+    dates = pd.to_datetime(links['event_date'], errors='coerce')
+    confidence = links['confidence'] if 'confidence' in links.columns else pd.Series(index=links.index, dtype=object)
+    evidence = links['evidence_basis'] if 'evidence_basis' in links.columns else pd.Series(index=links.index, dtype=object)
+    cv = confidence.map(CONFIDENCE_CV).fillna(DEFAULT_CV).to_numpy(dtype=float)
+    scale = evidence.map(EVIDENCE_SCALE).fillna(DEFAULT_EVIDENCE_SCALE).to_numpy(dtype=float)
+    lag = pd.to_numeric(links['lag_months'], errors='coerce').fillna(0).clip(lower=0) if 'lag_months' in links.columns \
+        else pd.Series(0.0, index=links.index)
+    out = pd.DataFrame({
+        'related_indicator': links['related_indicator'].to_numpy(),
+        'event_month': (dates.dt.year * 12 + dates.dt.month - 1 + (dates.dt.day - 1) / dates.dt.days_in_month).to_numpy(),
+        'effect': link_effects(links).to_numpy() if len(links) else np.array([], dtype=float),
+        'lag_months': lag.to_numpy(dtype=float),
+        'sigma': cv * scale,
+    })
+    return out[out['event_month'].notna()].reset_index(drop=True)
+
+
+def fit_linear_trend(years: np.ndarray, values: np.ndarray) -> Dict[str, float]:
+    """
+    OLS trend (trend_fitting.fit_trends) with the standard error of the slope and residual spread
+
+    Returns:
+        dict: slope, intercept, slope_se, resid_sd (0 when under-determined)
+    """
+    fit = fit_trends(np.asarray(years, dtype=float)[None, :], np.asarray(values, dtype=float)[None, :])
+    slope, intercept, sxx = (float(fit[k][0]) for k in ('slope', 'intercept', 'sxx'))
+    resid_sd = float(np.nan_to_num(fit['resid_sd'][0]))
+    slope_se = resid_sd / np.sqrt(sxx) if sxx > 0 else 0.0
+    return {'slope': slope, 'intercept': intercept, 'slope_se': float(slope_se), 'resid_sd': resid_sd}
+
+
+def ramp_weights(elapsed: np.ndarray, lag: np.ndarray) -> np.ndarray:
+    """Linear ramp to full effect over lag months; step when lag is zero"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ramp = np.clip(elapsed / lag, 0.0, 1.0)
+    return np.where(lag > 0, ramp, (elapsed >= 0).astype(float))
+
+
+def simulate_paths(years: np.ndarray, values: np.ndarray, links: pd.DataFrame, forecast_years: Sequence[int],
+                   n_paths: int = 100_000, anchor_year: Optional[int] = None,
+                   resid_floor: float = 0.0, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """
+    Simulate forecast paths for one indicator
+
+    Each path draws a trend slope (normal around the OLS slope), one residual
+    per forecast year, and for every link a magnitude multiplier (log-normal,
+    mean one) and a lag (gamma, mean lag_months) with spread link.sigma.
+    Event effects enter as the change in the ramped effect between the
+    anchor year-end and each forecast year-end.
+
+    Args:
+        years, values: Annual training series
+        links: Rows of link_uncertainty for this indicator
+        forecast_years: Years to simulate
+        n_paths: Number of paths
+        anchor_year: Year the forecast is anchored on (default: last observed)
+        resid_floor: Minimum residual sd as a fraction of the anchor level,
+            for series too short to estimate one; with the default 0.0 a
+            series of two or fewer years has no trend or residual spread,
+            so only its links (if any) widen the paths
+        rng: NumPy generator; results for a given generator state do not
+            depend on MAX_CHUNK_CELLS
+
+    Returns:
+        np.ndarray: (n_paths, len(forecast_years)) simulated values
+    """
+    rng = rng or np.random.default_rng()
+    years = np.asarray(years, dtype=float)
+    values = np.asarray(values, dtype=float)
+    fy = np.asarray(forecast_years, dtype=float)
+    trend = fit_linear_trend(years, values)
+    anchor_year = int(years.max()) if anchor_year is None else int(anchor_year)
+    observed = values[years == anchor_year]
+    anchor = float(observed.mean()) if len(observed) else trend['slope'] * anchor_year + trend['intercept']
+
+    resid_sd = max(trend['resid_sd'], resid_floor * abs(anchor))
+    slope = rng.normal(trend['slope'], trend['slope_se'], size=(n_paths, 1))
+    paths = anchor + slope * (fy - anchor_year) + rng.normal(0.0, resid_sd, size=(n_paths, len(fy)))
+
+    if len(links):
+        effect = links['effect'].to_numpy(dtype=float)
+        lag = links['lag_months'].to_numpy(dtype=float)
+        sigma = links['sigma'].to_numpy(dtype=float)
+        event_month = links['event_month'].to_numpy(dtype=float)
+        # Months from each event to Dec 31 of the anchor and forecast years
+        year_end = np.append(fy, anchor_year) * 12 + 12
+        elapsed = year_end[None, :] - event_month[:, None]           # (links, years + 1)
+        shape_k = 1.0 / np.maximum(sigma, 1e-6) ** 2                  # gamma shape for CV = sigma
+        # One stream per draw kind, so the chunks concatenate to the same draws as a single pass
+        mult_rng, lag_rng = (np.random.default_rng(s) for s in rng.integers(0, 2 ** 63, size=2))
+        chunk = max(1, MAX_CHUNK_CELLS // max(1, len(effect) * len(year_end)))
+        for start in range(0, n_paths, chunk):
+            m = min(chunk, n_paths - start)
+            mult = np.exp(mult_rng.normal(-sigma ** 2 / 2, sigma, size=(m, len(effect))))
+            lag_draw = np.where(lag > 0, lag_rng.gamma(shape_k, lag / shape_k, size=(m, len(effect))), 0.0)
+            ramp = ramp_weights(elapsed[None, :, :], lag_draw[:, :, None])  # (paths, links, years + 1)
+            level = np.einsum('pl,ply->py', effect * mult, ramp)
+            paths[start:start + m] += level[:, :-1] - level[:, -1:]
+    return paths
+
+
+def run_scenarios(observations, impact_links: pd.DataFrame, events: pd.DataFrame, indicators: List[str],
+                  forecast_years: Sequence[int] = (2025, 2026, 2027), n_paths: int = 100_000,
+                  percentiles: Sequence[float] = DEFAULT_PERCENTILES, anchor_year: Optional[int] = None,
+                  resid_floor: float = 0.0, seed: Optional[int] = 0) -> pd.DataFrame:
+    """
+    Percentile bands of simulated paths per indicator and year
+
+    Args:
+        observations: Observations dataframe or a prebuilt IndicatorStore
+        impact_links: Impact link records (confidence/evidence_basis drive spread)
+        events: Event records (dates for the links)
+        indicators: Indicator codes to forecast
+        forecast_years: Years to report
+        n_paths: Paths per indicator
+        percentiles: Percentiles to report (columns p<pct>, e.g. p2.5, p50)
+        anchor_year: Anchor year (default: last observed year per indicator)
+        resid_floor: See simulate_paths; the notebook uses 0.05. With the
+            default 0.0, indicators with two or fewer years of data and no
+            links get zero-width bands
+        seed: Seed for reproducible runs (None for fresh randomness)
+
+    Returns:
+        pd.DataFrame: indicator, year, mean, sd and one column per percentile;
+            percentage indicators are clipped to [0, 100]
+    """
+    store = observations if isinstance(observations, IndicatorStore) else IndicatorStore(observations)
+    rng = np.random.default_rng(seed)
+    links = link_uncertainty(impact_links, events) if len(impact_links) else \
+        pd.DataFrame(columns=['related_indicator', 'event_month', 'effect', 'lag_months', 'sigma'])
+    frames = []
+    for code in indicators:
+        yearly = store.yearly(code)
+        if yearly.empty:
+            logger.warning(f"No observations for {code}; skipping")
+            continue
+        if len(yearly) <= 2 and not resid_floor:
+            logger.warning(f"{code} has {len(yearly)} years of data and no resid_floor; its bands only reflect links")
+        paths = simulate_paths(yearly.index.to_numpy(), yearly.to_numpy(), links[links['related_indicator'] == code],
+                               forecast_years, n_paths=n_paths, anchor_year=anchor_year,
+                               resid_floor=resid_floor, rng=rng)
+        if store.value_type(code) == 'percentage':
+            np.clip(paths, 0.0, 100.0, out=paths)
+        bands = np.percentile(paths, percentiles, axis=0)
+        frame = pd.DataFrame({'indicator': code, 'year': list(forecast_years),
+                              'mean': paths.mean(axis=0), 'sd': paths.std(axis=0)})
+        for pct, band in zip(percentiles, bands):
+            frame[f'p{pct:g}'] = band
+        frames.append(frame)
+        logger.info(f"Simulated {n_paths} paths for {code}")
+    if not frames:
+        return pd.DataFrame(columns=['indicator', 'year', 'mean', 'sd'] + [f'p{p:g}' for p in percentiles])
+    return pd.concat(frames, ignore_index=True)
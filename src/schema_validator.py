@@ -0,0 +1,164 @@
+"""
+Vectorized validation of the unified dataset against reference codes and field rules
+"""
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+VIOLATION_COLUMNS = ['row', 'record_id', 'field', 'value', 'rule']
+
+# Fields that must be filled, per record_type
+REQUIRED_BY_RECORD_TYPE = {
+    'observation': ['indicator_code', 'value_numeric', 'observation_date'],
+    'target': ['indicator_code', 'value_numeric', 'observation_date'],
+    'event': ['category', 'observation_date'],
+    'impact_link': ['parent_id', 'related_indicator']
+}
+
+# Columns expected to hold ISO dates (YYYY-MM-DD)
+DATE_FIELDS = ['observation_date', 'period_start', 'period_end', 'collection_date']
+
+# (field, min, max, only when value_type equals) numeric range rules
+NUMERIC_RANGES = [
+    ('value_numeric', 0.0, 100.0, 'percentage'),
+    ('value_numeric', 0.0, None, 'count'),
+    ('lag_months', 0.0, None, None),
+]
+
+# Columns that must be numeric when filled
+NUMERIC_FIELDS = ['value_numeric', 'impact_estimate', 'lag_months']
+
+
+def compile_reference_codes(ref_codes: pd.DataFrame) -> Dict[str, Dict]:
+    """
+    Compile reference_codes.csv into per-field lookups
+
+    Args:
+        ref_codes: Output of data_loader.load_reference_codes
+
+    Returns:
+        dict: field -> {'codes': pd.Index of allowed codes,
+                        'record_types': list of record types the field
+                        applies to, or None for all}
+    """
+    compiled = {}
+    if ref_codes is None or ref_codes.empty:
+        return compiled
+    for field, grp in ref_codes.groupby('field', sort=False):
+        applies = set()
+        for value in grp['applies_to'].fillna('All').astype(str):
+            applies.update(v.strip() for v in value.split('/'))
+        compiled[field] = {
+            'codes': pd.Index(grp['code'].astype(str).str.strip().unique()),
+            'record_types': None if 'All' in applies else sorted(applies)
+        }
+    return compiled
+
+
+def _violations(df: pd.DataFrame, mask, field: str, rule: str) -> Optional[pd.DataFrame]:
+    mask = np.asarray(mask, dtype=bool)
+    if not mask.any():
+        return None
+    pos = np.flatnonzero(mask)
+    return pd.DataFrame({
+        'row': df.index[pos],
+        'record_id': df['record_id'].iloc[pos].to_numpy() if 'record_id' in df.columns else None,
+        'field': field,
+        'value': df[field].iloc[pos].to_numpy() if field in df.columns else None,
+        'rule': rule
+    })
+
+
+def _not_in_codes(values: pd.Series, codes: pd.Index) -> np.ndarray:
+    """Hash-based membership test; categoricals are checked once per category"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        bad_category = ~values.cat.categories.astype(str).isin(codes)
+        codes_arr = values.cat.codes.to_numpy()
+        return np.append(bad_category, False)[codes_arr]
+    return ~values.isin(codes).to_numpy()
+
+
+def validate_records(df: pd.DataFrame, reference: Optional[Dict[str, Dict]] = None) -> pd.DataFrame:
+    """
+    Validate every row of the unified dataset in whole-column operations
+
+    Checks categorical fields against the compiled reference codes (only for
+    the record types each field applies to), required fields per record
+    type, numeric parsing and ranges, date formats and record_id uniqueness.
+
+    Args:
+        df: Unified dataset
+        reference: Output of compile_reference_codes (skip code checks if None)
+
+    Returns:
+        pd.DataFrame: One row per violation with columns
+            (row, record_id, field, value, rule); empty when the data is clean
+    """
+    found: List[Optional[pd.DataFrame]] = []
+    record_type = df['record_type'].astype(str) if 'record_type' in df.columns else pd.Series('', index=df.index)
+
+    for field, spec in (reference or {}).items():
+        if field not in df.columns:
+            continue
+        col = df[field]
+        applicable = col.notna().to_numpy()
+        if spec['record_types'] is not None:
+            applicable = applicable & record_type.isin(spec['record_types']).to_numpy()
+        if not applicable.any():
+            continue
+        bad = np.zeros(len(df), dtype=bool)
+        bad[applicable] = _not_in_codes(col[applicable], spec['codes'])
+        found.append(_violations(df, bad, field, 'unknown_code'))
+
+    for rt, fields in REQUIRED_BY_RECORD_TYPE.items():
+        is_rt = (record_type == rt).to_numpy()
+        if not is_rt.any():
+            continue
+        for field in fields:
+            if field not in df.columns:
+                found.append(_violations(df, is_rt, 'record_type', f'missing_column:{field}'))
+                continue
+            found.append(_violations(df, is_rt & df[field].isna().to_numpy(), field, 'required'))
+
+    numeric = {}
+    for field in NUMERIC_FIELDS:
+        if field not in df.columns:
+            continue
+        numeric[field] = pd.to_numeric(df[field], errors='coerce')
+        found.append(_violations(df, df[field].notna() & numeric[field].isna(), field, 'not_numeric'))
+
+    value_type = df['value_type'].astype(str) if 'value_type' in df.columns else None
+    for field, lo, hi, only_type in NUMERIC_RANGES:
+        if field not in numeric:
+            continue
+        num = numeric[field]
+        out = pd.Series(False, index=df.index)
+        if lo is not None:
+            out |= num < lo
+        if hi is not None:
+            out |= num > hi
+        if only_type is not None:
+            if value_type is None:
+                continue
+            out &= value_type == only_type
+        found.append(_violations(df, out, field, 'out_of_range'))
+
+    for field in DATE_FIELDS:
+        if field not in df.columns or pd.api.types.is_datetime64_any_dtype(df[field]):
+            continue
+        parsed = pd.to_datetime(df[field], format='%Y-%m-%d', errors='coerce')
+        found.append(_violations(df, df[field].notna() & parsed.isna(), field, 'bad_date'))
+
+    if 'record_id' in df.columns:
+        dup = df['record_id'].notna() & df['record_id'].duplicated(keep=False)
+        found.append(_violations(df, dup, 'record_id', 'duplicate_id'))
+
+    found = [f for f in found if f is not None]
+    if not found:
+        return pd.DataFrame(columns=VIOLATION_COLUMNS)
+    violations = pd.concat(found, ignore_index=True)
+    logger.info(f"Found {len(violations)} violations in {violations['row'].nunique()} rows")
+    return violations.sort_values('row', kind='stable').reset_index(drop=True)
@@ -0,0 +1,168 @@
+"""
+Pre-aggregated, binary-searchable series tiles with LTTB downsampling for charting
+"""
+import pandas as pd
+import numpy as np
+from typing import Dict, Optional, Tuple
+import logging
+
+from src.indicator_store import DEFAULT_GENDER, DEFAULT_LOCATION, IndicatorStore, SeriesKey
+
+logger = logging.getLogger(__name__)
+
+# Tile resolutions: raw observations, calendar month, quarter and year
+RESOLUTIONS = ('raw', 'M', 'Q', 'Y')
+
+# Default cap on points sent to the browser per chart series
+DEFAULT_MAX_POINTS = 500
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    Keeps the first and last points and, from each of n_out - 2 equal-count
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the mean of the next bucket.
+
+    Args:
+        x: Increasing x values (e.g. int64 nanoseconds)
+        y: Values (NaN are not expected)
+        n_out: Points to keep
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1], dtype=int)[:max(n_out, 0)]
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    kept = np.empty(n_out, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+    prev = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        nxt_lo, nxt_hi = hi, edges[b + 2] if b + 2 < len(edges) else n
+        avg_x, avg_y = x[nxt_lo:nxt_hi].mean(), y[nxt_lo:nxt_hi].mean()
+        area = np.abs((x[prev] - avg_x) * (y[lo:hi] - y[prev]) - (x[prev] - x[lo:hi]) * (avg_y - y[prev]))
+        prev = lo + int(np.argmax(area))
+        kept[b + 1] = prev
+    return kept
+
+
+def _bucket(dates: np.ndarray, resolution: str) -> np.ndarray:
+    """Period start (datetime64[ns]) of each date at a resolution"""
+    if resolution == 'Y':
+        return dates.astype('datetime64[Y]').astype('datetime64[ns]')
+    months = dates.astype('datetime64[M]')
+    if resolution == 'Q':
+        months = (months.astype(np.int64) // 3 * 3).astype('datetime64[M]')
+    return months.astype('datetime64[ns]')
+
+
+class SeriesTile:
+    """
+    One series at one resolution as sorted (dates, values) arrays
+
+    Date-range queries are two binary searches; the returned arrays are
+    views, so slicing copies nothing.
+    """
+
+    def __init__(self, dates: np.ndarray, values: np.ndarray, name: str = 'value'):
+        self.dates = np.asarray(dates, dtype='datetime64[ns]')
+        self.values = np.asarray(values, dtype=float)
+        self.name = name
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __repr__(self) -> str:
+        return f"SeriesTile({self.name!r}, points={len(self)})"
+
+    @property
+    def bounds(self) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """First and last date, or None when empty"""
+        if not len(self):
+            return None
+        return pd.Timestamp(self.dates[0]), pd.Timestamp(self.dates[-1])
+
+    def slice(self, start=None, end=None) -> Tuple[np.ndarray, np.ndarray]:
+        """(dates, values) with start <= date <= end (either bound optional)"""
+        lo = 0 if start is None else np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start), 'ns'), side='left')
+        hi = len(self) if end is None else np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end), 'ns'),
+                                                           side='right')
+        return self.dates[lo:hi], self.values[lo:hi]
+
+    def frame(self, start=None, end=None, max_points: Optional[int] = DEFAULT_MAX_POINTS,
+              date_col: str = 'date', value_col: str = 'value') -> pd.DataFrame:
+        """
+        Chart-ready slice, LTTB-downsampled to at most max_points
+
+        Args:
+            start, end: Inclusive date bounds
+            max_points: Point budget (None keeps every point)
+            date_col, value_col: Output column names
+
+        Returns:
+            pd.DataFrame: date_col, value_col
+        """
+        dates, values = self.slice(start, end)
+        ok = ~np.isnan(values)
+        dates, values = dates[ok], values[ok]
+        if max_points is not None and len(dates) > max_points:
+            keep = lttb(dates.astype(np.int64), values, max_points)
+            dates, values = dates[keep], values[keep]
+        return pd.DataFrame({date_col: dates, value_col: values})
+
+
+class SeriesTiles:
+    """
+    Raw, monthly, quarterly and yearly tiles for every series of an IndicatorStore
+
+    Built once (e.g. behind st.cache_resource); periods are aggregated with
+    the store's rule for the series (mean for level-type indicators, sum for
+    flows) and dated at the period start.
+    """
+
+    def __init__(self, store: IndicatorStore):
+        self.store = store
+        self._tiles: Dict[Tuple[SeriesKey, str], SeriesTile] = {}
+        for key in store.keys():
+            dates, values = store.arrays(*key)
+            self._tiles[(key, 'raw')] = SeriesTile(dates, values, name=key[0])
+            ok = ~np.isnan(values)
+            how = store.aggregation_for(*key)
+            for resolution in RESOLUTIONS[1:]:
+                periods, inverse = np.unique(_bucket(dates[ok], resolution), return_inverse=True)
+                totals = np.bincount(inverse, weights=values[ok], minlength=len(periods))
+                if how == 'mean':
+                    totals = totals / np.bincount(inverse, minlength=len(periods))
+                self._tiles[(key, resolution)] = SeriesTile(periods, totals, name=key[0])
+        logger.info(f"Built {len(self._tiles)} tiles for {len(store)} series")
+
+    @classmethod
+    def from_observations(cls, observations: pd.DataFrame) -> 'SeriesTiles':
+        return cls(IndicatorStore(observations))
+
+    def tile(self, code: str, resolution: str = 'raw', gender: str = DEFAULT_GENDER,
+             location: str = DEFAULT_LOCATION) -> SeriesTile:
+        """
+        Tile of one series (an empty tile when the series is unknown)
+
+        Raises:
+            ValueError: For a resolution not in RESOLUTIONS
+        """
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        tile = self._tiles.get(((code, gender, location), resolution))
+        return tile if tile is not None else SeriesTile([], [], name=code)
+
+    def disaggregations(self, code: str) -> list:
+        """(gender, location) pairs available for an indicator, default series first"""
+        pairs = sorted((k[1], k[2]) for k in self.store.keys() if k[0] == code)
+        default = (DEFAULT_GENDER, DEFAULT_LOCATION)
+        return ([default] if default in pairs else []) + [p for p in pairs if p != default]
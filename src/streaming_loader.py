@@ -0,0 +1,248 @@
+"""
+Out-of-core loading of the unified dataset: chunked validation, summary and partitioned output
+"""
+import os
+import pandas as pd
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+import logging
+
+from src.data_loader import (
+    DEFAULT_DATA_PATH, DEFAULT_REF_PATH, RECORD_TYPE_KEYS, UNIFIED_DATE_COLUMNS, UNIFIED_NUMERIC_COLUMNS,
+    REQUIRED_COLUMNS, load_reference_codes,
+)
+from src.data_summary import DataSummary
+from src.instrumentation import instrument, stage
+from src.schema_validator import VIOLATION_COLUMNS, compile_reference_codes, validate_records
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNKSIZE = 100_000
+DEFAULT_STREAM_DIR = "data/processed/partitions"
+OUTPUT_FORMATS = ('parquet', 'csv')
+
+
+def _read_chunks(filepath: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    Raw chunks of a CSV (every column as strings) or Parquet file (record batches)
+
+    Chunk indexes continue across chunks, so they are row numbers in the file.
+    """
+    if Path(filepath).suffix == '.parquet':
+        import pyarrow.parquet as pq
+        start = 0
+        for batch in pq.ParquetFile(filepath).iter_batches(batch_size=chunksize):
+            chunk = batch.to_pandas()
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+            start += len(chunk)
+            yield chunk
+    else:
+        # Strings throughout, so validation sees the raw text and every chunk has the same dtypes
+        yield from pd.read_csv(filepath, chunksize=chunksize, dtype=str)
+
+
+def _numeric_columns(filepath: str) -> List[str]:
+    """
+    Columns stored as floats: the schema's numeric columns, plus any stored as numbers in a Parquet file
+
+    CSV columns outside the schema stay text: a type guessed from the first
+    chunk could turn text in a later chunk into NaN.
+    """
+    inferred = []
+    if Path(filepath).suffix == '.parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        schema = pq.read_schema(filepath)
+        inferred = [f.name for f in schema if pa.types.is_integer(f.type) or pa.types.is_floating(f.type)]
+    return list(dict.fromkeys(UNIFIED_NUMERIC_COLUMNS + inferred))
+
+
+def _coerce_chunk(chunk: pd.DataFrame, numeric_columns: List[str]) -> pd.DataFrame:
+    """Fixed per-column types (dates, floats, strings) so every chunk writes to one schema"""
+    out = {}
+    for col in chunk.columns:
+        values = chunk[col]
+        if col in UNIFIED_DATE_COLUMNS:
+            if not pd.api.types.is_datetime64_any_dtype(values):
+                values = pd.to_datetime(values, errors='coerce', format='mixed')
+            values = values.astype('datetime64[ns]')
+        elif col in numeric_columns:
+            values = pd.to_numeric(values, errors='coerce').astype(float)
+        else:
+            # 'string' keeps missing values missing ('str' spells NaN as 'nan' on pandas 2)
+            values = values.astype('string')
+        out[col] = values
+    return pd.DataFrame(out, index=chunk.index)
+
+
+class _PartitionWriter:
+    """Appends chunks to one file per partition, moved into place on close()"""
+
+    def __init__(self, out_dir: Path, fmt: str):
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self._writers = {}
+        self._tmp = {}
+
+    def path(self, key: str) -> Path:
+        return self.out_dir / f"{key}.{self.fmt}"
+
+    def write(self, key: str, df: pd.DataFrame) -> None:
+        if key not in self._tmp:
+            self._tmp[key] = self.path(key).with_suffix('.tmp')
+        tmp = self._tmp[key]
+        if self.fmt == 'csv':
+            df.to_csv(tmp, mode='a', header=key not in self._writers, index=False)
+            self._writers[key] = None
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if key not in self._writers:
+            fields = [pa.field(c, pa.timestamp('ns') if pd.api.types.is_datetime64_any_dtype(df[c]) else
+                               pa.float64() if pd.api.types.is_float_dtype(df[c]) else
+                               pa.int64() if pd.api.types.is_integer_dtype(df[c]) else pa.string())
+                      for c in df.columns]
+            self._writers[key] = pq.ParquetWriter(tmp, pa.schema(fields))
+        writer = self._writers[key]
+        writer.write_table(pa.Table.from_pandas(df, schema=writer.schema, preserve_index=False))
+
+    def close(self, keys: List[str], empty: Dict[str, pd.DataFrame]) -> Dict[str, Path]:
+        """Finish every file (writing empty ones for keys never seen) and publish them"""
+        for key in keys:
+            if key not in self._tmp:
+                self.write(key, empty[key])
+        for writer in self._writers.values():
+            if writer is not None:
+                writer.close()
+        paths = {}
+        for key, tmp in self._tmp.items():
+            os.replace(tmp, self.path(key))
+            paths[key] = self.path(key)
+        return paths
+
+
+def _violation_frame(violations: pd.DataFrame) -> pd.DataFrame:
+    """Violations with fixed column types (values as text)"""
+    return violations.astype({'row': 'int64', 'record_id': 'str', 'field': 'str', 'value': 'str', 'rule': 'str'})
+
+
+def _partition(chunk: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    parts = {key: chunk.iloc[0:0] for key in RECORD_TYPE_KEYS.values()}
+    for record_type, part in chunk.groupby('record_type', sort=False):
+        parts[RECORD_TYPE_KEYS.get(record_type, f"{record_type}s")] = part
+    return parts
+
+
+@instrument(rows_out=lambda result: result['summary']['total_records'])
+def stream_and_prepare_data(main_filepath: str = DEFAULT_DATA_PATH,
+                            ref_filepath: Optional[str] = DEFAULT_REF_PATH,
+                            out_dir: str = DEFAULT_STREAM_DIR,
+                            chunksize: int = DEFAULT_CHUNKSIZE,
+                            fmt: str = 'parquet') -> Dict:
+    """
+    Validate, summarize and partition the unified dataset one chunk at a time
+
+    The file (CSV, or Parquet read by record batch) is never held in memory
+    as a whole: each chunk is validated against the schema and reference
+    codes, folded into running statistics (null counts, record_type counts,
+    date range, per-indicator coverage) and appended to one output file per
+    record type. Peak memory depends on chunksize and the number of
+    indicators, not on file size.
+
+    Schema violations are checked per chunk, so a record_id repeated in two
+    different chunks is not reported as a duplicate.
+
+    Args:
+        main_filepath: Unified CSV or Parquet file
+        ref_filepath: Path to reference_codes.csv (optional)
+        out_dir: Directory for '<partition>.<fmt>' and 'violations.<fmt>'
+        chunksize: Rows per chunk
+        fmt: 'parquet' (needs pyarrow; falls back to CSV without it) or 'csv'
+
+    Returns:
+        dict: 'outputs' (partition -> path), 'reference_codes',
+            'validation_report', 'summary', 'is_valid'; the report and
+            summary have the same keys as load_and_prepare_data's, with
+            'violations' holding the path of the violations file
+    """
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {fmt}")
+    if fmt == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            logger.warning("pyarrow not installed; writing CSV partitions")
+            fmt = 'csv'
+
+    ref_codes = load_reference_codes(ref_filepath) if ref_filepath else None
+    reference = compile_reference_codes(ref_codes) if ref_codes is not None and not ref_codes.empty else None
+    numeric_columns = _numeric_columns(main_filepath)
+
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    writer = _PartitionWriter(out, fmt)
+    running = DataSummary()
+    violation_counts = Counter()
+    n_violations = 0
+    empty = None
+
+    for i, raw in enumerate(_read_chunks(main_filepath, chunksize)):
+        with stage('streaming_loader.chunk', rows_in=len(raw)) as s:
+            if empty is None:
+                missing = [c for c in REQUIRED_COLUMNS if c not in raw.columns]
+                if 'record_type' in missing:
+                    raise ValueError(f"{main_filepath} has no record_type column")
+                typed_empty = _coerce_chunk(raw.iloc[0:0], numeric_columns)
+                empty = {key: typed_empty for key in RECORD_TYPE_KEYS.values()}
+                empty['violations'] = _violation_frame(pd.DataFrame(columns=VIOLATION_COLUMNS))
+            if reference is not None:
+                violations = validate_records(raw, reference)
+                if len(violations):
+                    n_violations += len(violations)
+                    violation_counts.update(violations.groupby(['field', 'rule']).size().to_dict())
+                    writer.write('violations', _violation_frame(violations))
+
+            parts = _partition(_coerce_chunk(raw, numeric_columns))
+            running.update(raw)
+            for key, part in parts.items():
+                if len(part):
+                    writer.write(key, part)
+            s['rows_out'] = len(raw)
+        logger.info(f"Chunk {i}: {len(raw)} rows ({running.total_records} total)")
+
+    if empty is None:
+        raise ValueError(f"{main_filepath} has no rows")
+    keys = list(RECORD_TYPE_KEYS.values()) + (['violations'] if reference is not None else [])
+    outputs = writer.close(keys, empty)
+
+    summary = running.to_dict()
+    missing = [c for c in REQUIRED_COLUMNS if c not in summary['columns']]
+    if missing:
+        logger.warning(f"Missing required columns: {missing}")
+    unexpected = [rt for rt in summary['record_type_counts'] if rt not in RECORD_TYPE_KEYS]
+    if unexpected:
+        logger.warning(f"Unexpected record types: {unexpected}")
+    report = {
+        'missing_columns': missing,
+        'required_columns_present': not missing,
+        'record_type_distribution': dict(running.record_type_counts),
+        'null_counts': {col: running.null_counts[col] for col in running.columns},
+        'date_range': None,
+        'violations': outputs.get('violations'),
+        'violation_counts': dict(violation_counts) if reference is not None else None,
+    }
+    if running.date_range is not None:
+        report['date_range'] = {'min': running.date_min.strftime('%Y-%m-%d'),
+                                'max': running.date_max.strftime('%Y-%m-%d')}
+    if n_violations:
+        logger.warning(f"{n_violations} schema violations")
+
+    logger.info(f"Streamed {summary['total_records']} records into {out}")
+    return {
+        'outputs': {k: v for k, v in outputs.items() if k != 'violations'},
+        'reference_codes': ref_codes,
+        'validation_report': report,
+        'summary': summary,
+        'is_valid': report['required_columns_present'],
+    }
@@ -0,0 +1,169 @@
+"""
+Batched closed-form linear trend fitting for many ragged yearly series at once
+"""
+import pandas as pd
+import numpy as np
+from statistics import NormalDist
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Above this many degrees of freedom t quantiles use the Cornish-Fisher expansion
+_EXACT_T_MAX_DF = 200
+
+
+def stack_series(series: Iterable[Tuple[Sequence[float], Sequence[float]]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pad ragged (x, y) series into rectangular arrays
+
+    Args:
+        series: Iterable of (x, y) pairs, e.g. (years, values)
+
+    Returns:
+        tuple: x, y (float, NaN padded) and mask (True where observed and
+            both x and y are finite), each of shape (n_series, max_len)
+    """
+    series = list(series)
+    width = max((len(x) for x, _ in series), default=0)
+    x = np.full((len(series), width), np.nan)
+    y = np.full((len(series), width), np.nan)
+    for i, (xs, ys) in enumerate(series):
+        x[i, :len(xs)] = xs
+        y[i, :len(ys)] = ys
+    mask = np.isfinite(x) & np.isfinite(y)
+    return x, y, mask
+
+
+def fit_trends(x: np.ndarray, y: np.ndarray, mask: np.ndarray = None) -> Dict[str, np.ndarray]:
+    """
+    Ordinary least squares y = slope * x + intercept for every row at once
+
+    Args:
+        x, y: (n_series, max_len) arrays
+        mask: Observed cells (default: finite x and y)
+
+    Returns:
+        dict of (n_series,) arrays: slope, intercept, n, rmse (in-sample,
+            divided by n), resid_sd (divided by n - 2; NaN when n <= 2),
+            x_mean and sxx (needed for prediction intervals). Rows with
+            fewer than two distinct x get slope 0 and intercept = mean(y).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    mask = np.isfinite(x) & np.isfinite(y) if mask is None else np.asarray(mask, dtype=bool)
+    w = mask.astype(float)
+    xz = np.where(mask, x, 0.0)
+    yz = np.where(mask, y, 0.0)
+    n = w.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_mean = xz.sum(axis=1) / n
+        y_mean = yz.sum(axis=1) / n
+        dx = np.where(mask, x - x_mean[:, None], 0.0)
+        dy = np.where(mask, y - y_mean[:, None], 0.0)
+        sxx = (dx * dx).sum(axis=1)
+        sxy = (dx * dy).sum(axis=1)
+        slope = np.where(sxx > 0, sxy / sxx, 0.0)
+        intercept = y_mean - slope * x_mean
+        resid = np.where(mask, y - (slope[:, None] * x + intercept[:, None]), 0.0)
+        ssr = (resid * resid).sum(axis=1)
+        rmse = np.sqrt(ssr / n)
+        resid_sd = np.where(n > 2, np.sqrt(ssr / (n - 2)), np.nan)
+    return {'slope': slope, 'intercept': intercept, 'n': n, 'rmse': rmse, 'resid_sd': resid_sd,
+            'x_mean': x_mean, 'sxx': sxx}
+
+
+def _t_cdf(t: np.ndarray, df: int) -> np.ndarray:
+    """Exact Student t CDF for an integer df (finite trigonometric series)"""
+    theta = np.arctan(t / np.sqrt(df))
+    c2 = np.cos(theta) ** 2
+    if df % 2:
+        term = np.ones_like(t)
+        total = np.zeros_like(t) if df == 1 else np.ones_like(t)
+        for k in range(3, df - 1, 2):
+            term = term * c2 * (k - 1) / k
+            total = total + term
+        a = (2 / np.pi) * (theta + (np.sin(theta) * np.cos(theta) * total if df > 1 else 0.0))
+    else:
+        term = np.ones_like(t)
+        total = np.ones_like(t)
+        for k in range(2, df - 1, 2):
+            term = term * c2 * (k - 1) / k
+            total = total + term
+        a = np.sin(theta) * total
+    return 0.5 + a / 2
+
+
+def t_quantile(p: float, df: Union[int, np.ndarray]) -> np.ndarray:
+    """
+    Student t quantile for probability p and integer degrees of freedom
+
+    Exact (bisection on the closed-form CDF) up to _EXACT_T_MAX_DF degrees of
+    freedom, Cornish-Fisher expansion beyond. df < 1 gives NaN.
+    """
+    df = np.asarray(df)
+    out = np.full(df.shape, np.nan)
+    z = NormalDist().inv_cdf(p)
+    for d in np.unique(df[np.isfinite(df)]).astype(int):
+        if d < 1:
+            continue
+        if d > _EXACT_T_MAX_DF:
+            q = (z + (z ** 3 + z) / (4 * d) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * d ** 2)
+                 + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * d ** 3))
+        else:
+            lo, hi = np.array(-1e7), np.array(1e7)
+            for _ in range(120):
+                mid = (lo + hi) / 2
+                below = _t_cdf(mid, d) < p
+                lo, hi = np.where(below, mid, lo), np.where(below, hi, mid)
+            q = float((lo + hi) / 2)
+        out[df == d] = q
+    return out
+
+
+def predict_trends(fit: Dict[str, np.ndarray], x_new: np.ndarray,
+                   level: float = 0.95) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Point predictions and prediction intervals for all series and horizons
+
+    The interval is yhat ± t(1 - (1 - level) / 2, n - 2) * s *
+    sqrt(1 + 1/n + (x0 - x_mean)^2 / sxx), i.e. it widens with distance from
+    the fitted data. Series with n <= 2 get NaN bounds.
+
+    Args:
+        fit: Output of fit_trends
+        x_new: (n_series, horizons) or (horizons,) x values to predict
+        level: Interval coverage
+
+    Returns:
+        tuple: yhat, lower, upper of shape (n_series, horizons)
+    """
+    x_new = np.asarray(x_new, dtype=float)
+    if x_new.ndim == 1:
+        x_new = np.broadcast_to(x_new, (len(fit['slope']), len(x_new)))
+    yhat = fit['slope'][:, None] * x_new + fit['intercept'][:, None]
+    t = t_quantile(1 - (1 - level) / 2, fit['n'] - 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lever = np.where(fit['sxx'][:, None] > 0, (x_new - fit['x_mean'][:, None]) ** 2 / fit['sxx'][:, None], np.inf)
+        se = fit['resid_sd'][:, None] * np.sqrt(1 + 1 / fit['n'][:, None] + lever)
+    half = t[:, None] * se
+    return yhat, yhat - half, yhat + half
+
+
+def fit_series_frame(frame: pd.DataFrame, key_cols: List[str], x_col: str = 'year',
+                     y_col: str = 'value') -> pd.DataFrame:
+    """
+    Fit every group of a long-form frame in one batched call
+
+    Returns:
+        pd.DataFrame: One row per group with key_cols plus the fit_trends fields
+    """
+    keys, series = [], []
+    for key, g in frame.groupby(key_cols, sort=True):
+        keys.append(key)
+        series.append((g[x_col].to_numpy(dtype=float), g[y_col].to_numpy(dtype=float)))
+    fit = fit_trends(*stack_series(series))
+    out = pd.DataFrame(keys, columns=key_cols)
+    for name, values in fit.items():
+        out[name] = values
+    return out
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.association_matrix import SparseAssociationMatrix, load_association_long
+
+
+def _long(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'event_id': rng.choice([f'EVT_{i:04d}' for i in range(300)], n),
+        'indicator': rng.choice([f'IND_{i:03d}' for i in range(120)], n),
+        'effect': rng.choice([-1.5, -0.5, 0.0, 0.5, 1.0, 1.5], n),
+    })
+
+
+@pytest.mark.parametrize('agg', ['sum', 'mean'])
+def test_matches_dense_pivot(agg):
+    long = _long()
+    sparse = SparseAssociationMatrix.from_long(long, agg=agg)
+    dense = long.pivot_table(index='event_id', columns='indicator', values='effect', aggfunc=agg, fill_value=0)
+    pd.testing.assert_frame_equal(sparse.to_dense(), dense, check_dtype=False, check_names=False)
+    assert sparse.nnz == int((dense.to_numpy() != 0).sum())
+
+
+def test_trim_matches_dense_trim_and_roundtrips(tmp_path):
+    long = _long()
+    sparse = SparseAssociationMatrix.from_long(long)
+    dense = sparse.to_dense()
+    dense_trim = dense.loc[dense.sum(axis=1) != 0, dense.sum(axis=0) != 0]
+    trimmed = sparse.trim()
+    pd.testing.assert_frame_equal(trimmed.to_dense(), dense_trim)
+
+    path = trimmed.save(tmp_path / 'assoc.npz')
+    loaded = SparseAssociationMatrix.load(path)
+    pd.testing.assert_frame_equal(loaded.to_long(), trimmed.to_long())
+    assert loaded.row('EVT_0001').equals(dense_trim.loc['EVT_0001'][lambda s: s != 0].rename('EVT_0001'))
+    assert load_association_long(path).equals(loaded.trim().to_long())
+
+
+def test_csv_fallback_drops_zero_cells(tmp_path):
+    dense = pd.DataFrame({'A': [1.0, 0.0], 'B': [0.0, -0.5]}, index=pd.Index(['E1', 'E2'], name='event_id'))
+    dense.to_csv(tmp_path / 'trim.csv')
+    long = load_association_long(tmp_path / 'missing.npz', tmp_path / 'trim.csv')
+    assert long.values.tolist() == [['E1', 'A', 1.0], ['E2', 'B', -0.5]]
+
+
+def test_constructor_sums_duplicate_cells():
+    sparse = SparseAssociationMatrix(['E1', 'E2'], ['A', 'B'], [1, 0, 1, 0, 0], [0, 1, 0, 0, 0],
+                                     [2.0, 1.0, 3.0, 1.5, -1.5])
+    assert sparse.nnz == 2
+    expected = pd.DataFrame([[0.0, 1.0], [5.0, 0.0]], index=['E1', 'E2'], columns=['A', 'B'])
+    pd.testing.assert_frame_equal(sparse.to_dense(), expected, check_names=False)
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.backtesting as backtesting
+from src.backtesting import PREDICTION_COLUMNS, accuracy_table, fit_folds, fold_origins, rolling_origin_backtest
+
+
+def _observations(last_year=2022, n_series=8):
+    rows = []
+    for i in range(n_series):
+        for year in range(2012, last_year + 1):
+            rows.append({'indicator_code': f'IND_{i:02d}', 'observation_date': f'{year}-12-31',
+                         'value_numeric': 20 + (i + 1) * (year - 2012) + np.sin(7 * i + year)})
+    return pd.DataFrame(rows)
+
+
+def _count_fits(monkeypatch):
+    calls = []
+    original = backtesting.fit_fold
+
+    def counting(training):
+        calls.append(len(training))
+        return original(training)
+    monkeypatch.setattr(backtesting, 'fit_fold', counting)
+    return calls
+
+
+def test_linear_series_scores_perfectly():
+    obs = pd.DataFrame({'indicator_code': 'LIN', 'observation_date': [f'{y}-12-31' for y in range(2015, 2022)],
+                        'value_numeric': [2.0 * (y - 2015) + 5 for y in range(2015, 2022)]})
+    preds = rolling_origin_backtest(obs, cache_dir=None, max_workers=1, max_horizon=2)
+    assert list(preds.columns) == PREDICTION_COLUMNS
+    assert sorted(preds['origin'].unique()) == [2017, 2018, 2019, 2020]
+    table = accuracy_table(preds).set_index(['model', 'horizon'])
+    assert np.allclose(table['mae'], 0.0)
+    assert table.loc[('trend', 2), 'n'] == 3
+
+
+@pytest.mark.parametrize('fmt', ['parquet', 'csv'])
+def test_adding_a_year_refits_only_the_new_fold(tmp_path, monkeypatch, fmt):
+    if fmt == 'parquet':
+        pytest.importorskip('pyarrow')
+    monkeypatch.setattr(backtesting, '_fold_format', lambda: fmt)
+    calls = _count_fits(monkeypatch)
+    first = rolling_origin_backtest(_observations(2021), cache_dir=str(tmp_path), max_workers=1)
+    assert sum(calls) == 8 * len(first['origin'].unique())
+
+    calls.clear()
+    again = rolling_origin_backtest(_observations(2021), cache_dir=str(tmp_path), max_workers=1)
+    assert calls == []
+    pd.testing.assert_frame_equal(first, again)
+
+    updated = rolling_origin_backtest(_observations(2022), cache_dir=str(tmp_path), max_workers=1)
+    assert calls == [8]
+    fresh = rolling_origin_backtest(_observations(2022), cache_dir=None, max_workers=1)
+    pd.testing.assert_frame_equal(updated, fresh)
+
+
+def test_parallel_folds_match_inline(tmp_path):
+    obs = _observations()
+    inline = rolling_origin_backtest(obs, cache_dir=None, max_workers=1)
+    pooled = rolling_origin_backtest(obs, cache_dir=str(tmp_path), max_workers=2)
+    pd.testing.assert_frame_equal(inline, pooled)
+
+
+def test_event_model_adds_event_deltas():
+    obs = _observations(n_series=2)
+    events = pd.DataFrame({'record_id': ['EVT_1'], 'observation_date': ['2019-06-01']})
+    links = pd.DataFrame({'parent_id': ['EVT_1'], 'related_indicator': ['IND_01'], 'impact_magnitude': [4.0],
+                          'impact_direction': ['increase'], 'lag_months': [0]})
+    preds = rolling_origin_backtest(obs, links, events, cache_dir=None, max_workers=1)
+    wide = preds.pivot_table(index=['target', 'origin', 'year'], columns='model', values='forecast')
+    diff = (wide['trend_events'] - wide['trend']).unstack('target')
+    assert (diff['IND_00'] == 0).all()
+    crosses = (diff.index.get_level_values('origin') < 2019) & (diff.index.get_level_values('year') >= 2019)
+    assert np.allclose(diff['IND_01'][crosses], 4.0) and np.allclose(diff['IND_01'][~crosses], 0.0)
+
+
+def test_fold_origins_require_history_and_a_later_observation():
+    series = {('A', 'all', 'national'): (np.array([2010., 2011., 2012., 2020.]), np.zeros(4), False)}
+    assert fold_origins(series, min_train=3, max_horizon=5) == []
+    assert fold_origins(series, min_train=2, max_horizon=8) == [2011, 2012]
+    assert fit_folds(series, [2012], min_train=3, cache_dir=None, max_workers=1)[2012]['anchor_year'].tolist() == [2012.0]
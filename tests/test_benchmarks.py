@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+from benchmarks.suite import BENCHMARKS, compare, main, run_suite
+from benchmarks.synthetic import make_unified, split
+
+
+def test_synthetic_data_scales_and_links_to_events():
+    df = make_unified(2_000, 20)
+    parts = split(df)
+    assert len(df) == 2_000
+    assert len(parts['events']) == 20 and len(parts['impact_links']) == 60
+    assert parts['impact_links']['parent_id'].isin(parts['events']['record_id']).all()
+    assert not parts['observations'].duplicated(['indicator_code', 'gender', 'observation_date']).any()
+    assert df['record_id'].is_unique
+
+
+def test_suite_runs_every_benchmark_and_compares(tmp_path):
+    out = tmp_path / 'bench.json'
+    assert main(['--scale', 'tiny', '--repeats', '1', '--out', str(out)]) == 0
+    report = json.loads(out.read_text())
+    assert set(report['results']) == set(BENCHMARKS)
+    assert main(['--scale', 'tiny', '--repeats', '1', '--only', 'build_event_effects',
+                 '--baseline', str(out), '--tolerance', '100']) == 0
+
+    slow = {'meta': report['meta'], 'results': {k: {**v, 'median': v['median'] / 10} for k, v in report['results'].items()}}
+    assert compare(report, slow)['regression'].all()
+    with pytest.raises(ValueError):
+        compare(run_suite(1_500, 10, repeats=1, only=['build_event_effects']), report)
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.association_matrix import SparseAssociationMatrix
+from src.build_event_indicator_matrix import build_matrix, link_hashes, update_matrix
+from src.events_impact_modeler import link_effects
+
+
+def _catalog(n_events=200, seed=0):
+    rng = np.random.default_rng(seed)
+    events = pd.DataFrame({'record_id': [f'EVT_{i:04d}' for i in range(n_events)], 'record_type': 'event'})
+    n_links = n_events * 3
+    links = pd.DataFrame({
+        'record_id': [f'IMP_{i:04d}' for i in range(n_links)],
+        'record_type': 'impact_link',
+        'parent_id': rng.choice(events['record_id'], n_links),
+        'related_indicator': rng.choice([f'IND_{i}' for i in range(40)], n_links),
+        'impact_magnitude': rng.choice(['low', 'medium', 'High ', '2.5', 'unknown'], n_links),
+        'impact_direction': rng.choice(['increase', 'decrease', 'positive', None], n_links),
+    })
+    return events, links
+
+
+def test_link_effects_matches_scalar_mapping():
+    _, links = _catalog()
+
+    def scalar(mag, direction):
+        try:
+            m = float(mag)
+        except (TypeError, ValueError):
+            m = {'low': 0.5, 'medium': 1.0, 'high': 1.5}.get(str(mag).strip().lower(), 1.0)
+        return m * {'increase': 1, 'positive': 1, 'decrease': -1}.get(direction, 1)
+
+    expected = [scalar(m, d) for m, d in zip(links['impact_magnitude'], links['impact_direction'])]
+    assert np.allclose(link_effects(links).to_numpy(), expected)
+
+
+def test_incremental_build_matches_full_rebuild():
+    events, links = _catalog()
+    previous, hashes, stale = build_matrix(links, events)
+    assert len(stale) == previous.shape[0]
+
+    edited = links.copy()
+    edited.loc[edited['parent_id'] == 'EVT_0003', 'impact_magnitude'] = 'high'
+    edited = edited[edited['parent_id'] != 'EVT_0007']
+    edited = pd.concat([edited, pd.DataFrame([{'record_id': 'IMP_NEW', 'parent_id': 'EVT_0011',
+                                               'related_indicator': 'IND_NEW', 'impact_magnitude': 'low',
+                                               'impact_direction': 'increase'}])], ignore_index=True)
+
+    matrix, _, stale = build_matrix(edited, events, previous, hashes)
+    full, _, _ = build_matrix(edited, events)
+    assert set(stale) <= {'EVT_0003', 'EVT_0007', 'EVT_0011'}
+    pd.testing.assert_frame_equal(matrix, full, check_dtype=False)
+
+    # reordering rows does not count as a change
+    _, _, stale = build_matrix(edited.sample(frac=1, random_state=1), events, full, build_matrix(edited, events)[1])
+    assert stale == []
+
+
+def test_link_hashes_ignore_missing_value_spelling():
+    _, links = _catalog(20)
+    direction = links['impact_direction'].astype(object)
+    as_nan = links.assign(impact_direction=direction.where(direction.notna(), np.nan))
+    as_none = links.assign(impact_direction=direction.where(direction.notna(), None))
+    pd.testing.assert_series_equal(link_hashes(as_nan), link_hashes(as_none))
+
+
+def test_update_matrix_persists_and_skips_unchanged(tmp_path):
+    events, links = _catalog(20)
+    data = tmp_path / 'combined.csv'
+    pd.concat([events, links], ignore_index=True).to_csv(data, index=False)
+    paths = dict(out_csv=tmp_path / 'm.csv', out_trim=tmp_path / 't.csv', out_hashes=tmp_path / 'h.csv', out_png=None,
+                 out_npz=tmp_path / 'm.npz', cache_dir=tmp_path / 'cache')
+    first = update_matrix(data, **paths)
+    assert len(first) == 20 - len(set(events['record_id']) - set(links['parent_id']))
+    assert update_matrix(data, **paths) == []
+    full = pd.read_csv(paths['out_csv'], index_col='event_id')
+    assert full.shape[1] == links['related_indicator'].nunique()
+    sparse = SparseAssociationMatrix.load(paths['out_npz'])
+    pd.testing.assert_frame_equal(sparse.to_dense(), full.loc[:, (full != 0).any()], check_names=False)
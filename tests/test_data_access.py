@@ -0,0 +1,113 @@
+import os
+import time
+
+import pandas as pd
+
+from src.data_access import DataStore, estimate_nbytes
+
+
+def _write(path, values, mtime=None):
+    pd.DataFrame({'value': values}).to_csv(path, index=False)
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+def test_reloads_only_when_file_changes(tmp_path):
+    path = tmp_path / 'a.csv'
+    _write(path, [1, 2, 3])
+    store = DataStore()
+    store.register('a', path, lambda: pd.read_csv(path))
+    first = store.get('a')
+    assert store.get('a') is first and store.loads == 1
+    _write(path, [1, 2, 3, 4], mtime=time.time_ns() + 10**9)
+    assert store.get('a')['value'].tolist() == [1, 2, 3, 4] and store.loads == 2
+    path.unlink()
+    assert store.get('a') is None and store.stats()['datasets'] == 0
+
+
+def test_content_hash_skips_identical_rewrites(tmp_path):
+    path = tmp_path / 'a.csv'
+    _write(path, [1, 2, 3])
+    store = DataStore(hash_contents=True)
+    store.register('a', path, lambda: pd.read_csv(path))
+    first = store.get('a')
+    _write(path, [1, 2, 3], mtime=time.time_ns() + 10**9)
+    assert store.get('a') is first and store.loads == 1
+
+
+def test_lru_eviction_under_memory_bound(tmp_path):
+    store = DataStore()
+    for name in 'abc':
+        _write(tmp_path / f'{name}.csv', list(range(1000)))
+        store.register(name, tmp_path / f'{name}.csv', lambda n=name: pd.read_csv(tmp_path / f'{n}.csv'))
+    one = estimate_nbytes(pd.read_csv(tmp_path / 'a.csv'))
+    store.max_bytes = 2 * one
+    store.get('a'), store.get('b'), store.get('a'), store.get('c')
+    assert store.stats() == {'datasets': 2, 'size_bytes': 2 * one, 'loads': 3}
+    store.get('a')
+    assert store.loads == 3
+    store.get('b')
+    assert store.loads == 4
+
+
+def test_dependent_datasets_and_optional_paths(tmp_path):
+    path = tmp_path / 'a.csv'
+    _write(path, [1, 2])
+    store = DataStore()
+    store.register('a', path, lambda: pd.read_csv(path))
+    store.register('total', [path, tmp_path / 'missing.csv'], lambda: int(store.get('a')['value'].sum()))
+    assert store.get('total') == 3
+    assert store.version('total')[1] is None
+
+
+def test_watcher_reloads_in_background(tmp_path):
+    path = tmp_path / 'a.csv'
+    _write(path, [1])
+    store = DataStore()
+    store.register('a', path, lambda: pd.read_csv(path))
+    store.get('a')
+    store.start_watcher(interval=0.01)
+    try:
+        _write(path, [1, 2], mtime=time.time_ns() + 10**9)
+        deadline = time.time() + 5
+        while store.loads < 2 and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        store.stop_watcher()
+    assert store.loads == 2
+    assert len(store.get('a')) == 2 and store.loads == 2
+
+
+def test_slow_reload_does_not_block_other_datasets(tmp_path):
+    import threading
+    fast, slow = tmp_path / 'fast.csv', tmp_path / 'slow.csv'
+    _write(fast, [1])
+    _write(slow, [2])
+    started, release = threading.Event(), threading.Event()
+
+    def load_slow():
+        started.set()
+        assert release.wait(5)
+        return pd.read_csv(slow)
+
+    store = DataStore()
+    store.register('fast', fast, lambda: pd.read_csv(fast))
+    store.register('slow', slow, load_slow)
+    cached = store.get('fast')
+    results = []
+    readers = [threading.Thread(target=lambda: results.append(store.get('slow'))) for _ in range(3)]
+    readers[0].start()
+    assert started.wait(5)
+    for reader in readers[1:]:
+        reader.start()
+    # 'slow' is loading (and holds its own lock); the cached dataset is still served
+    served = []
+    reader = threading.Thread(target=lambda: served.append(store.get('fast')))
+    reader.start()
+    reader.join(2)
+    release.set()
+    assert served and served[0] is cached
+    for reader in readers:
+        reader.join(5)
+    assert len(results) == 3 and all(r is results[0] for r in results)
+    assert store.loads == 2
@@ -0,0 +1,77 @@
+import io
+
+import pandas as pd
+import pytest
+
+from src.data_enricher import add_new_observation, add_records, next_id_number, read_records
+
+
+def _observation(i):
+    return {
+        'indicator': 'P2P transactions', 'indicator_code': 'USG_P2P_COUNT',
+        'value_numeric': float(i), 'observation_date': f'2025-{i % 12 + 1:02d}-01',
+        'pillar': 'USAGE', 'source_name': 'EthSwitch',
+    }
+
+
+def test_ids_do_not_collide_after_deletion():
+    obs = pd.DataFrame(columns=['id'])
+    for i in range(3):
+        obs = add_new_observation(obs, 'x', 'X', i, '2025-01-01', 'ACCESS', 'src', 'url')
+    obs = obs[obs['id'] != 'OBS_002']
+    obs = add_new_observation(obs, 'x', 'X', 9, '2025-01-01', 'ACCESS', 'src', 'url')
+    assert obs['id'].is_unique
+    assert obs['id'].iloc[-1] == 'OBS_004'
+    assert next_id_number(pd.DataFrame({'record_id': ['REC_0001', 'OBS_0041']}), 'OBS') == 42
+
+
+def test_bulk_add_from_jsonl(tmp_path):
+    path = tmp_path / 'new.jsonl'
+    pd.DataFrame([_observation(i) for i in range(1, 501)]).to_json(path, orient='records', lines=True)
+    existing = pd.DataFrame([{'id': 'OBS_010', 'record_type': 'observation'}])
+    updated = add_records(existing, path, 'observation')
+    assert len(updated) == 501
+    assert updated['id'].is_unique
+    assert updated['id'].iloc[1] == 'OBS_011'
+    assert (updated['record_type'] == 'observation').all()
+    assert (updated['confidence'].iloc[1:] == 'medium').all()
+
+
+def test_read_records_json_array_and_lines(tmp_path):
+    frame = pd.DataFrame([_observation(i) for i in range(1, 4)])
+    frame.to_json(tmp_path / 'new.json', orient='records')
+    frame.to_json(tmp_path / 'new.ndjson', orient='records', lines=True)
+    for name in ('new.json', 'new.ndjson'):
+        pd.testing.assert_frame_equal(read_records(tmp_path / name), frame)
+
+
+def test_bulk_add_from_streams():
+    frame = pd.DataFrame([_observation(i) for i in range(1, 4)])
+    csv = io.StringIO(frame.to_csv(index=False))
+    jsonl = io.StringIO(frame.to_json(orient='records', lines=True))
+    for stream, fmt in ((csv, None), (jsonl, 'jsonl')):
+        updated = add_records(pd.DataFrame(), stream, 'observation', fmt=fmt)
+        assert updated['id'].tolist() == ['OBS_001', 'OBS_002', 'OBS_003']
+        assert updated['value_numeric'].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_bulk_add_rejects_or_drops_invalid():
+    records = [_observation(1), dict(_observation(2), value_numeric='n/a'), dict(_observation(3), observation_date=None)]
+    with pytest.raises(ValueError):
+        add_records(pd.DataFrame(), records, 'observation')
+    updated = add_records(pd.DataFrame(), records, 'observation', errors='drop')
+    assert updated['value_numeric'].tolist() == [1.0]
+    with pytest.raises(ValueError, match='errors'):
+        add_records(pd.DataFrame(), records, 'observation', errors='ignore')
+
+
+def test_bulk_add_impact_links_fills_defaults():
+    links = [{'event_id': 'EVT_0001', 'pillar': 'ACCESS', 'related_indicator': 'ACC_MM_ACCOUNT',
+              'impact_direction': 'increase', 'impact_magnitude': 'high', 'lag_months': 6,
+              'evidence_basis': 'empirical'}]
+    updated = add_records(pd.DataFrame(), links, 'impact_link')
+    row = updated.iloc[0]
+    assert row['id'] == 'IMP_001'
+    assert row['parent_id'] == 'EVT_0001'
+    assert row['indicator_code'] == 'IMPACT_ACCESS_ACC_MM_ACC'
+    assert row['source_name'] == 'empirical'
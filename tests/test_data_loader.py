@@ -0,0 +1,80 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.data_loader import load_unified_data, partition_by_record_type
+
+DATA_PATH = Path('data/raw/ethiopia_fi_unified_data.csv')
+
+
+@pytest.fixture
+def unified_csv(tmp_path):
+    path = tmp_path / 'unified.csv'
+    path.write_bytes(DATA_PATH.read_bytes())
+    return path
+
+
+def test_cache_roundtrip_is_typed(unified_csv, tmp_path):
+    pytest.importorskip('pyarrow')
+    cache_dir = tmp_path / 'cache'
+    first = load_unified_data(str(unified_csv), use_cache=True, cache_dir=str(cache_dir))
+    assert len(list(cache_dir.glob('*.parquet'))) == 1
+    second = load_unified_data(str(unified_csv), use_cache=True, cache_dir=str(cache_dir))
+    assert isinstance(second['record_type'].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(second['observation_date'])
+    pd.testing.assert_frame_equal(first, second, check_categorical=False)
+
+
+def test_cache_invalidates_on_change(unified_csv, tmp_path):
+    pytest.importorskip('pyarrow')
+    cache_dir = tmp_path / 'cache'
+    load_unified_data(str(unified_csv), use_cache=True, cache_dir=str(cache_dir))
+    df = pd.read_csv(unified_csv)
+    df.iloc[:5].to_csv(unified_csv, index=False)
+    os.utime(unified_csv, ns=(0, 10**9))
+    reloaded = load_unified_data(str(unified_csv), use_cache=True, cache_dir=str(cache_dir))
+    assert len(reloaded) == 5
+    assert len(list(cache_dir.glob('*.parquet'))) == 1
+
+
+def test_cache_keeps_other_sources_with_same_stem(unified_csv, tmp_path):
+    pytest.importorskip('pyarrow')
+    cache_dir = tmp_path / 'cache'
+    other = tmp_path / 'other' / 'unified.csv'
+    other.parent.mkdir()
+    pd.read_csv(unified_csv).iloc[:5].to_csv(other, index=False)
+    neighbour = tmp_path / 'unified-extra.csv'
+    neighbour.write_bytes(unified_csv.read_bytes())
+    for path in (unified_csv, other, neighbour):
+        load_unified_data(str(path), use_cache=True, cache_dir=str(cache_dir))
+    assert len(list(cache_dir.glob('*.parquet'))) == 3
+    assert len(load_unified_data(str(other), use_cache=True, cache_dir=str(cache_dir))) == 5
+    assert len(list(cache_dir.glob('*.parquet'))) == 3
+
+
+@pytest.mark.parametrize('use_cache', [False, True])
+def test_column_and_record_type_selection(unified_csv, tmp_path, use_cache):
+    if use_cache:
+        pytest.importorskip('pyarrow')
+    kwargs = dict(use_cache=use_cache, cache_dir=str(tmp_path / 'cache'),
+                  columns=['indicator_code', 'value_numeric'], record_types=['target'])
+    load_unified_data(str(unified_csv), **kwargs)
+    df = load_unified_data(str(unified_csv), **kwargs)
+    assert list(df.columns) == ['indicator_code', 'value_numeric']
+    assert len(df) == 3
+
+
+def test_partition_by_record_type_single_pass():
+    df = pd.read_csv(DATA_PATH)
+    link = df.iloc[[0]].assign(record_type='impact_link', record_id='IMP_0001', lag_months='6')
+    df = pd.concat([df, link], ignore_index=True)
+    parts = partition_by_record_type(df)
+    assert set(parts) == {'observations', 'events', 'impact_links', 'targets'}
+    assert sum(len(p) for p in parts.values()) == len(df)
+    assert parts['impact_links']['record_id'].tolist() == ['IMP_0001']
+    assert parts['impact_links']['lag_months'].iloc[0] == 6.0
+    assert pd.api.types.is_datetime64_any_dtype(parts['observations']['observation_date'])
+    # original row labels are preserved
+    assert parts['observations'].index.equals(df.index[df['record_type'] == 'observation'])
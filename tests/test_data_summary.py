@@ -0,0 +1,79 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.synthetic import make_unified
+from src.data_enricher import add_records
+from src.data_loader import get_data_summary, separate_by_record_type
+from src.data_summary import DataSummary
+
+DATA_PATH = Path('data/raw/ethiopia_fi_unified_data.csv')
+
+
+def _reference_summary(df, separated):
+    # The full-recomputation summary get_data_summary produced before DataSummary
+    counts = lambda s: s.value_counts().loc[lambda c: c > 0].to_dict()  # noqa: E731
+    obs = separated['observations']
+    dates = pd.to_datetime(df['observation_date'], errors='coerce', format='mixed').dropna()
+    return {
+        'total_records': len(df),
+        'columns': df.columns.tolist(),
+        'record_type_counts': counts(df['record_type']),
+        'observations_pillar_dist': counts(obs['pillar']),
+        'impact_links_pillar_dist': counts(separated['impact_links']['pillar']),
+        'unique_indicators': obs['indicator'].nunique(),
+        'indicator_coverage': obs.groupby('indicator')['observation_date'].agg(['min', 'max', 'count']).to_dict(),
+        'event_categories': counts(separated['events']['category']),
+        'date_range': {'start': dates.min(), 'end': dates.max(),
+                       'years_covered': (dates.max() - dates.min()).days / 365.25},
+    }
+
+
+def test_summary_matches_full_recomputation():
+    df = pd.read_csv(DATA_PATH)
+    assert get_data_summary(df) == _reference_summary(df, separate_by_record_type(df))
+
+
+def test_merge_is_a_monoid_over_row_splits():
+    df = make_unified(3_000, 30)
+    cuts = [0, 700, 1_900, len(df)]
+    parts = [df.iloc[a:b] for a, b in zip(cuts, cuts[1:])]
+    # One partition lacks a column entirely: its rows count as nulls there, as in a concat
+    parts[1] = parts[1].drop(columns=['notes'])
+    whole = DataSummary.from_frame(pd.concat(parts))
+    a, b, c = (DataSummary.from_frame(p) for p in parts)
+
+    assert DataSummary.combine([a, b, c]) == whole
+    assert (a + b) + c == a + (b + c) == whole
+    assert DataSummary() + a == a + DataSummary() == a
+    assert whole.null_counts['notes'] == len(df)
+
+
+def test_update_with_appended_records():
+    df = make_unified(2_000, 20)
+    summary = DataSummary.from_frame(df.iloc[:1_500])
+    assert summary.update(df.iloc[1_500:1_510]) is summary
+    summary.update(df.iloc[1_510:])
+    assert summary == DataSummary.from_frame(df)
+
+
+def test_summaries_combine_across_processes():
+    df = make_unified(2_000, 20)
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        summaries = list(pool.map(DataSummary.from_frame, [df.iloc[i::4] for i in range(4)]))
+    assert DataSummary.combine(summaries) == DataSummary.from_frame(df)
+
+
+def test_add_records_keeps_summary_in_step():
+    existing = pd.DataFrame([{'id': 'OBS_001', 'record_type': 'observation', 'indicator': 'P2P transactions',
+                              'observation_date': '2024-06-30', 'pillar': 'USAGE'}])
+    summary = DataSummary.from_frame(existing)
+    batch = [{'indicator': 'P2P transactions', 'indicator_code': 'USG_P2P_COUNT', 'value_numeric': float(i),
+              'observation_date': f'2025-0{i}-01', 'pillar': 'USAGE', 'source_name': 'EthSwitch'}
+             for i in range(1, 4)]
+    updated = add_records(existing, batch, 'observation', summary=summary)
+    assert summary == DataSummary.from_frame(updated)
+    coverage = summary.to_dict()['indicator_coverage']
+    assert coverage['count'] == {'P2P transactions': 4}
+    assert coverage['max']['P2P transactions'] == pd.Timestamp('2025-03-01')
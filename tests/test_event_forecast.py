@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import src.forecasting as forecasting
+from src.data_loader import load_unified_data, partition_by_record_type
+from src.event_forecast import REPORT_COLUMNS, event_adjusted_forecast
+from src.forecasting import EffectKernel, effect_kernel, forecast_all
+from src.scenario_engine import link_uncertainty, ramp_weights
+
+DATA_PATH = Path('data/raw/ethiopia_fi_unified_data.csv')
+REPORT_CSV = Path('reports/forecast_access_usage_2025_2027.csv')
+
+
+def _observations():
+    return partition_by_record_type(load_unified_data(str(DATA_PATH)))['observations']
+
+
+def _links():
+    events = pd.DataFrame({'record_id': ['EVT_1', 'EVT_2'], 'observation_date': ['2021-05-17', '2024-07-01']})
+    links = pd.DataFrame({'parent_id': ['EVT_1', 'EVT_2'], 'related_indicator': ['ACC_OWNERSHIP', 'ACC_OWNERSHIP'],
+                          'impact_direction': ['increase', 'decrease'], 'impact_magnitude': [3.0, 2.0],
+                          'impact_estimate': [3.0, 2.0], 'lag_months': [12, 24]})
+    return links, events
+
+
+def test_matches_report_without_links():
+    forecast = event_adjusted_forecast(_observations())
+    assert list(forecast.columns) == REPORT_COLUMNS
+    pd.testing.assert_frame_equal(forecast, pd.read_csv(REPORT_CSV), check_dtype=False)
+
+
+def test_kernel_levels_match_direct_ramp():
+    links, events = _links()
+    kernel = EffectKernel(links, events)
+    years = np.arange(2019, 2029)
+    inputs = link_uncertainty(links, events)
+    elapsed = (years * 12 + 12)[None, :] - inputs['event_month'].to_numpy()[:, None]
+    weights = ramp_weights(elapsed, inputs['lag_months'].to_numpy()[:, None])
+    expected = (inputs['effect'].to_numpy()[:, None] * weights).sum(axis=0)
+    np.testing.assert_allclose(kernel.levels('ACC_OWNERSHIP', years), expected)
+    assert (kernel.levels('USG_P2P_COUNT', years) == 0).all()
+
+
+def test_decrease_link_lowers_forecast_per_scenario():
+    links, events = _links()
+    forecast = event_adjusted_forecast(_observations(), links, events)
+    forecast = forecast.set_index(['target', 'scenario', 'year']).sort_index()
+    acc = forecast.loc['ACC_OWNERSHIP']
+    # EVT_2 ramps down over 2024-07 .. 2026-07: a quarter done at the 2024 anchor, complete from 2026
+    np.testing.assert_allclose(acc.loc['base', 'event_delta'].to_numpy(), [-1.0, -1.5, -1.5])
+    np.testing.assert_allclose(acc.loc['optimistic', 'event_delta'], 1.5 * acc.loc['base', 'event_delta'])
+    np.testing.assert_allclose(acc['with_events_forecast'], acc['baseline_forecast'] + acc['event_delta'])
+    assert (forecast.loc['USG_P2P_COUNT (usage proxy)', 'event_delta'] == 0).all()
+
+
+def test_agrees_with_forecast_all():
+    links, events = _links()
+    observations = _observations()
+    ours = event_adjusted_forecast(observations, links, events, targets={'ACC_OWNERSHIP': 'ACC_OWNERSHIP'})
+    full = forecast_all(observations, links, events, anchor_year=2024, indicator_codes=['ACC_OWNERSHIP'],
+                        max_workers=1, interval='band')
+    national = full[(full['gender'] == 'all') & (full['location'] == 'national')]
+    pd.testing.assert_frame_equal(ours, national[REPORT_COLUMNS].reset_index(drop=True))
+
+
+def test_kernel_built_once_per_link_set(monkeypatch):
+    calls = []
+    build = forecasting.link_uncertainty
+    monkeypatch.setattr(forecasting, 'link_uncertainty', lambda *a: calls.append(1) or build(*a))
+    monkeypatch.setattr(forecasting, '_KERNELS', type(forecasting._KERNELS)())
+    observations = _observations()
+    links, events = _links()
+
+    kernel = effect_kernel(links, events)
+    assert effect_kernel(links.copy(), events.copy()) is kernel
+    event_adjusted_forecast(observations, links, events)
+    event_adjusted_forecast(observations, links, events, forecast_years=[2028, 2030],
+                            scenarios={'stress': {'trend_slope_mult': 0.5, 'event_effect_mult': 2.0}})
+    forecast_all(observations, links, events, max_workers=1)
+    assert len(calls) == 1
+
+    effect_kernel(links.assign(impact_magnitude=[1.0, 1.0]), events)
+    assert len(calls) == 2
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.events_impact_modeler import (
+    analyze_event_windows,
+    apply_event_effects_matrix,
+    apply_event_effects_series,
+    build_event_effects,
+    build_ramp_timelines,
+    create_fayda_impact_links,
+    plot_association_heatmap,
+)
+from src.indicator_store import IndicatorStore
+
+
+def _synthetic_inputs():
+    rows = []
+    for code, dates in [
+        ('ACC_OWNERSHIP', ['2014-12-31', '2017-12-31', '2021-12-31', '2024-11-29']),
+        ('USG_P2P_COUNT', ['2022-06-30', '2023-07-01', '2024-06-30', '2025-06-30']),
+        ('ACC_FAYDA', ['2024-01-15', '2025-03-01']),
+    ]:
+        for i, d in enumerate(dates):
+            rows.append({'record_type': 'observation', 'indicator_code': code,
+                         'observation_date': d, 'value_numeric': 10.0 * (i + 1)})
+    observations = pd.DataFrame(rows)
+    events = pd.DataFrame({
+        'record_id': ['EVT_0001', 'EVT_0002', 'EVT_0003', 'EVT_0004'],
+        'observation_date': ['2021-05-17', '2023-08-01', '2010-01-01', '2024-01-01'],
+    })
+    links = pd.DataFrame({
+        'parent_id': ['EVT_0001', 'EVT_0001', 'EVT_0002', 'EVT_0003', 'EVT_0004', 'EVT_0002'],
+        'related_indicator': ['ACC_OWNERSHIP', 'USG_P2P_COUNT', 'USG_P2P_COUNT', 'ACC_OWNERSHIP', 'ACC_FAYDA', 'ACC_OWNERSHIP'],
+        'impact_direction': ['increase'] * 6,
+        'impact_estimate': [3.0, 1.5, 2.5, 4.0, 0.5, -1.25],
+        'lag_months': [12, 0, 3, 6, 1, 600],
+    })
+    return observations, build_event_effects(links, events)
+
+
+def test_matrix_engine_matches_row_loop():
+    observations, effects = _synthetic_inputs()
+    result = apply_event_effects_matrix(observations, effects)
+    assert set(result) == {'ACC_OWNERSHIP', 'USG_P2P_COUNT', 'ACC_FAYDA'}
+    for code, frame in result.items():
+        expected = apply_event_effects_series(observations, effects, code)
+        assert frame.index.equals(expected.index), code
+        np.testing.assert_allclose(frame['base'].to_numpy(), expected['base'].to_numpy(), equal_nan=True)
+        np.testing.assert_allclose(frame['predicted'].to_numpy(), expected['predicted'].to_numpy(), equal_nan=True)
+
+
+def test_matrix_engine_respects_indicator_filter():
+    observations, effects = _synthetic_inputs()
+    result = apply_event_effects_matrix(observations, effects, indicator_codes=['ACC_FAYDA'])
+    assert list(result) == ['ACC_FAYDA']
+    assert apply_event_effects_matrix(observations, effects, indicator_codes=['MISSING']) == {}
+
+
+def test_store_backed_lookups_match_frame():
+    observations, effects = _synthetic_inputs()
+    # A disaggregated row must not leak into the national series
+    observations = pd.concat([observations, pd.DataFrame([{
+        'record_type': 'observation', 'indicator_code': 'ACC_FAYDA', 'gender': 'female',
+        'observation_date': '2025-06-01', 'value_numeric': 99.0}])], ignore_index=True)
+    store = IndicatorStore(observations)
+    for code in ['ACC_OWNERSHIP', 'ACC_FAYDA']:
+        pd.testing.assert_frame_equal(apply_event_effects_series(store, effects, code),
+                                      apply_event_effects_series(observations, effects, code))
+    assert apply_event_effects_series(store, effects, 'ACC_FAYDA')['base'].iloc[-1] == 20.0
+    assert apply_event_effects_series(store, effects, 'MISSING').empty
+
+    links = create_fayda_impact_links(pd.Series({'record_id': 'EVT_0004'}), store)
+    assert links == create_fayda_impact_links(pd.Series({'record_id': 'EVT_0004'}), observations)
+    assert links[0]['impact_estimate'] == 1.0
+
+
+def test_ramp_timelines_match_reference_ramp():
+    _, effects = _synthetic_inputs()
+    start, end = pd.Timestamp('2021-01-01'), pd.Timestamp('2026-12-01')
+    tidy = build_ramp_timelines(effects, start=start, end=end)
+    wide = tidy.pivot(index='month', columns='related_indicator', values='effect')
+    assert set(wide.columns) == {'ACC_OWNERSHIP', 'USG_P2P_COUNT', 'ACC_FAYDA'}
+    assert len(wide) == 72
+
+    for ind, grp in effects.groupby('related_indicator'):
+        expected = pd.Series(0.0, index=wide.index)
+        for _, r in grp.iterrows():
+            ev = r['event_date']
+            for t in expected.index:
+                elapsed = (t.year - ev.year) * 12 + (t.month - ev.month) - (ev.day - 1) / ev.days_in_month
+                if r['lag_months'] > 0:
+                    w = min(1.0, max(0.0, elapsed / r['lag_months']))
+                else:
+                    w = 1.0 if elapsed >= 0 else 0.0
+                expected[t] += w * r['effect_value']
+        np.testing.assert_allclose(wide[ind].to_numpy(), expected.to_numpy())
+
+
+def test_ramp_timelines_empty_input():
+    empty = pd.DataFrame(columns=['event_date', 'related_indicator', 'effect_value', 'lag_months'])
+    assert list(build_ramp_timelines(empty).columns) == ['related_indicator', 'month', 'effect']
+
+
+def test_event_windows_match_direct_selection():
+    observations, _ = _synthetic_inputs()
+    events = pd.DataFrame({'record_id': ['E1', 'E2', 'E3'], 'indicator_code': ['EVT_A', 'EVT_B', 'EVT_C'],
+                           'observation_date': ['2021-05-17', '2023-07-01', None]})
+    result = analyze_event_windows(events, observations, ['ACC_OWNERSHIP', 'USG_P2P_COUNT'], after_months=12)
+    assert len(result) == 4  # undated event skipped
+
+    obs = observations.assign(observation_date=pd.to_datetime(observations['observation_date']))
+    for row in result.itertuples():
+        series = obs[obs['indicator_code'] == row.indicator_code].sort_values('observation_date')
+        before = series[series['observation_date'] <= row.event_date]
+        after = series[(series['observation_date'] > row.event_date) &
+                       (series['observation_date'] <= row.event_date + pd.DateOffset(months=12))]
+        assert row.n_before == len(before) and row.n_after == len(after)
+        expected = after['value_numeric'].iloc[-1] - before['value_numeric'].iloc[-1] if len(before) and len(after) else np.nan
+        assert np.isclose(row.change, expected, equal_nan=True)
+
+    # an event on an observation day counts that observation as "before"
+    p2p = result[(result['event_id'] == 'E2') & (result['indicator_code'] == 'USG_P2P_COUNT')].iloc[0]
+    assert p2p.before_value == 20.0 and p2p.after_value == 30.0
+
+
+def test_heatmap_loads_plotting_lazily_without_changing_global_style(tmp_path):
+    plt = pytest.importorskip('matplotlib.pyplot')
+    pytest.importorskip('seaborn')
+    _, effects = _synthetic_inputs()
+    assoc = effects.pivot_table(index='event_id', columns='related_indicator', values='effect_value', fill_value=0)
+    style = dict(plt.rcParams)
+    out = tmp_path / 'heatmap.png'
+    plot_association_heatmap(assoc, str(out))
+    plt.close('all')
+    assert out.stat().st_size > 0
+    assert dict(plt.rcParams) == style
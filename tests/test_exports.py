@@ -0,0 +1,54 @@
+import gzip
+import io
+
+import pandas as pd
+import pytest
+
+from src.exports import ExportCache, available_formats, encode_frame, export_filename
+
+FRAME = pd.DataFrame({'indicator_code': ['ACC_OWNERSHIP', 'USG_P2P_COUNT'], 'value_numeric': [49.0, 1.5e6]})
+
+
+def test_encodings_round_trip():
+    assert encode_frame(FRAME, 'csv') == FRAME.to_csv(index=False).encode('utf-8')
+    gz = encode_frame(FRAME, 'csv.gz')
+    assert gzip.decompress(gz) == encode_frame(FRAME, 'csv')
+    assert gz == encode_frame(FRAME, 'csv.gz')
+    if 'parquet' in available_formats():
+        pd.testing.assert_frame_equal(pd.read_parquet(io.BytesIO(encode_frame(FRAME, 'parquet'))), FRAME)
+    assert export_filename('combined', 'csv.gz') == 'combined.csv.gz'
+    with pytest.raises(ValueError):
+        encode_frame(FRAME, 'xlsx')
+
+
+def test_builds_only_on_miss():
+    cache = ExportCache()
+    calls = []
+
+    def build():
+        calls.append(1)
+        return FRAME
+
+    first = cache.get('v1', ('ACC',), 'csv', build)
+    assert cache.get('v1', ('ACC',), 'csv', build) is first
+    assert len(calls) == 1
+    cache.get('v2', ('ACC',), 'csv', build)
+    cache.get('v1', ('ACC',), 'csv.gz', build)
+    assert len(calls) == 3
+    assert cache.stats() == {'entries': 3, 'size_bytes': cache.size_bytes, 'hits': 1, 'misses': 3}
+
+
+def test_lru_eviction_by_size_and_count():
+    one = len(encode_frame(FRAME, 'csv'))
+    cache = ExportCache(max_bytes=2 * one)
+    for key in 'abc':
+        cache.get('v1', key, 'csv', lambda: FRAME)
+        if key == 'b':
+            cache.get('v1', 'a', 'csv', lambda: FRAME)
+    assert ('v1', 'a', 'csv') in cache and ('v1', 'c', 'csv') in cache and ('v1', 'b', 'csv') not in cache
+    assert cache.size_bytes == 2 * one
+
+    cache = ExportCache(max_entries=1)
+    cache.get('v1', 'a', 'csv', lambda: FRAME)
+    cache.get('v1', 'b', 'csv', lambda: FRAME)
+    assert len(cache) == 1 and ('v1', 'b', 'csv') in cache
@@ -0,0 +1,60 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.data_loader import load_unified_data, partition_by_record_type
+from src.forecasting import FORECAST_COLUMNS, forecast_all
+
+DATA_PATH = Path('data/raw/ethiopia_fi_unified_data.csv')
+REPORT_CSV = Path('reports/forecast_access_usage_2025_2027.csv')
+
+
+def _synthetic_observations(n_series=60, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n_series):
+        for year in range(2014, 2025, 2):
+            rows.append({'indicator_code': f'IND_{i:03d}', 'gender': ['all', 'female'][i % 2],
+                         'value_type': 'percentage' if i % 3 else 'count',
+                         'observation_date': f'{year}-12-31', 'value_numeric': 10 + 3 * (year - 2014) + rng.normal()})
+    return pd.DataFrame(rows)
+
+
+def test_matches_notebook_forecast_for_acc_ownership():
+    parts = partition_by_record_type(load_unified_data(str(DATA_PATH)))
+    forecast = forecast_all(parts['observations'], anchor_year=2024, max_workers=1, interval='band')
+    assert list(forecast.columns) == FORECAST_COLUMNS
+    ours = forecast[forecast['target'] == 'ACC_OWNERSHIP'].drop(columns=['gender', 'location']).reset_index(drop=True)
+    report = pd.read_csv(REPORT_CSV)
+    report = report[report['target'] == 'ACC_OWNERSHIP'].reset_index(drop=True)
+    pd.testing.assert_frame_equal(ours, report, check_dtype=False)
+
+
+def test_process_pool_matches_inline_run():
+    observations = _synthetic_observations()
+    inline = forecast_all(observations, max_workers=1)
+    pooled = forecast_all(observations, max_workers=2, chunk_size=7)
+    assert len(inline) == 60 * 3 * 3
+    pd.testing.assert_frame_equal(inline, pooled)
+
+
+def test_event_links_shift_with_events_forecast():
+    observations = _synthetic_observations(3)
+    events = pd.DataFrame({'record_id': ['EVT_1'], 'observation_date': ['2025-01-01']})
+    links = pd.DataFrame({'parent_id': ['EVT_1'], 'related_indicator': ['IND_001'], 'impact_magnitude': ['high'],
+                          'impact_direction': ['increase'], 'lag_months': [24]})
+    forecast = forecast_all(observations, links, events, max_workers=1)
+    base = forecast[forecast['scenario'] == 'base'].set_index(['target', 'year'])['event_delta']
+    assert np.allclose(base.loc['IND_001'].to_numpy(), [0.75, 1.5, 1.5])
+    assert (base.drop(index='IND_001') == 0).all()
+
+
+def test_prediction_interval_is_default_and_widens_with_horizon():
+    observations = _synthetic_observations(6)
+    forecast = forecast_all(observations, max_workers=1)
+    base = forecast[(forecast['scenario'] == 'base') & (forecast['target'] == 'IND_000')]
+    width = (base['upper_95'] - base['lower_95']).to_numpy()
+    assert (np.diff(width) > 0).all()
+    band = forecast_all(observations, max_workers=1, interval='band')
+    pd.testing.assert_series_equal(forecast['baseline_forecast'], band['baseline_forecast'])
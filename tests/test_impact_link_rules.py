@@ -0,0 +1,68 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_loader import load_unified_data, partition_by_record_type
+from src.impact_link_rules import generate_impact_links, load_impact_link_rules
+
+DATA_PATH = Path('data/raw/ethiopia_fi_unified_data.csv')
+RULES_PATH = Path('data/raw/impact_link_rules.csv')
+
+
+def test_rule_table_reproduces_hand_built_links():
+    parts = partition_by_record_type(load_unified_data(str(DATA_PATH)))
+    links = generate_impact_links(load_impact_link_rules(str(RULES_PATH)), parts['events'], parts['observations'])
+    by_code = links.set_index('indicator_code')
+    assert links['record_id'].tolist() == [f'IMP_{i:03d}' for i in range(1, 8)]
+    assert by_code.loc['IMP_TELEBIRR_MM', 'impact_estimate'] == pytest.approx(4.75)
+    assert by_code.loc['IMP_TELEBIRR_ACC', 'impact_estimate'] == pytest.approx(3.0)
+    assert by_code.loc['IMP_MPESA_P2P', 'impact_estimate'] == pytest.approx(78.6 / 49.7)
+    assert by_code.loc['IMP_FAYDA_ENROLL', 'impact_estimate'] == pytest.approx(0.875)
+    assert by_code.loc['IMP_TELEBIRR_ACC', 'parent_id'] == 'EVT_0001'
+    assert pd.isna(by_code.loc['IMP_4G_MM', 'parent_id'])
+    assert links['lag_months'].dtype == float
+
+
+def test_category_rule_scales_to_event_catalog(tmp_path):
+    n_events = 300
+    events = pd.DataFrame({
+        'record_id': [f'EVT_{i:04d}' for i in range(n_events)],
+        'indicator_code': [f'EVT_GEN_{i}' for i in range(n_events)],
+        'category': np.where(np.arange(n_events) % 2 == 0, 'product_launch', 'policy'),
+        'observation_date': (pd.date_range('2014-03-01', periods=n_events, freq='MS') + pd.Timedelta(days=14)).strftime('%Y-%m-%d'),
+    })
+    observations = pd.DataFrame({
+        'indicator_code': 'USG_P2P_COUNT',
+        'observation_date': pd.date_range('2014-01-31', periods=100, freq='ME').strftime('%Y-%m-%d'),
+        'value_numeric': np.arange(1.0, 101.0),
+    })
+    rules_path = tmp_path / 'rules.csv'
+    pd.DataFrame([{
+        'rule_id': 'R1', 'event_category': 'product_launch', 'related_indicator': 'USG_P2P_COUNT',
+        'pillar': 'USAGE', 'relationship_type': 'direct', 'impact_direction': 'increase',
+        'impact_magnitude': 'medium', 'lag_months': 3, 'evidence_basis': 'empirical',
+        'estimate_method': 'window_change', 'before_months': 6, 'after_months': 6, 'impact_estimate': 0.0,
+    }]).reindex(columns=['event_code'] + ['rule_id', 'event_category', 'related_indicator', 'pillar',
+                                          'relationship_type', 'impact_direction', 'impact_magnitude',
+                                          'lag_months', 'evidence_basis', 'estimate_method', 'before_months',
+                                          'after_months', 'impact_estimate']).to_csv(rules_path, index=False)
+
+    links = generate_impact_links(load_impact_link_rules(str(rules_path)), events, observations)
+    assert len(links) == n_events // 2
+    assert links['parent_id'].tolist() == events['record_id'].iloc[::2].tolist()
+    # month-end series rising by 1; mid-month events see a change of 6 wherever data covers both windows
+    event_dates = pd.to_datetime(events['observation_date'].iloc[::2]).to_numpy()
+    covered = (event_dates >= np.datetime64('2014-02-01')) & (event_dates <= np.datetime64('2021-10-31'))
+    assert (links['impact_estimate'].to_numpy()[covered] == 6.0).all()
+    # no observation after the event: falls back to the rule's impact_estimate
+    assert (links['impact_estimate'].to_numpy()[event_dates > np.datetime64('2022-04-30')] == 0.0).all()
+
+
+def test_unknown_estimate_method_is_rejected(tmp_path):
+    rules = pd.read_csv(RULES_PATH)
+    rules.loc[0, 'estimate_method'] = 'guess'
+    rules.to_csv(tmp_path / 'rules.csv', index=False)
+    with pytest.raises(ValueError, match='guess'):
+        load_impact_link_rules(str(tmp_path / 'rules.csv'))
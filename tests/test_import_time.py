@@ -0,0 +1,41 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Seconds allowed for importing the core modeling path on top of pandas/numpy
+IMPORT_BUDGET_S = 1.0
+HEAVY_MODULES = ['matplotlib', 'seaborn', 'streamlit', 'altair', 'scipy']
+
+PROBE = f"""
+import json, logging, sys, time
+import numpy, pandas
+path_before = list(sys.path)
+start = time.perf_counter()
+import src.data_loader, src.data_enricher, src.events_impact_modeler, src.forecasting
+elapsed = time.perf_counter() - start
+import src.backtesting, src.build_event_indicator_matrix, src.event_forecast, src.kpi_snapshot, src.scenario_engine
+print(json.dumps({{
+    'elapsed': elapsed,
+    'heavy': [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+    'root_handlers': len(logging.root.handlers),
+    'root_level': logging.root.level,
+    'path_changed': sys.path != path_before,
+}}))
+"""
+
+
+def test_core_modeling_path_imports_lazily_and_within_budget():
+    env = {k: v for k, v in os.environ.items() if k != 'FI_TRACE'}
+    out = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, env=env, capture_output=True, text=True,
+                         check=True)
+    probe = json.loads(out.stdout)
+    assert probe['heavy'] == []
+    # Importing configures no global logging
+    assert probe['root_handlers'] == 0 and probe['root_level'] == 30
+    # ...and leaves sys.path alone (CLI modules only extend it when run as scripts)
+    assert not probe['path_changed']
+    assert probe['elapsed'] < IMPORT_BUDGET_S, f"core import took {probe['elapsed']:.2f}s"
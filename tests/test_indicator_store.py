@@ -0,0 +1,32 @@
+import pandas as pd
+
+from src.indicator_store import IndicatorStore
+
+
+def _observations():
+    return pd.DataFrame({
+        'indicator_code': ['ACC_OWNERSHIP'] * 5 + ['USG_P2P_COUNT'] * 4,
+        'gender': ['all', 'all', 'female', 'all', None, 'all', 'all', 'all', 'all'],
+        'location': ['national'] * 9,
+        'value_type': ['percentage'] * 5 + ['count'] * 4,
+        'observation_date': ['2024-12-31', '2017-12-31', '2024-12-31', '2021-12-31', '2021-06-30',
+                             '2024-01-31', '2024-07-31', '2025-01-31', 'not a date'],
+        'value_numeric': [49.0, 35.0, 36.0, 46.0, 44.0, 10.0, 15.0, 50.0, 99.0],
+    })
+
+
+def test_series_are_sorted_and_keyed():
+    store = IndicatorStore(_observations())
+    assert ('ACC_OWNERSHIP', 'female', 'national') in store
+    assert store.series('ACC_OWNERSHIP').tolist() == [35.0, 44.0, 46.0, 49.0]
+    assert store.latest_value('ACC_OWNERSHIP') == 49.0
+    assert store.latest_value('ACC_OWNERSHIP', gender='female') == 36.0
+    assert store.latest_value('MISSING') is None
+
+
+def test_yearly_and_yoy_use_value_type():
+    store = IndicatorStore(_observations())
+    assert store.yearly('ACC_OWNERSHIP').to_dict() == {2017: 35.0, 2021: 45.0, 2024: 49.0}
+    assert store.yearly('USG_P2P_COUNT').to_dict() == {2024: 25.0, 2025: 50.0}
+    assert store.yoy_change('USG_P2P_COUNT') == 100.0
+    assert store.yoy_change('ACC_OWNERSHIP', how='sum') == (49.0 - 90.0) / 90.0 * 100.0
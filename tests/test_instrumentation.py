@@ -0,0 +1,79 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_unified, write_unified
+from src import instrumentation
+from src.data_loader import load_and_prepare_data, separate_by_record_type
+from src.instrumentation import count_rows, instrument, stage, tracing
+
+
+def test_disabled_records_nothing_and_preserves_results():
+    calls = []
+
+    @instrument
+    def double(df):
+        calls.append(1)
+        return df * 2
+
+    df = pd.DataFrame({'a': [1, 2]})
+    assert instrumentation.active_trace() is None
+    pd.testing.assert_frame_equal(double(df), df * 2)
+    with stage('noop') as s:
+        s['rows_out'] = 1
+    assert calls == [1] and double.__wrapped__.__name__ == 'double'
+
+
+def test_pipeline_stages_record_rows_time_and_memory(tmp_path):
+    path = write_unified(make_unified(2_000, 20), tmp_path / 'unified.csv')
+    with tracing() as trace:
+        load_and_prepare_data(str(path), ref_filepath=None)
+    assert instrumentation.active_trace() is None
+    stages = {s['stage']: s for s in trace.stages}
+    assert {'data_loader.load_unified_data', 'data_loader.validate_unified_schema',
+            'data_loader.separate_by_record_type', 'data_loader.load_and_prepare_data'} <= set(stages)
+    top = stages['data_loader.load_and_prepare_data']
+    assert top['depth'] == 0 and top['rows_out'] == 2_000
+    assert stages['data_loader.separate_by_record_type']['rows_in'] == 2_000
+    assert stages['data_loader.separate_by_record_type']['rows_out'] == 2_000
+    # The outer stage spans and out-allocates its children
+    children = [s for s in trace.stages if s['depth'] == 1]
+    assert top['wall_s'] >= sum(s['wall_s'] for s in children)
+    assert top['peak_bytes'] >= max(s['peak_bytes'] for s in children) > 0
+    summary = trace.summary()
+    assert summary['wall_s'].is_monotonic_decreasing and summary.iloc[0]['stage'] == 'data_loader.load_and_prepare_data'
+
+
+def test_nested_peaks_are_relative_to_stage_start():
+    with tracing() as trace:
+        with stage('outer'):
+            keep = np.ones(1_000_000)
+            with stage('inner') as s:
+                scratch = np.ones(250_000)
+                s['rows_out'] = len(scratch)
+                del scratch
+    inner, outer = trace.stages
+    assert inner['stage'] == 'inner' and inner['rows_out'] == 250_000
+    assert 2_000_000 <= inner['peak_bytes'] < 4_000_000
+    assert outer['peak_bytes'] >= 10_000_000
+    del keep
+
+
+def test_trace_exports(tmp_path):
+    df = make_unified(1_000, 10)
+    with tracing(trace_memory=False) as trace:
+        separate_by_record_type(df)
+    raw = json.loads(trace.to_json(tmp_path / 'trace.json').read_text())
+    assert raw['stages'][0]['peak_bytes'] is None
+    chrome = json.loads(trace.to_chrome_trace(tmp_path / 'chrome.json').read_text())
+    event = chrome['traceEvents'][0]
+    assert event['ph'] == 'X' and event['name'] == 'data_loader.separate_by_record_type'
+    assert event['dur'] > 0 and event['args']['rows_in'] == 1_000
+
+
+def test_count_rows():
+    df = pd.DataFrame({'a': range(3)})
+    assert count_rows(df) == 3
+    assert count_rows({'x': df, 'y': df.iloc[:1], 'z': 'text'}) == 4
+    assert count_rows((True, {'errors': []})) is None
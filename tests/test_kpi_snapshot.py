@@ -0,0 +1,55 @@
+import json
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+from src.data_enricher import save_enriched_data
+from src.data_loader import load_unified_data, partition_by_record_type
+from src.indicator_store import IndicatorStore
+from src.kpi_snapshot import compute_kpis, load_kpi_snapshot, snapshot_key, write_kpi_snapshot
+
+DATA_PATH = Path('data/raw/ethiopia_fi_unified_data.csv')
+
+
+def test_snapshot_matches_indicator_store(tmp_path):
+    out = write_kpi_snapshot(str(DATA_PATH), tmp_path / 'kpi.json')
+    snapshot = load_kpi_snapshot(out, DATA_PATH)
+    store = IndicatorStore(partition_by_record_type(load_unified_data(str(DATA_PATH)))['observations'])
+    assert set(snapshot['indicators']) == {snapshot_key(*k) for k in store.keys()}
+    acc = snapshot['indicators'][snapshot_key('ACC_OWNERSHIP')]
+    assert acc['latest_value'] == store.latest_value('ACC_OWNERSHIP')
+    assert acc['yoy_change'] == store.yoy_change('ACC_OWNERSHIP')
+    assert acc['latest_date'] == store.latest_date('ACC_OWNERSHIP').date().isoformat()
+
+
+def test_snapshot_is_rejected_when_data_changes(tmp_path):
+    data = tmp_path / 'data.csv'
+    shutil.copy(DATA_PATH, data)
+    out = write_kpi_snapshot(str(data), tmp_path / 'kpi.json')
+    assert load_kpi_snapshot(out, data) is not None
+    with open(data, 'a') as f:
+        f.write('\n')
+    assert load_kpi_snapshot(out, data) is None
+    assert load_kpi_snapshot(out) is not None
+    assert load_kpi_snapshot(tmp_path / 'missing.json') is None
+
+
+def test_headline_ratio_and_json_safe_values():
+    obs = pd.DataFrame({
+        'indicator_code': ['USG_P2P_COUNT'] * 3 + ['USG_ATM_COUNT'] * 2 + ['EMPTY'],
+        'value_type': 'count',
+        'observation_date': ['2023-06-30', '2024-03-31', '2024-09-30', '2024-03-31', '2024-09-30', '2024-01-01'],
+        'value_numeric': [5.0, 10.0, 20.0, 10.0, 5.0, None],
+    })
+    kpis = compute_kpis(obs)
+    assert kpis['headline'] == {'p2p_atm_ratio': 2.0, 'p2p_atm_ratio_year': 2024}
+    assert kpis['indicators'][snapshot_key('USG_P2P_COUNT')]['yoy_change'] == 500.0
+    json.dumps(kpis, allow_nan=False)
+
+
+def test_save_enriched_data_materializes_snapshot(tmp_path):
+    parts = partition_by_record_type(load_unified_data(str(DATA_PATH)), normalize=False)
+    save_enriched_data({'observations': parts['observations']}, str(tmp_path), 'enriched',
+                       kpi_snapshot_path=str(tmp_path / 'kpi.json'))
+    assert load_kpi_snapshot(tmp_path / 'kpi.json', tmp_path / 'enriched_combined.csv') is not None
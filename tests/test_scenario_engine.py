@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import scenario_engine
+from src.scenario_engine import fit_linear_trend, run_scenarios, simulate_paths
+
+
+def _inputs():
+    observations = pd.DataFrame({
+        'indicator_code': 'ACC_OWNERSHIP', 'value_type': 'percentage',
+        'observation_date': ['2014-12-31', '2017-12-31', '2021-12-31', '2024-11-29'],
+        'value_numeric': [22.0, 35.0, 46.0, 49.0],
+    })
+    events = pd.DataFrame({'record_id': ['EVT_1', 'EVT_2'], 'observation_date': ['2024-06-01', '2025-12-01']})
+    links = pd.DataFrame({
+        'parent_id': ['EVT_1', 'EVT_2'], 'related_indicator': 'ACC_OWNERSHIP',
+        'impact_magnitude': ['high', 'medium'], 'impact_direction': 'increase', 'lag_months': [12, 0],
+        'confidence': ['high', 'low'], 'evidence_basis': ['empirical', 'theoretical'],
+    })
+    return observations, events, links
+
+
+def test_trend_matches_lstsq():
+    years, values = np.array([2014., 2017., 2021., 2024.]), np.array([22., 35., 46., 49.])
+    slope, intercept = np.linalg.lstsq(np.vstack([years, np.ones(4)]).T, values, rcond=None)[0]
+    trend = fit_linear_trend(years, values)
+    assert trend['slope'] == pytest.approx(slope) and trend['intercept'] == pytest.approx(intercept)
+
+
+def test_near_certain_links_reproduce_deterministic_ramp():
+    links = pd.DataFrame({'effect': [2.0, -1.0], 'lag_months': [12.0, 0.0], 'sigma': [1e-9, 1e-9],
+                          'event_month': [2024 * 12 + 5, 2025 * 12 + 11]})
+    paths = simulate_paths(np.array([2023., 2024.]), np.array([10., 10.]), links, [2025, 2026], n_paths=50,
+                           rng=np.random.default_rng(0))
+    # EVT_1 ramp: 7/12 done at end-2024, complete by end-2025; EVT_2 steps in Dec 2025
+    expected = 10.0 + 2.0 * (1 - 7 / 12) - 1.0
+    assert np.allclose(paths, expected)
+
+
+def test_bands_are_ordered_reproducible_and_chunk_invariant(monkeypatch):
+    observations, events, links = _inputs()
+    result = run_scenarios(observations, links, events, ['ACC_OWNERSHIP', 'MISSING'], n_paths=20_000, seed=1)
+    assert result['indicator'].unique().tolist() == ['ACC_OWNERSHIP']
+    assert (result['p2.5'] <= result['p50']).all() and (result['p50'] <= result['p97.5']).all()
+    assert result[['p2.5', 'p97.5']].stack().between(0, 100).all()
+    pd.testing.assert_frame_equal(result, run_scenarios(observations, links, events, ['ACC_OWNERSHIP'],
+                                                        n_paths=20_000, seed=1))
+
+    # 1000 cells is 125 paths (2 links x 4 year-ends) per chunk against a single chunk by default
+    monkeypatch.setattr(scenario_engine, 'MAX_CHUNK_CELLS', 1000)
+    chunked = run_scenarios(observations, links, events, ['ACC_OWNERSHIP'], n_paths=20_000, seed=1)
+    pd.testing.assert_frame_equal(chunked, result, check_exact=False, rtol=1e-12)
+
+
+def test_short_series_needs_resid_floor_for_width():
+    observations, events, links = _inputs()
+    short = observations.iloc[-2:]
+    no_links = links.iloc[0:0]
+    flat = run_scenarios(short, no_links, events, ['ACC_OWNERSHIP'], n_paths=1_000)
+    assert (flat['p97.5'] - flat['p2.5'] == 0).all()
+    floored = run_scenarios(short, no_links, events, ['ACC_OWNERSHIP'], n_paths=1_000, resid_floor=0.05)
+    assert (floored['p97.5'] - floored['p2.5'] > 0).all()
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+import pandas as pd
+
+from src.data_loader import load_reference_codes, validate_unified_schema
+from src.schema_validator import compile_reference_codes, validate_records
+
+REF_PATH = Path('data/raw/reference_codes .csv')
+
+
+def _records():
+    return pd.DataFrame({
+        'record_id': ['R1', 'R2', 'R3', 'R3', 'L1'],
+        'record_type': ['observation', 'observation', 'event', 'event', 'impact_link'],
+        'pillar': ['ACCESS', 'ACCES', None, 'NOT_CHECKED_FOR_EVENTS', 'USAGE'],
+        'category': [None, None, 'policy', 'rumour', None],
+        'indicator_code': ['ACC_OWNERSHIP', 'ACC_OWNERSHIP', 'EVT_A', 'EVT_B', None],
+        'value_type': ['percentage', 'percentage', 'categorical', 'categorical', None],
+        'value_numeric': [49.0, 140.0, None, None, None],
+        'observation_date': ['2024-12-31', '31/12/2024', '2021-05-17', '2021-05-17', None],
+        'parent_id': [None, None, None, None, 'R3'],
+        'related_indicator': [None, None, None, None, 'ACC_OWNERSHIP'],
+        'lag_months': [None, None, None, None, -3],
+    })
+
+
+def test_compile_reference_codes_scopes_fields():
+    ref = compile_reference_codes(load_reference_codes(str(REF_PATH)))
+    assert 'policy' in ref['category']['codes']
+    assert ref['category']['record_types'] == ['event']
+    assert ref['gender']['record_types'] is None
+
+
+def test_validate_records_reports_each_violation():
+    ref = compile_reference_codes(load_reference_codes(str(REF_PATH)))
+    found = validate_records(_records(), ref)
+    got = set(zip(found['record_id'], found['field'], found['rule']))
+    assert got == {
+        ('R2', 'pillar', 'unknown_code'),
+        ('R2', 'value_numeric', 'out_of_range'),
+        ('R2', 'observation_date', 'bad_date'),
+        ('R3', 'category', 'unknown_code'),
+        ('R3', 'record_id', 'duplicate_id'),
+        ('L1', 'lag_months', 'out_of_range'),
+    }
+
+
+def test_validate_unified_schema_attaches_violations():
+    ref_codes = load_reference_codes(str(REF_PATH))
+    is_valid, report = validate_unified_schema(_records(), ref_codes)
+    assert not is_valid  # required columns such as 'indicator' are absent
+    assert len(report['violations']) == 7  # both duplicate rows are reported
+    assert report['violation_counts'][('record_id', 'duplicate_id')] == 2
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.series_tiles import SeriesTiles, lttb
+
+
+def _observations():
+    dates = pd.date_range('2020-01-01', '2023-12-31', freq='D')
+    return pd.DataFrame({
+        'indicator_code': 'USG_P2P_COUNT', 'value_type': 'count',
+        'observation_date': dates, 'value_numeric': np.arange(len(dates), dtype=float),
+    })
+
+
+def test_period_tiles_match_pandas_resample():
+    obs = pd.concat([_observations(), pd.DataFrame({'indicator_code': ['ACC_OWNERSHIP'] * 3, 'value_type': 'percentage',
+                                                    'observation_date': ['2021-01-31', '2021-11-30', '2024-12-31'],
+                                                    'value_numeric': [40.0, 50.0, 49.0]})])
+    tiles = SeriesTiles.from_observations(obs)
+    series = _observations().set_index('observation_date')['value_numeric']
+    for resolution, rule in (('M', 'MS'), ('Q', 'QS'), ('Y', 'YS')):
+        tile = tiles.tile('USG_P2P_COUNT', resolution)
+        expected = series.resample(rule).sum()
+        assert np.array_equal(tile.dates, expected.index.to_numpy(dtype='datetime64[ns]'))
+        assert np.allclose(tile.values, expected.to_numpy())
+    assert tiles.tile('ACC_OWNERSHIP', 'Y').values.tolist() == [45.0, 49.0]
+    with pytest.raises(ValueError):
+        tiles.tile('ACC_OWNERSHIP', 'W')
+
+
+def test_slice_is_inclusive_and_empty_for_unknown_series():
+    tiles = SeriesTiles.from_observations(_observations())
+    dates, values = tiles.tile('USG_P2P_COUNT').slice('2021-03-01', '2021-03-31')
+    assert len(dates) == 31 and values[0] == 425.0
+    assert tiles.tile('USG_P2P_COUNT', 'M').slice(end='2020-02-01')[1].tolist() == [sum(range(31)), sum(range(31, 60))]
+    assert tiles.tile('MISSING').bounds is None and tiles.tile('MISSING').frame().empty
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 50.0)
+    y[437] = 25.0
+    keep = lttb(x, y, 100)
+    assert len(keep) == 100 and keep[0] == 0 and keep[-1] == 999
+    assert (np.diff(keep) > 0).all()
+    assert 437 in keep
+    assert lttb(x[:10], y[:10], 50).tolist() == list(range(10))
+
+
+def test_frame_respects_point_budget():
+    tile = SeriesTiles.from_observations(_observations()).tile('USG_P2P_COUNT')
+    frame = tile.frame(max_points=200)
+    assert len(frame) == 200
+    assert frame['date'].iloc[0] == pd.Timestamp('2020-01-01') and frame['date'].iloc[-1] == pd.Timestamp('2023-12-31')
+    assert len(tile.frame('2022-01-01', '2022-01-10', max_points=200)) == 10
@@ -0,0 +1,91 @@
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import make_unified, write_unified
+from src.data_loader import load_and_prepare_data
+from src.streaming_loader import stream_and_prepare_data
+
+DATA_PATH = Path('data/raw/ethiopia_fi_unified_data.csv')
+REF_PATH = Path('data/raw/reference_codes .csv')
+
+
+def _read_output(path):
+    # Streaming falls back to CSV output when pyarrow is missing
+    return pd.read_parquet(path) if Path(path).suffix == '.parquet' else pd.read_csv(path)
+
+
+@pytest.mark.parametrize('fmt', ['parquet', 'csv'])
+def test_streaming_matches_in_memory_load(tmp_path, fmt):
+    if fmt == 'parquet':
+        pytest.importorskip('pyarrow')
+    full = load_and_prepare_data(str(DATA_PATH), str(REF_PATH))
+    streamed = stream_and_prepare_data(str(DATA_PATH), str(REF_PATH), tmp_path / 'parts', chunksize=7, fmt=fmt)
+
+    expected, got = full['summary'], streamed['summary']
+    for key in ['total_records', 'columns', 'record_type_counts', 'observations_pillar_dist',
+                'impact_links_pillar_dist', 'unique_indicators', 'event_categories', 'date_range']:
+        assert got[key] == expected[key], key
+    for stat in ['min', 'max', 'count']:
+        assert got['indicator_coverage'][stat] == expected['indicator_coverage'][stat]
+
+    report, expected_report = streamed['validation_report'], full['validation_report']
+    for key in ['missing_columns', 'record_type_distribution', 'null_counts', 'date_range']:
+        assert report[key] == expected_report[key], key
+    assert streamed['is_valid'] == full['is_valid']
+
+    read = pd.read_parquet if fmt == 'parquet' else pd.read_csv
+    for key, part in full['separated'].items():
+        out = read(streamed['outputs'][key])
+        assert len(out) == len(part), key
+        assert list(out['record_id']) == list(part['record_id'])
+        pd.testing.assert_series_equal(out['value_numeric'], part['value_numeric'].reset_index(drop=True),
+                                       check_names=False, check_dtype=len(part) > 0)
+
+
+def test_parquet_partitions_keep_missing_text_null(tmp_path):
+    pytest.importorskip('pyarrow')
+    raw = pd.read_csv(DATA_PATH)
+    result = stream_and_prepare_data(str(DATA_PATH), None, tmp_path / 'parts', chunksize=7)
+    observations = pd.read_parquet(result['outputs']['observations'])
+    expected = raw[raw['record_type'] == 'observation'].reset_index(drop=True)
+    for col in ['source_url', 'original_text', 'notes']:
+        assert observations[col].isna().sum() == expected[col].isna().sum(), col
+        assert not (observations[col] == 'nan').any(), col
+
+
+def test_text_after_first_chunk_is_not_coerced(tmp_path):
+    df = pd.read_csv(DATA_PATH).assign(extra='1')
+    df.loc[len(df) - 1, 'extra'] = 'see notes'
+    path = tmp_path / 'late_text.csv'
+    df.to_csv(path, index=False)
+    result = stream_and_prepare_data(str(path), None, tmp_path / 'parts', chunksize=10, fmt='csv')
+    parts = pd.concat([pd.read_csv(p, dtype={'extra': str}) for p in result['outputs'].values()])
+    assert (parts['extra'] == 'see notes').sum() == 1
+
+
+def test_duplicate_ids_within_chunk_are_reported(tmp_path):
+    df = pd.read_csv(DATA_PATH)
+    path = tmp_path / 'dup.csv'
+    pd.concat([df, df.iloc[:1]]).to_csv(path, index=False)
+    result = stream_and_prepare_data(str(path), str(REF_PATH), tmp_path / 'parts', chunksize=len(df) + 1)
+    assert result['validation_report']['violation_counts'][('record_id', 'duplicate_id')] == 2
+    violations = _read_output(result['validation_report']['violations'])
+    assert set(violations.loc[violations['rule'] == 'duplicate_id', 'row']) == {0, len(df)}
+
+
+def test_streaming_memory_does_not_grow_with_file_size(tmp_path):
+    peaks = {}
+    # The first pass warms one-time caches (imports, date parsers) and is not compared
+    for run, rows in enumerate((4_000, 4_000, 16_000)):
+        path = write_unified(make_unified(rows, 20), tmp_path / f'unified_{rows}.csv')
+        tracemalloc.start()
+        result = load_and_prepare_data(str(path), None, stream=True, out_dir=str(tmp_path / f'parts_{run}'),
+                                       chunksize=1_000)
+        peaks[rows] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert result['summary']['total_records'] == rows
+        assert sum(len(_read_output(p)) for p in result['outputs'].values()) == rows
+    assert peaks[16_000] < 1.5 * peaks[4_000]
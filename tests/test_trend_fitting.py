@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from src.trend_fitting import fit_series_frame, fit_trends, predict_trends, stack_series, t_quantile
+
+
+def _ragged(n_series=200, seed=0):
+    rng = np.random.default_rng(seed)
+    series = []
+    for _ in range(n_series):
+        years = np.sort(rng.choice(np.arange(2005, 2025), size=rng.integers(3, 12), replace=False)).astype(float)
+        series.append((years, rng.normal(2.0, 1.0) * (years - 2010) + rng.normal(40, 5) + rng.normal(0, 2, len(years))))
+    return series
+
+
+def test_batched_fit_matches_per_series_lstsq():
+    series = _ragged()
+    fit = fit_trends(*stack_series(series))
+    for i, (years, values) in enumerate(series):
+        A = np.vstack([years, np.ones_like(years)]).T
+        slope, intercept = np.linalg.lstsq(A, values, rcond=None)[0]
+        resid = values - (slope * years + intercept)
+        assert np.isclose(fit['slope'][i], slope)
+        assert np.isclose(fit['intercept'][i], intercept)
+        assert np.isclose(fit['rmse'][i], np.sqrt(np.mean(resid ** 2)))
+        assert np.isclose(fit['resid_sd'][i], np.sqrt((resid ** 2).sum() / (len(years) - 2)))
+
+
+def test_t_quantile_matches_tables():
+    table = {1: 12.7062, 2: 4.3027, 3: 3.1824, 5: 2.5706, 10: 2.2281, 30: 2.0423, 1000: 1.9623}
+    got = t_quantile(0.975, np.array(list(table)))
+    assert np.allclose(got, list(table.values()), atol=1e-4)
+    assert np.isnan(t_quantile(0.975, np.array([0]))).all()
+
+
+def test_prediction_intervals_widen_away_from_data():
+    series = _ragged(5) + [(np.array([2020.0, 2021.0]), np.array([1.0, 2.0]))]
+    fit = fit_trends(*stack_series(series))
+    yhat, lo, hi = predict_trends(fit, np.array([2025, 2030, 2040]))
+    assert yhat.shape == (6, 3)
+    assert (np.diff(hi[:5] - lo[:5], axis=1) > 0).all()
+    assert np.isnan(lo[5]).all() and np.isclose(yhat[5, 0], 6.0)
+
+
+def test_fit_series_frame_groups_long_data():
+    frame = pd.DataFrame({'code': ['A'] * 3 + ['B'] * 4, 'year': [1, 2, 3, 1, 2, 3, 4],
+                          'value': [1.0, 3.0, 5.0, 10.0, 9.0, 8.0, 7.0]})
+    fits = fit_series_frame(frame, ['code']).set_index('code')
+    assert np.allclose(fits['slope'], [2.0, -1.0])
+    assert np.allclose(fits['n'], [3, 4])